@@ -0,0 +1,2 @@
+# ABOUTME: Load-generation and latency benchmarks for the public RPC surface
+# ABOUTME: Run with `python -m benchmarks --help` against a local Supabase or PostgREST
@@ -0,0 +1,131 @@
+# ABOUTME: Command-line entry point: seed, drive a concurrent operation mix, report JSON
+# ABOUTME: Exits non-zero on errors or an exceeded p95 budget, for use as a pre-deploy gate
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+
+import httpx
+
+from benchmarks.scenarios import DEFAULT_MIX, OPERATIONS, parse_mix
+from benchmarks.seed import SeededData, cleanup, seed
+from benchmarks.stats import OperationStats, budget_failures, merge
+from benchmarks.target import Target
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Load-test the CU Study Groups RPCs and report latency as JSON.",
+    )
+    parser.add_argument("--groups", type=int, default=200, help="study groups to seed")
+    parser.add_argument("--participants", type=int, default=3, help="participants per seeded group")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent workers")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load after warm-up")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds of unrecorded load first")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible mixes")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="fail if overall p95 exceeds this")
+    parser.add_argument(
+        "--max-error-rate", type=float, default=0.0,
+        help="fail if the share of failed calls exceeds this (default: 0, any error fails)",
+    )
+    parser.add_argument("--keep-data", action="store_true", help="skip deleting seeded rows")
+    return parser.parse_args(argv)
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    target: Target,
+    data: SeededData,
+    weights: dict[str, int],
+    rng: random.Random,
+    record_from: float,
+    deadline: float,
+    stats: dict[str, OperationStats],
+) -> None:
+    names = list(weights)
+    values = list(weights.values())
+    while (now := time.perf_counter()) < deadline:
+        name = rng.choices(names, weights=values)[0]
+        started = time.perf_counter()
+        try:
+            response = await OPERATIONS[name](client, target, data, rng)
+            ok = response.is_success
+        except httpx.HTTPError:
+            ok = False
+        if now >= record_from:
+            stats[name].record((time.perf_counter() - started) * 1000, ok)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    weights = parse_mix(args.mix)
+    target = Target.from_env()
+    run_id = uuid.uuid4().hex[:8]
+    master = random.Random(args.seed)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+        seed_started = time.perf_counter()
+        data = await seed(client, target, run_id, args.groups, args.participants)
+        seed_seconds = time.perf_counter() - seed_started
+
+        stats = {name: OperationStats() for name in weights}
+        try:
+            start = time.perf_counter()
+            record_from = start + args.warmup
+            deadline = record_from + args.duration
+            await asyncio.gather(*(
+                _worker(client, target, data, weights, random.Random(master.random()),
+                        record_from, deadline, stats)
+                for _ in range(args.concurrency)
+            ))
+        finally:
+            if not args.keep_data:
+                await cleanup(client, target, run_id)
+
+    return {
+        "run_id": run_id,
+        "target": target.rest_url,
+        "config": {
+            "groups": args.groups,
+            "participants_per_group": args.participants,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "mix": weights,
+        },
+        "seed": {
+            "groups": len(data.group_ids),
+            "participants": len(data.members),
+            "seconds": round(seed_seconds, 2),
+        },
+        "operations": {name: op.summary(args.duration) for name, op in stats.items()},
+        "overall": merge(stats).summary(args.duration),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    failures = budget_failures(report["overall"], args.max_p95_ms, args.max_error_rate)
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# ABOUTME: Benchmark operations against the public RPC surface and the join path
+# ABOUTME: Each operation issues one HTTP request; a weighted mix decides what workers call
+
+import itertools
+import random
+from collections.abc import Awaitable, Callable
+
+import httpx
+
+from benchmarks.seed import SeededData
+from benchmarks.target import Target
+
+Operation = Callable[[httpx.AsyncClient, Target, SeededData, random.Random], Awaitable[httpx.Response]]
+
+SEARCH_TERMS = ["calc", "chem", "data", "micro", "algebra", "butler", "professor 7"]
+
+# Unique suffix for emails created by join traffic
+_join_counter = itertools.count()
+
+# Last ETag returned by the snapshot RPC, shared by all workers like a browser cache
+_snapshot_etag: str | None = None
+
+
+async def read_feed(client, target, data, rng) -> httpx.Response:
+    """Full listing with counts (anonymous, as the home page used to load it)."""
+    return await client.post(
+        f"{target.rest_url}/rpc/get_study_groups_with_counts",
+        json={},
+        headers=target.anon_headers,
+    )
+
+
+async def read_page(client, target, data, rng) -> httpx.Response:
+    """First keyset page of the home feed."""
+    return await client.post(
+        f"{target.rest_url}/rpc/get_study_groups_page",
+        json={"p_limit": 24},
+        headers=target.anon_headers,
+    )
+
+
+async def read_snapshot(client, target, data, rng) -> httpx.Response:
+    """First upcoming-groups snapshot page, revalidated with the last ETag seen."""
+    global _snapshot_etag
+    response = await client.post(
+        f"{target.rest_url}/rpc/get_upcoming_groups_snapshot",
+        json={"p_etag": _snapshot_etag, "p_limit": 24},
+        headers=target.anon_headers,
+    )
+    if response.status_code == 200:
+        _snapshot_etag = response.json()["etag"]
+    return response
+
+
+async def member_check(client, target, data, rng) -> httpx.Response:
+    """is_group_member for a seeded participant (hit) or a stranger (miss)."""
+    group_id, email = rng.choice(data.members) if data.members else (rng.choice(data.group_ids), "")
+    if rng.random() < 0.5:
+        email = "stranger@columbia.edu"
+    return await client.post(
+        f"{target.rest_url}/rpc/is_group_member",
+        json={"p_study_group_id": group_id, "p_email": email},
+        headers=target.anon_headers,
+    )
+
+
+async def participants_if_member(client, target, data, rng) -> httpx.Response:
+    """Participant list as seen by a member of the group."""
+    group_id, email = rng.choice(data.members) if data.members else (rng.choice(data.group_ids), "")
+    return await client.post(
+        f"{target.rest_url}/rpc/get_group_participants_if_member",
+        json={"p_study_group_id": group_id, "p_requester_email": email},
+        headers=target.anon_headers,
+    )
+
+
+async def group_page(client, target, data, rng) -> httpx.Response:
+    """GroupPage's single round trip, for a member (hit) or a stranger (visitor)."""
+    group_id, email = rng.choice(data.members) if data.members else (rng.choice(data.group_ids), "")
+    if rng.random() < 0.5:
+        email = "stranger@columbia.edu"
+    return await client.post(
+        f"{target.rest_url}/rpc/get_group_page",
+        json={"p_study_group_id": group_id, "p_requester_email": email},
+        headers=target.anon_headers,
+    )
+
+
+async def join(client, target, data, rng) -> httpx.Response:
+    """Insert a new participant into a random seeded group."""
+    n = next(_join_counter)
+    return await client.post(
+        f"{target.rest_url}/participants",
+        json={
+            "study_group_id": rng.choice(data.group_ids),
+            "name": f"Bench Joiner {n}",
+            "email": f"bench-{data.run_id}-join{n}@columbia.edu",
+        },
+        headers={**target.anon_headers, "Prefer": "return=minimal"},
+    )
+
+
+async def search(client, target, data, rng) -> httpx.Response:
+    """Server-side search for a common term."""
+    return await client.post(
+        f"{target.rest_url}/rpc/search_study_groups",
+        json={"p_query": rng.choice(SEARCH_TERMS), "p_limit": 20},
+        headers=target.anon_headers,
+    )
+
+
+OPERATIONS: dict[str, Operation] = {
+    "read": read_feed,
+    "page": read_page,
+    "snapshot": read_snapshot,
+    "member": member_check,
+    "participants": participants_if_member,
+    "group_page": group_page,
+    "join": join,
+    "search": search,
+}
+
+DEFAULT_MIX = "read=25,page=20,snapshot=10,member=10,participants=5,group_page=15,join=5,search=10"
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    """Parse "read=60,join=10" into weights, rejecting unknown operations."""
+    weights: dict[str, int] = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}' (choose from {', '.join(OPERATIONS)})")
+        value = int(weight) if weight else 1
+        if value < 0:
+            raise ValueError(f"Weight for '{name}' must not be negative")
+        if value:
+            weights[name] = value
+    if not weights:
+        raise ValueError("Mix must contain at least one operation with a positive weight")
+    return weights
@@ -0,0 +1,102 @@
+# ABOUTME: Bulk seeding and cleanup of benchmark data through PostgREST
+# ABOUTME: Inserts groups and participants as JSON arrays, tagged with a per-run subject prefix
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from benchmarks.target import Target
+
+# PostgREST inserts a JSON array in one statement; keep each request bounded
+CHUNK_SIZE = 500
+
+SUBJECTS = ["Calculus", "Organic Chemistry", "Data Structures", "Microeconomics", "Linear Algebra"]
+LOCATIONS = ["Butler Library", "Mudd Building", "Lerner Hall", "Milbank Hall"]
+
+
+@dataclass
+class SeededData:
+    """Ids created for one run, used to build realistic requests."""
+
+    run_id: str
+    group_ids: list[str]
+    # (group_id, email) for each seeded participant
+    members: list[tuple[str, str]]
+
+    @property
+    def subject_prefix(self) -> str:
+        return subject_prefix(self.run_id)
+
+
+def subject_prefix(run_id: str) -> str:
+    return f"bench-{run_id}-"
+
+
+def _chunks(rows: list[dict], size: int = CHUNK_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def seed(
+    client: httpx.AsyncClient,
+    target: Target,
+    run_id: str,
+    groups: int,
+    participants_per_group: int,
+) -> SeededData:
+    """Insert `groups` upcoming groups and `participants_per_group` participants in each.
+
+    Groups have no student limit so join traffic never fails on capacity.
+    """
+    now = datetime.now(timezone.utc)
+    prefix = subject_prefix(run_id)
+    group_rows = []
+    for i in range(groups):
+        start = now + timedelta(hours=1 + i % 72, minutes=i % 60)
+        group_rows.append({
+            "subject": f"{prefix}{SUBJECTS[i % len(SUBJECTS)]} {i}",
+            "professor_name": f"Professor {i % 50}",
+            "location": LOCATIONS[i % len(LOCATIONS)],
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=2)).isoformat(),
+            "organizer_name": f"Organizer {i}",
+            "organizer_email": f"bench-{run_id}-org{i}@columbia.edu",
+        })
+
+    headers = {**target.service_headers, "Prefer": "return=representation"}
+    group_ids: list[str] = []
+    for chunk in _chunks(group_rows):
+        response = await client.post(
+            f"{target.rest_url}/study_groups?select=id", json=chunk, headers=headers
+        )
+        response.raise_for_status()
+        group_ids.extend(row["id"] for row in response.json())
+
+    members = [
+        (group_id, f"bench-{run_id}-g{g}p{p}@columbia.edu")
+        for g, group_id in enumerate(group_ids)
+        for p in range(participants_per_group)
+    ]
+    participant_rows = [
+        {"study_group_id": group_id, "name": email.split("@")[0], "email": email}
+        for group_id, email in members
+    ]
+    minimal = {**target.service_headers, "Prefer": "return=minimal"}
+    for chunk in _chunks(participant_rows):
+        response = await client.post(
+            f"{target.rest_url}/participants", json=chunk, headers=minimal
+        )
+        response.raise_for_status()
+
+    return SeededData(run_id=run_id, group_ids=group_ids, members=members)
+
+
+async def cleanup(client: httpx.AsyncClient, target: Target, run_id: str) -> None:
+    """Delete every group created by the run (participants cascade)."""
+    response = await client.delete(
+        f"{target.rest_url}/study_groups",
+        params={"subject": f"like.{subject_prefix(run_id)}*"},
+        headers=target.service_headers,
+    )
+    response.raise_for_status()
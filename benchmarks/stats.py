@@ -0,0 +1,79 @@
+# ABOUTME: Latency statistics for benchmark runs
+# ABOUTME: Percentiles, throughput and per-operation summaries serialisable as JSON
+
+from dataclasses import dataclass, field
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the pct-th percentile (0-100) using linear interpolation between ranks."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+@dataclass
+class OperationStats:
+    """Latencies (milliseconds) and error count collected for one operation."""
+
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def record(self, latency_ms: float, ok: bool) -> None:
+        if ok:
+            self.latencies_ms.append(latency_ms)
+        else:
+            self.errors += 1
+
+    def summary(self, duration_s: float) -> dict[str, float | int]:
+        """Summarize successful calls; throughput counts successes per second.
+
+        Latencies cover successes only, so error_rate is reported alongside them.
+        """
+        count = len(self.latencies_ms)
+        attempts = count + self.errors
+        return {
+            "count": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / attempts, 4) if attempts else 0.0,
+            "p50_ms": round(percentile(self.latencies_ms, 50), 2),
+            "p95_ms": round(percentile(self.latencies_ms, 95), 2),
+            "p99_ms": round(percentile(self.latencies_ms, 99), 2),
+            "mean_ms": round(sum(self.latencies_ms) / count, 2) if count else 0.0,
+            "max_ms": round(max(self.latencies_ms), 2) if count else 0.0,
+            "throughput_rps": round(count / duration_s, 2) if duration_s > 0 else 0.0,
+        }
+
+
+def merge(stats: dict[str, OperationStats]) -> OperationStats:
+    """Combine per-operation stats into one overall set."""
+    overall = OperationStats()
+    for op in stats.values():
+        overall.latencies_ms.extend(op.latencies_ms)
+        overall.errors += op.errors
+    return overall
+
+
+def budget_failures(
+    overall: dict[str, float | int], max_p95_ms: float | None, max_error_rate: float
+) -> list[str]:
+    """Reasons an overall summary fails the gate; empty when the run passes.
+
+    A run with no successful calls fails regardless of budgets, since its p95 is zero.
+    """
+    failures = []
+    if overall["errors"] and overall["error_rate"] > max_error_rate:
+        failures.append(
+            f"{overall['errors']} errors ({overall['error_rate']:.2%}) exceed the error budget {max_error_rate:.2%}"
+        )
+    if not overall["count"]:
+        failures.append("no successful calls")
+    if max_p95_ms is not None and overall["p95_ms"] > max_p95_ms:
+        failures.append(
+            f"p95 {overall['p95_ms']}ms over {overall['count']} successes "
+            f"({overall['errors']} errors) exceeds budget {max_p95_ms}ms"
+        )
+    return failures
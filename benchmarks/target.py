@@ -0,0 +1,51 @@
+# ABOUTME: Connection settings for the benchmark target (Supabase or bare PostgREST)
+# ABOUTME: Reads the REST URL and keys from the environment, like tests/conftest.py
+
+import os
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class Target:
+    """PostgREST endpoint plus the headers for service-role and anonymous calls."""
+
+    rest_url: str
+    service_headers: dict[str, str]
+    anon_headers: dict[str, str]
+
+    @classmethod
+    def from_env(cls) -> "Target":
+        """Build the target from BENCH_REST_URL or SUPABASE_URL.
+
+        BENCH_REST_URL points straight at a PostgREST instance (no /rest/v1 suffix added).
+        Anonymous calls fall back to the service key when SUPABASE_ANON_KEY is unset.
+        """
+        service_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+        if not service_key:
+            raise SystemExit("SUPABASE_SERVICE_ROLE_KEY is required")
+
+        rest_url = os.environ.get("BENCH_REST_URL")
+        if not rest_url:
+            supabase_url = os.environ.get("SUPABASE_URL")
+            if not supabase_url:
+                raise SystemExit("Set BENCH_REST_URL or SUPABASE_URL")
+            rest_url = f"{supabase_url}/rest/v1"
+
+        anon_key = os.environ.get("SUPABASE_ANON_KEY") or service_key
+        return cls(
+            rest_url=rest_url.rstrip("/"),
+            service_headers=_headers(service_key),
+            anon_headers=_headers(anon_key),
+        )
+
+
+def _headers(key: str) -> dict[str, str]:
+    return {
+        "apikey": key,
+        "Authorization": f"Bearer {key}",
+        "Content-Type": "application/json",
+    }
@@ -1,21 +1,27 @@
 // ABOUTME: Hook for fetching and managing organizer's study groups
-// ABOUTME: Provides CRUD operations for authenticated organizers
+// ABOUTME: Loads groups and participant previews in one RPC, syncs version deltas, caches participant lists
 
-import { useState, useEffect, useCallback } from "react";
+import { useState, useEffect, useCallback, useRef } from "react";
+import type { RealtimePostgresChangesPayload } from "@supabase/supabase-js";
 import { supabase } from "../lib/supabase";
 import { useAuth } from "../contexts/AuthContext";
-import type { StudyGroupWithCounts, StudyGroup } from "../lib/database.types";
-
-interface StudyGroupWithParticipants extends StudyGroup {
-  participants: { count: number }[];
-}
-
-interface Participant {
-  id: string;
-  name: string;
-  email: string;
-  joined_at: string;
-}
+import type {
+  GroupParticipant,
+  MyDashboard,
+  StudyGroup,
+  StudyGroupWithCounts,
+  StudyGroupsSince,
+  VersionedGroup,
+} from "../lib/database.types";
+import {
+  applyGroupDelta,
+  createGroupStore,
+  storeToList,
+} from "../lib/groupStore";
+import {
+  createRefetchScheduler,
+  type RefetchScheduler,
+} from "../lib/refetchScheduler";
 
 export interface CreateStudyGroupInput {
   subject: string;
@@ -50,18 +56,84 @@ interface UseOrganizerGroupsResult {
   createGroup: (input: CreateStudyGroupInput) => Promise<void>;
   updateGroup: (groupId: string, input: UpdateStudyGroupInput) => Promise<void>;
   deleteGroup: (groupId: string) => Promise<void>;
-  getParticipants: (groupId: string) => Promise<Participant[]>;
+  getParticipants: (groupId: string) => Promise<GroupParticipant[]>;
+}
+
+// The last organizer's groups outlive the hook, so reopening the dashboard
+// only asks for what changed since
+let organizerCache: {
+  email: string;
+  groups: VersionedGroup[];
+  version: number;
+} | null = null;
+
+// Complete participant lists by group, tagged with the group version they were
+// read at. Joins and leaves bump the version, so a match means the list is current.
+let participantCache: {
+  email: string;
+  byGroup: Map<string, { version: number; participants: GroupParticipant[] }>;
+} | null = null;
+
+/**
+ * Participant lists cached for this organizer (a fresh map after a user switch).
+ */
+function participantsFor(email: string) {
+  if (participantCache?.email !== email) {
+    participantCache = { email, byGroup: new Map() };
+  }
+  return participantCache.byGroup;
+}
+
+/**
+ * Load the caller's groups with counts and participant previews in one call.
+ */
+async function fetchDashboard(): Promise<MyDashboard> {
+  const { data, error } = await supabase.rpc("get_my_dashboard");
+  if (error) {
+    throw new Error(error.message);
+  }
+  return data as MyDashboard;
+}
+
+/**
+ * Ask for changes to the caller's groups since a version.
+ */
+async function fetchMineSince(version: number): Promise<StudyGroupsSince> {
+  const { data, error } = await supabase.rpc("get_study_groups_since", {
+    p_version: version,
+    p_mine: true,
+  });
+  if (error) {
+    throw new Error(error.message);
+  }
+  return data as StudyGroupsSince;
 }
 
 export function useOrganizerGroups(): UseOrganizerGroupsResult {
   const { user } = useAuth();
-  const [groups, setGroups] = useState<StudyGroupWithCounts[]>([]);
+  const [groups, setGroups] = useState<VersionedGroup[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const schedulerRef = useRef<RefetchScheduler | null>(null);
+  const groupsRef = useRef(groups);
+  // Catalogue version the list reflects; null before the first load
+  const versionRef = useRef<number | null>(null);
+
+  const applyGroups = useCallback(
+    (next: VersionedGroup[], version: number | null) => {
+      groupsRef.current = next;
+      versionRef.current = version;
+      setGroups(next);
+      if (user?.email && version !== null) {
+        organizerCache = { email: user.email, groups: next, version };
+      }
+    },
+    [user?.email],
+  );
 
   const fetchGroups = useCallback(async () => {
     if (!user?.email) {
-      setGroups([]);
+      applyGroups([], null);
       setIsLoading(false);
       return;
     }
@@ -69,54 +141,69 @@ export function useOrganizerGroups(): UseOrganizerGroupsResult {
     try {
       setError(null);
 
-      // Fetch study groups owned by this organizer (case-insensitive match)
-      const { data, error: fetchError } = await supabase
-        .from("study_groups")
-        .select(
-          `
-          *,
-          participants:participants(count)
-        `,
-        )
-        .ilike("organizer_email", user.email.toLowerCase())
-        .order("start_time", { ascending: true });
-
-      if (fetchError) {
-        throw new Error(fetchError.message);
-      }
+      // Groups, counts and participant previews for the JWT's email, in one query
+      const { version, groups: rows } = await fetchDashboard();
 
-      // Transform data to include participant_count and is_full
-      const rawData = data as unknown as StudyGroupWithParticipants[] | null;
-      const groupsWithCounts: StudyGroupWithCounts[] = (rawData || []).map(
-        (group) => {
-          const participantCount = group.participants?.[0]?.count ?? 0;
-          return {
-            id: group.id,
-            subject: group.subject,
-            description: group.description,
-            professor_name: group.professor_name,
-            location: group.location,
-            start_time: group.start_time,
-            end_time: group.end_time,
-            student_limit: group.student_limit,
-            organizer_name: group.organizer_name,
-            created_at: group.created_at,
-            expires_at: group.expires_at,
-            participant_count: participantCount,
-            is_full: group.student_limit
-              ? participantCount >= group.student_limit
-              : false,
-          };
-        },
-      );
+      const cached = participantsFor(user.email);
+      const next = rows.map(({ participants, ...group }) => {
+        if (participants.length === group.participant_count) {
+          cached.set(group.id, { version: group.version, participants });
+        }
+        return group;
+      });
 
-      setGroups(groupsWithCounts);
+      applyGroups(next, version);
     } catch (err) {
       setError(err instanceof Error ? err.message : "Failed to load groups");
     } finally {
       setIsLoading(false);
     }
-  }, [user?.email]);
+  }, [user?.email, applyGroups]);
+
+  // Apply only the groups changed since the last version seen, falling back
+  // to a full load when there is none (or the server no longer has it)
+  const syncGroups = useCallback(async () => {
+    if (
+      user?.email &&
+      versionRef.current === null &&
+      organizerCache?.email === user.email
+    ) {
+      applyGroups(organizerCache.groups, organizerCache.version);
+      setIsLoading(false);
+    }
+
+    const since = versionRef.current;
+    if (!user?.email || since === null) {
+      return fetchGroups();
+    }
+
+    try {
+      const delta = await fetchMineSince(since);
+      if (delta.resync) {
+        return fetchGroups();
+      }
+
+      setError(null);
+      if (delta.not_modified) {
+        versionRef.current = delta.version;
+        return;
+      }
+
+      const cached = participantsFor(user.email);
+      for (const id of delta.deleted ?? []) {
+        cached.delete(id);
+      }
+
+      const next = applyGroupDelta(
+        createGroupStore(groupsRef.current),
+        { changed: delta.changed ?? [], deleted: delta.deleted ?? [] },
+        { sorted: true, boundary: null, keepEnded: true },
+      );
+      applyGroups(storeToList(next) as VersionedGroup[], delta.version);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Failed to load groups");
+    }
+  }, [user?.email, fetchGroups, applyGroups]);
 
   const createGroup = useCallback(
     async (input: CreateStudyGroupInput) => {
@@ -128,49 +215,36 @@ export function useOrganizerGroups(): UseOrganizerGroupsResult {
       const startDateTime = new Date(`${input.date}T${input.start_time}:00`);
       const endDateTime = new Date(`${input.date}T${input.end_time}:00`);
 
-      const studyGroupData = {
-        subject: input.subject,
-        description: input.description,
-        professor_name: input.professor_name,
-        location: input.location,
-        start_time: startDateTime.toISOString(),
-        end_time: endDateTime.toISOString(),
-        student_limit: input.student_limit,
-        organizer_name: input.organizer_name,
-        organizer_email: user.email.toLowerCase(),
-      };
-
-      const { data: newGroup, error: insertError } = await supabase
-        .from("study_groups")
-        .insert(studyGroupData)
-        .select("id")
+      // One transactional RPC creates the group and adds the organizer as a participant
+      const { data, error: createError } = await supabase
+        .rpc("create_my_study_group", {
+          p_subject: input.subject,
+          p_location: input.location,
+          p_start_time: startDateTime.toISOString(),
+          p_end_time: endDateTime.toISOString(),
+          p_description: input.description,
+          p_professor_name: input.professor_name,
+          p_student_limit: input.student_limit,
+          p_organizer_name: input.organizer_name,
+        })
         .single();
 
-      if (insertError) {
-        throw new Error(insertError.message);
-      }
-
-      // Automatically add organizer as a participant
-      const { error: participantError } = await supabase
-        .from("participants")
-        .insert({
-          study_group_id: newGroup.id,
-          name: input.organizer_name || "Organizer",
-          email: user.email.toLowerCase(),
-        });
-
-      if (participantError) {
-        // Log but don't fail - the group was created successfully
-        console.error(
-          "Failed to add organizer as participant:",
-          participantError.message,
-        );
+      if (createError || !data) {
+        throw new Error(createError?.message ?? "Failed to create group");
       }
-
-      // Refetch to update the list
-      await fetchGroups();
+      const newGroup = data as VersionedGroup;
+      schedulerRef.current?.noteOwnWrite(newGroup.id);
+
+      // Splice the returned row into the list (ordered by start time)
+      applyGroups(
+        [
+          ...groupsRef.current.filter((group) => group.id !== newGroup.id),
+          newGroup,
+        ].sort((a, b) => Date.parse(a.start_time) - Date.parse(b.start_time)),
+        versionRef.current,
+      );
     },
-    [user?.email, fetchGroups],
+    [user?.email, applyGroups],
   );
 
   const updateGroup = useCallback(
@@ -203,11 +277,12 @@ export function useOrganizerGroups(): UseOrganizerGroupsResult {
       if (updateError) {
         throw new Error(updateError.message);
       }
+      schedulerRef.current?.noteOwnWrite(groupId);
 
-      // Refetch to update the list
-      await fetchGroups();
+      // Sync to update the list; the realtime echo of this write is skipped
+      await (schedulerRef.current?.flush() ?? syncGroups());
     },
-    [user?.email, fetchGroups],
+    [user?.email, syncGroups],
   );
 
   const deleteGroup = useCallback(
@@ -225,56 +300,131 @@ export function useOrganizerGroups(): UseOrganizerGroupsResult {
       if (deleteError) {
         throw new Error(deleteError.message);
       }
+      schedulerRef.current?.noteOwnWrite(groupId);
 
-      // Refetch to update the list
-      await fetchGroups();
+      // Sync to update the list; the realtime echo of this write is skipped
+      await (schedulerRef.current?.flush() ?? syncGroups());
     },
-    [user?.email, fetchGroups],
+    [user?.email, syncGroups],
   );
 
   const getParticipants = useCallback(
-    async (groupId: string): Promise<Participant[]> => {
+    async (groupId: string): Promise<GroupParticipant[]> => {
       if (!user?.email) {
         throw new Error("You must be logged in to view participants");
       }
 
-      // First verify this group belongs to the user
-      const { data: group, error: groupError } = await supabase
-        .from("study_groups")
-        .select("id")
-        .eq("id", groupId)
-        .eq("organizer_email", user.email.toLowerCase())
-        .single();
-
-      if (groupError || !group) {
+      // The list only holds groups get_my_dashboard returned for this JWT
+      const group = groupsRef.current.find((g) => g.id === groupId);
+      if (!group) {
         throw new Error("Group not found or access denied");
       }
 
+      const cached = participantsFor(user.email);
+      const hit = cached.get(groupId);
+      if (hit && hit.version === group.version) {
+        return hit.participants;
+      }
+
       const { data, error: fetchError } = await supabase
         .from("participants")
         .select("id, name, email, joined_at")
         .eq("study_group_id", groupId)
-        .order("joined_at", { ascending: true });
+        .order("joined_at", { ascending: true })
+        .order("id", { ascending: true });
 
       if (fetchError) {
         throw new Error(fetchError.message);
       }
 
-      return (data as Participant[]) || [];
+      const participants = (data as GroupParticipant[]) || [];
+      cached.set(groupId, { version: group.version, participants });
+      return participants;
     },
     [user?.email],
   );
 
-  // Initial fetch when user changes
+  // One scheduler per organizer: coalesces realtime bursts and skips echoes
+  // of this client's own writes, which already sync via flush()
+  useEffect(() => {
+    versionRef.current = null;
+    const scheduler = createRefetchScheduler(syncGroups);
+    schedulerRef.current = scheduler;
+    scheduler.flush();
+    return () => {
+      scheduler.dispose();
+      schedulerRef.current = null;
+    };
+  }, [syncGroups]);
+
+  // Keep participant counts current while other students join or leave
   useEffect(() => {
-    fetchGroups();
-  }, [fetchGroups]);
+    if (!user?.email) return;
+
+    const onChange = (id: string | undefined) => {
+      const scheduler = schedulerRef.current;
+      if (!scheduler) return;
+      if (id && scheduler.shouldSkipEcho(id)) return;
+      scheduler.schedule();
+    };
+
+    const channel = supabase
+      .channel(`organizer-groups-${user.email.toLowerCase()}`)
+      .on(
+        "postgres_changes",
+        {
+          event: "INSERT",
+          schema: "public",
+          table: "study_groups",
+          filter: `organizer_email=eq.${user.email.toLowerCase()}`,
+        },
+        (payload: RealtimePostgresChangesPayload<StudyGroup>) => {
+          if (payload.eventType === "INSERT") onChange(payload.new.id);
+        },
+      )
+      .on(
+        "postgres_changes",
+        {
+          event: "UPDATE",
+          schema: "public",
+          table: "study_groups",
+          filter: `organizer_email=eq.${user.email.toLowerCase()}`,
+        },
+        (payload: RealtimePostgresChangesPayload<StudyGroup>) => {
+          if (payload.eventType === "UPDATE") onChange(payload.new.id);
+        },
+      )
+      // Realtime cannot filter DELETE events, so every deletion arrives here;
+      // only ids already on the dashboard are this organizer's
+      .on(
+        "postgres_changes",
+        { event: "DELETE", schema: "public", table: "study_groups" },
+        (payload: RealtimePostgresChangesPayload<StudyGroup>) => {
+          if (payload.eventType !== "DELETE") return;
+          const id = payload.old.id;
+          if (!id || !groupsRef.current.some((group) => group.id === id)) {
+            return;
+          }
+          onChange(id);
+        },
+      )
+      .subscribe();
+
+    return () => {
+      supabase.removeChannel(channel);
+    };
+  }, [user?.email]);
+
+  const refetch = useCallback(
+    () => schedulerRef.current?.flush() ?? syncGroups(),
+    [syncGroups],
+  );
 
   return {
     groups,
     isLoading,
     error,
-    refetch: fetchGroups,
+    refetch,
     createGroup,
     updateGroup,
     deleteGroup,
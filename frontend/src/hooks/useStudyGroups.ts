@@ -1,83 +1,298 @@
 // ABOUTME: Hook for fetching and subscribing to study groups
-// ABOUTME: Provides real-time updates via Supabase subscriptions
+// ABOUTME: Loads the feed page by page, searches server-side, and syncs catalogue/realtime deltas
 
-import { useState, useEffect, useCallback } from "react";
+import { useState, useEffect, useCallback, useRef } from "react";
+import type { RealtimePostgresChangesPayload } from "@supabase/supabase-js";
 import { supabase } from "../lib/supabase";
 import type {
-  StudyGroupWithCounts,
   StudyGroup,
+  StudyGroupWithCounts,
+  StudyGroupsSince,
   ParticipantInsert,
 } from "../lib/database.types";
+import {
+  applyGroupChange,
+  applyGroupDelta,
+  createGroupStore,
+  storeToList,
+  type FeedGroup,
+  type GroupChange,
+  type GroupStore,
+} from "../lib/groupStore";
+import { createPageCache, pageKey } from "../lib/pageCache";
+import {
+  createRefetchScheduler,
+  type RefetchScheduler,
+} from "../lib/refetchScheduler";
 
-interface StudyGroupWithParticipants extends StudyGroup {
-  participants: { count: number }[];
-}
+// Groups requested per page (first paint needs only the first page)
+export const PAGE_SIZE = 24;
+
+// Largest page the listing RPCs will return
+const MAX_PAGE_SIZE = 100;
+
+// The unsearched feed outlives the hook, so returning to the home page
+// only asks for what changed since it was last on screen
+let feedCache: { store: GroupStore; hasMore: boolean; version: number } | null =
+  null;
+
+// Snapshot pages by cursor with their ETags, so re-reading a page that has not
+// changed costs a "not modified" instead of its payload
+const snapshotPages = createPageCache<FeedGroup>();
 
 interface UseStudyGroupsResult {
   groups: StudyGroupWithCounts[];
   isLoading: boolean;
+  isLoadingMore: boolean;
+  hasMore: boolean;
   error: string | null;
   refetch: () => Promise<void>;
+  loadMore: () => Promise<void>;
   joinGroup: (groupId: string, name: string, email: string) => Promise<void>;
 }
 
+/**
+ * Fetch one page of the feed, continuing after the given row.
+ * Uses full-text search when a query is present, otherwise the upcoming-groups
+ * snapshot, revalidating a page fetched before with the ETag it came with.
+ */
+async function fetchPage(
+  query: string,
+  after: FeedGroup | null,
+  limit: number,
+): Promise<FeedGroup[]> {
+  if (query) {
+    const { data, error } = await supabase.rpc("search_study_groups", {
+      p_query: query,
+      p_limit: limit,
+      p_after_rank: after?.rank ?? null,
+      p_after_start_time: after?.start_time ?? null,
+      p_after_id: after?.id ?? null,
+    });
+    if (error) {
+      throw new Error(error.message);
+    }
+    return data || [];
+  }
+
+  // Pages of precomputed card payloads; deltas come from get_study_groups_since
+  const key = pageKey(after, limit);
+  const cached = snapshotPages.get(key);
+  const { data, error } = await supabase.rpc("get_upcoming_groups_snapshot", {
+    p_etag: cached?.etag ?? null,
+    p_limit: limit,
+    p_after_start_time: after?.start_time ?? null,
+    p_after_id: after?.id ?? null,
+  });
+  if (error) {
+    throw new Error(error.message);
+  }
+  if (data?.not_modified && cached) {
+    return cached.rows;
+  }
+  const rows = data?.groups ?? [];
+  if (data) {
+    snapshotPages.set(key, { etag: data.etag, rows });
+  }
+  return rows;
+}
+
+/**
+ * Ask for catalogue changes since a version (null: just the current version).
+ */
+async function fetchSince(version: number | null): Promise<StudyGroupsSince> {
+  const { data, error } = await supabase.rpc("get_study_groups_since", {
+    p_version: version,
+  });
+  if (error) {
+    throw new Error(error.message);
+  }
+  return data as StudyGroupsSince;
+}
+
+/**
+ * Fetch at least `count` rows from the start of the feed, page by page.
+ * @returns The rows and whether more remain on the server
+ */
+async function fetchWindow(
+  query: string,
+  count: number,
+): Promise<{ rows: FeedGroup[]; hasMore: boolean }> {
+  const rows: FeedGroup[] = [];
+  let hasMore = true;
+
+  while (hasMore && rows.length < count) {
+    const limit = Math.min(count - rows.length, MAX_PAGE_SIZE);
+    const page = await fetchPage(query, rows[rows.length - 1] ?? null, limit);
+    rows.push(...page);
+    hasMore = page.length === limit;
+  }
+
+  return { rows, hasMore };
+}
+
 export function useStudyGroups(searchQuery: string = ""): UseStudyGroupsResult {
-  const [groups, setGroups] = useState<StudyGroupWithCounts[]>([]);
+  const [store, setStore] = useState<GroupStore>(() => createGroupStore([]));
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [hasMore, setHasMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  // The query string is already debounced by SearchBar
+  const query = searchQuery.trim();
+
+  // Incremented per reload so responses for a stale query are discarded
+  const requestId = useRef(0);
+  const storeRef = useRef(store);
+  const queryRef = useRef(query);
+  const hasMoreRef = useRef(hasMore);
+  // Catalogue version the store reflects; null while searching or before the first load
+  const versionRef = useRef<number | null>(null);
+  const loadingMoreRef = useRef(false);
+  const schedulerRef = useRef<RefetchScheduler | null>(null);
+
+  const applyStore = useCallback((next: GroupStore) => {
+    storeRef.current = next;
+    setStore(next);
+  }, []);
 
+  const applyHasMore = useCallback((more: boolean) => {
+    hasMoreRef.current = more;
+    setHasMore(more);
+  }, []);
+
+  // Full resync of everything currently on screen (at least one page)
   const fetchGroups = useCallback(async () => {
+    const id = ++requestId.current;
     try {
+      // Version first: anything changed during the load is resent by the next delta
+      const version = query ? null : (await fetchSince(null)).version;
+      const { rows, hasMore: more } = await fetchWindow(
+        query,
+        Math.max(PAGE_SIZE, storeRef.current.order.length),
+      );
+      if (id !== requestId.current) return;
+
       setError(null);
+      versionRef.current = version;
+      applyStore(createGroupStore(rows));
+      applyHasMore(more);
+    } catch (err) {
+      if (id !== requestId.current) return;
+      setError(err instanceof Error ? err.message : "Failed to load groups");
+    } finally {
+      if (id === requestId.current) {
+        setIsLoading(false);
+      }
+    }
+  }, [query, applyStore, applyHasMore]);
 
-      // Fetch study groups with participant counts
-      const { data, error: fetchError } = await supabase
-        .from("study_groups")
-        .select(
-          `
-          *,
-          participants:participants(count)
-        `,
-        )
-        .gt("end_time", new Date().toISOString())
-        .order("start_time", { ascending: true });
-
-      if (fetchError) {
-        throw new Error(fetchError.message);
+  // Bring the loaded rows up to date with only the rows changed since the
+  // last version seen; searches (ranked by the server) reload instead
+  const syncGroups = useCallback(async () => {
+    const since = versionRef.current;
+    if (query || since === null) {
+      return fetchGroups();
+    }
+
+    const id = requestId.current;
+    try {
+      const delta = await fetchSince(since);
+      if (id !== requestId.current) return;
+      if (delta.resync) {
+        return fetchGroups();
       }
 
-      // Transform data to include participant_count and is_full
-      const rawData = data as unknown as StudyGroupWithParticipants[] | null;
-      const groupsWithCounts: StudyGroupWithCounts[] = (rawData || []).map(
-        (group) => {
-          const participantCount = group.participants?.[0]?.count ?? 0;
-          return {
-            id: group.id,
-            subject: group.subject,
-            description: group.description,
-            professor_name: group.professor_name,
-            location: group.location,
-            start_time: group.start_time,
-            end_time: group.end_time,
-            student_limit: group.student_limit,
-            organizer_name: group.organizer_name,
-            created_at: group.created_at,
-            expires_at: group.expires_at,
-            participant_count: participantCount,
-            is_full: group.student_limit
-              ? participantCount >= group.student_limit
-              : false,
-          };
-        },
+      setError(null);
+      versionRef.current = delta.version;
+      if (delta.not_modified) return;
+
+      const list = storeToList(storeRef.current);
+      applyStore(
+        applyGroupDelta(
+          storeRef.current,
+          { changed: delta.changed ?? [], deleted: delta.deleted ?? [] },
+          {
+            sorted: true,
+            boundary: hasMoreRef.current
+              ? (list[list.length - 1] ?? null)
+              : null,
+          },
+        ),
       );
+    } catch (err) {
+      if (id !== requestId.current) return;
+      setError(err instanceof Error ? err.message : "Failed to load groups");
+    }
+  }, [query, fetchGroups, applyStore]);
 
-      setGroups(groupsWithCounts);
+  // Keep the latest sync for the long-lived realtime subscription
+  const syncGroupsRef = useRef(syncGroups);
+  useEffect(() => {
+    syncGroupsRef.current = syncGroups;
+  }, [syncGroups]);
+
+  // Resyncs requested by realtime share one scheduler so a burst costs one request
+  useEffect(() => {
+    const scheduler = createRefetchScheduler(() => syncGroupsRef.current());
+    schedulerRef.current = scheduler;
+    return () => scheduler.dispose();
+  }, []);
+
+  const refetch = useCallback(
+    () => schedulerRef.current?.flush() ?? syncGroups(),
+    [syncGroups],
+  );
+
+  const loadMore = useCallback(async () => {
+    if (loadingMoreRef.current || !hasMoreRef.current) return;
+
+    const id = requestId.current;
+    loadingMoreRef.current = true;
+    setIsLoadingMore(true);
+    try {
+      const current = storeToList(storeRef.current);
+      const page = await fetchPage(
+        query,
+        current[current.length - 1] ?? null,
+        PAGE_SIZE,
+      );
+      if (id !== requestId.current) return;
+
+      // Realtime deltas may have added rows in the meantime; keep the latest copy
+      const merged = [
+        ...current,
+        ...page.filter((row) => !storeRef.current.byId.has(row.id)),
+      ];
+      applyStore(createGroupStore(merged));
+      applyHasMore(page.length === PAGE_SIZE);
     } catch (err) {
+      if (id !== requestId.current) return;
       setError(err instanceof Error ? err.message : "Failed to load groups");
     } finally {
-      setIsLoading(false);
+      loadingMoreRef.current = false;
+      setIsLoadingMore(false);
     }
-  }, []);
+  }, [query, applyStore, applyHasMore]);
+
+  // Apply a realtime change to the loaded rows; resync only if versions were skipped
+  const applyChange = useCallback(
+    (change: GroupChange) => {
+      const list = storeToList(storeRef.current);
+      const { store: next, gapDetected } = applyGroupChange(
+        storeRef.current,
+        change,
+        {
+          sorted: !queryRef.current,
+          boundary: hasMoreRef.current ? (list[list.length - 1] ?? null) : null,
+        },
+      );
+      applyStore(next);
+      if (gapDetected) {
+        schedulerRef.current?.schedule();
+      }
+    },
+    [applyStore],
+  );
 
   const joinGroup = useCallback(
     async (groupId: string, name: string, email: string) => {
@@ -102,34 +317,44 @@ export function useStudyGroups(searchQuery: string = ""): UseStudyGroupsResult {
         throw new Error(insertError.message);
       }
 
-      // Email notifications disabled - Resend requires domain verification
-      // TODO: Re-enable when a verified domain is available
-      // if (insertedParticipant) {
-      //   supabase.functions
-      //     .invoke("on-participant-joined", {
-      //       body: {
-      //         participant_id: insertedParticipant.id,
-      //         participant_name: name,
-      //         participant_email: email,
-      //         study_group_id: groupId,
-      //       },
-      //     })
-      //     .catch((err) => console.error("Failed to send join emails:", err));
-      // }
-
-      // Refetch to get updated counts
-      await fetchGroups();
+      // Join emails are queued by a database trigger (notification_outbox)
+      // and sent by the process-notification-outbox worker, never on this path.
+
+      // The updated participant_count arrives as a realtime study_groups UPDATE
     },
-    [fetchGroups],
+    [],
   );
 
-  // Initial fetch
+  // Start over from the first page whenever the query changes, or pick up
+  // the cached feed and sync what changed while it was off screen
   useEffect(() => {
+    queryRef.current = query;
+    if (!query && feedCache) {
+      versionRef.current = feedCache.version;
+      applyStore(feedCache.store);
+      applyHasMore(feedCache.hasMore);
+      setIsLoading(false);
+      syncGroups();
+      return;
+    }
+    versionRef.current = null;
+    storeRef.current = createGroupStore([]);
     fetchGroups();
-  }, [fetchGroups]);
+  }, [query, fetchGroups, syncGroups, applyStore, applyHasMore]);
 
-  // Set up real-time subscription
+  // Skips renders still showing search results while the cached feed is restored
   useEffect(() => {
+    if (!query && versionRef.current !== null && store === storeRef.current) {
+      feedCache = { store, hasMore, version: versionRef.current };
+    }
+  }, [query, store, hasMore]);
+
+  // Set up real-time subscription.
+  // Joins and leaves update study_groups.participant_count, so the group's
+  // UPDATE payload already carries the new count; no participants feed needed.
+  useEffect(() => {
+    let hasSubscribed = false;
+
     const channel = supabase
       .channel("study-groups-changes")
       .on(
@@ -139,47 +364,38 @@ export function useStudyGroups(searchQuery: string = ""): UseStudyGroupsResult {
           schema: "public",
           table: "study_groups",
         },
-        () => {
-          fetchGroups();
+        (payload: RealtimePostgresChangesPayload<StudyGroup>) => {
+          if (payload.eventType === "DELETE") {
+            if (payload.old.id) {
+              applyChange({ type: "DELETE", id: payload.old.id });
+            }
+            return;
+          }
+          applyChange({ type: payload.eventType, row: payload.new });
         },
       )
-      .on(
-        "postgres_changes",
-        {
-          event: "*",
-          schema: "public",
-          table: "participants",
-        },
-        () => {
-          fetchGroups();
-        },
-      )
-      .subscribe();
+      .subscribe((status) => {
+        if (status !== "SUBSCRIBED") return;
+        // Events may have been missed while disconnected
+        if (hasSubscribed) {
+          schedulerRef.current?.schedule();
+        }
+        hasSubscribed = true;
+      });
 
     return () => {
       supabase.removeChannel(channel);
     };
-  }, [fetchGroups]);
-
-  // Filter groups based on search query
-  const filteredGroups = searchQuery
-    ? groups.filter((group) => {
-        const query = searchQuery.toLowerCase();
-        return (
-          group.subject.toLowerCase().includes(query) ||
-          group.location.toLowerCase().includes(query) ||
-          (group.professor_name?.toLowerCase().includes(query) ?? false) ||
-          (group.organizer_name?.toLowerCase().includes(query) ?? false) ||
-          (group.description?.toLowerCase().includes(query) ?? false)
-        );
-      })
-    : groups;
+  }, [applyChange]);
 
   return {
-    groups: filteredGroups,
+    groups: storeToList(store),
     isLoading,
+    isLoadingMore,
+    hasMore,
     error,
-    refetch: fetchGroups,
+    refetch,
+    loadMore,
     joinGroup,
   };
 }
@@ -26,6 +26,11 @@ export interface Database {
           organizer_email: string;
           created_at: string;
           expires_at: string;
+          participant_count: number;
+          time_range: string;
+          search_vector: string;
+          search_text: string;
+          version: number;
         };
         Insert: {
           id?: string;
@@ -93,6 +98,50 @@ export interface Database {
       [_ in never]: never;
     };
     Functions: {
+      get_study_groups_page: {
+        Args: {
+          p_limit?: number;
+          p_after_start_time?: string | null;
+          p_after_id?: string | null;
+        };
+        Returns: (StudyGroupWithCounts & { version: number })[];
+      };
+      get_upcoming_groups_snapshot: {
+        Args: {
+          p_etag?: string | null;
+          p_limit?: number;
+          p_after_start_time?: string | null;
+          p_after_id?: string | null;
+        };
+        Returns: UpcomingGroupsSnapshot;
+      };
+      get_study_groups_since: {
+        Args: { p_version?: number | null; p_mine?: boolean };
+        Returns: StudyGroupsSince;
+      };
+      search_study_groups: {
+        Args: {
+          p_query: string;
+          p_limit?: number;
+          p_after_rank?: number | null;
+          p_after_start_time?: string | null;
+          p_after_id?: string | null;
+        };
+        Returns: (StudyGroupWithCounts & { version: number; rank: number })[];
+      };
+      create_my_study_group: {
+        Args: {
+          p_subject: string;
+          p_location: string;
+          p_start_time: string;
+          p_end_time: string;
+          p_description?: string | null;
+          p_professor_name?: string | null;
+          p_student_limit?: number | null;
+          p_organizer_name?: string | null;
+        };
+        Returns: VersionedGroup[];
+      };
       get_participant_count: {
         Args: { p_study_group_id: string };
         Returns: number;
@@ -105,6 +154,14 @@ export interface Database {
         Args: { p_study_group_id: string; p_email: string };
         Returns: boolean;
       };
+      get_my_dashboard: {
+        Args: { p_preview_limit?: number };
+        Returns: MyDashboard;
+      };
+      get_group_page: {
+        Args: { p_study_group_id: string; p_requester_email?: string | null };
+        Returns: GroupPageData | null;
+      };
       get_group_participants_if_member: {
         Args: { p_study_group_id: string; p_requester_email: string };
         Returns: {
@@ -140,6 +197,67 @@ export interface StudyGroupWithCounts {
   is_full: boolean;
 }
 
+/**
+ * Result of get_upcoming_groups_snapshot: one keyset page of `groups`,
+ * omitted when the ETag passed in is still current (`not_modified`).
+ */
+export interface UpcomingGroupsSnapshot {
+  etag: string;
+  not_modified: boolean;
+  groups?: VersionedGroup[];
+}
+
+/**
+ * Result of get_study_groups_since. `resync` asks for a full load
+ * (followed by syncing from `version`); otherwise either `not_modified`
+ * or the rows changed and ids deleted since the version passed in.
+ */
+export interface StudyGroupsSince {
+  version: number;
+  resync?: boolean;
+  not_modified?: boolean;
+  changed?: VersionedGroup[];
+  deleted?: string[];
+}
+
+/** A listing row with its study_groups.version. */
+export type VersionedGroup = StudyGroupWithCounts & { version: number };
+
+/** A participant as shown to the group's members and organizer. */
+export interface GroupParticipant {
+  id: string;
+  name: string;
+  email: string;
+  joined_at: string;
+}
+
+/**
+ * Result of get_group_page: the group, the requester's role and the
+ * participants they may see (none for visitors).
+ */
+export interface GroupPageData {
+  group: VersionedGroup;
+  role: "organizer" | "participant" | "visitor";
+  participants: GroupParticipant[];
+}
+
+/**
+ * A get_my_dashboard group with its first participants; the preview is
+ * complete when its length equals participant_count.
+ */
+export type DashboardGroup = VersionedGroup & {
+  participants: GroupParticipant[];
+};
+
+/**
+ * Result of get_my_dashboard: the caller's groups, and the version to sync
+ * them from with get_study_groups_since.
+ */
+export interface MyDashboard {
+  version: number;
+  groups: DashboardGroup[];
+}
+
 export type StudyGroup = Database["public"]["Tables"]["study_groups"]["Row"];
 export type Participant = Database["public"]["Tables"]["participants"]["Row"];
 export type ParticipantInsert =
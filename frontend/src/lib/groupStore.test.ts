@@ -0,0 +1,189 @@
+// ABOUTME: Tests for the keyed study group store
+// ABOUTME: Verifies ordering, version handling and loaded-window rules for realtime and catalogue deltas
+
+import { describe, it, expect } from 'vitest'
+import type { StudyGroup } from './database.types'
+import { applyGroupChange, applyGroupDelta, createGroupStore, storeToList } from './groupStore'
+import { toStudyGroupWithCounts } from './studyGroups'
+
+const now = new Date('2026-01-20T12:00:00Z')
+
+function makeRow(overrides: Partial<StudyGroup> = {}): StudyGroup {
+  return {
+    id: 'b',
+    subject: 'Calculus I',
+    description: null,
+    professor_name: 'Smith',
+    location: 'Butler Library',
+    start_time: '2026-01-21T14:00:00Z',
+    end_time: '2026-01-21T16:00:00Z',
+    student_limit: 3,
+    organizer_name: 'John Doe',
+    organizer_email: 'john@columbia.edu',
+    created_at: '2026-01-17T10:00:00Z',
+    expires_at: '2026-01-21T16:00:00Z',
+    participant_count: 1,
+    time_range: '',
+    search_vector: '',
+    search_text: '',
+    version: 1,
+    ...overrides,
+  }
+}
+
+function makeStore() {
+  const first = applyGroupChange(
+    createGroupStore([]),
+    { type: 'INSERT', row: makeRow({ id: 'a', start_time: '2026-01-21T10:00:00Z' }) },
+    { sorted: true, boundary: null, now },
+  ).store
+  return applyGroupChange(
+    first,
+    { type: 'INSERT', row: makeRow({ id: 'c', start_time: '2026-01-21T18:00:00Z', end_time: '2026-01-21T20:00:00Z' }) },
+    { sorted: true, boundary: null, now },
+  ).store
+}
+
+describe('applyGroupChange', () => {
+  it('inserts new rows in start time order', () => {
+    const { store } = applyGroupChange(
+      makeStore(),
+      { type: 'INSERT', row: makeRow() },
+      { sorted: true, boundary: null, now },
+    )
+    expect(storeToList(store).map((g) => g.id)).toEqual(['a', 'b', 'c'])
+  })
+
+  it('updates the participant count from an UPDATE payload', () => {
+    const { store, gapDetected } = applyGroupChange(
+      makeStore(),
+      { type: 'UPDATE', row: makeRow({ id: 'a', start_time: '2026-01-21T10:00:00Z', participant_count: 3, version: 2 }) },
+      { sorted: true, boundary: null, now },
+    )
+    const group = store.byId.get('a')!
+    expect(group.participant_count).toBe(3)
+    expect(group.is_full).toBe(true)
+    expect(gapDetected).toBe(false)
+  })
+
+  it('ignores stale or duplicate versions', () => {
+    const before = makeStore()
+    const { store } = applyGroupChange(
+      before,
+      { type: 'UPDATE', row: makeRow({ id: 'a', participant_count: 0, version: 1 }) },
+      { sorted: true, boundary: null, now },
+    )
+    expect(store).toBe(before)
+  })
+
+  it('reports a gap when versions were skipped', () => {
+    const { gapDetected } = applyGroupChange(
+      makeStore(),
+      { type: 'UPDATE', row: makeRow({ id: 'a', start_time: '2026-01-21T10:00:00Z', version: 4 }) },
+      { sorted: true, boundary: null, now },
+    )
+    expect(gapDetected).toBe(true)
+  })
+
+  it('removes deleted rows', () => {
+    const { store } = applyGroupChange(
+      makeStore(),
+      { type: 'DELETE', id: 'a' },
+      { sorted: true, boundary: null, now },
+    )
+    expect(storeToList(store).map((g) => g.id)).toEqual(['c'])
+  })
+
+  it('removes groups that have ended', () => {
+    const { store } = applyGroupChange(
+      makeStore(),
+      { type: 'UPDATE', row: makeRow({ id: 'a', end_time: '2026-01-20T11:00:00Z', version: 2 }) },
+      { sorted: true, boundary: null, now },
+    )
+    expect(store.byId.has('a')).toBe(false)
+  })
+
+  it('leaves rows past the loaded window for the next page', () => {
+    const before = makeStore()
+    const boundary = before.byId.get('a')!
+    const { store } = applyGroupChange(
+      before,
+      { type: 'INSERT', row: makeRow() },
+      { sorted: true, boundary, now },
+    )
+    expect(store.byId.has('b')).toBe(false)
+  })
+
+  it('only updates existing rows in search mode', () => {
+    const before = createGroupStore([
+      { ...storeToList(makeStore())[1], rank: 0.9, version: 1 },
+    ])
+    const inserted = applyGroupChange(
+      before,
+      { type: 'INSERT', row: makeRow() },
+      { sorted: false, boundary: null, now },
+    ).store
+    expect(inserted.byId.has('b')).toBe(false)
+
+    const { store } = applyGroupChange(
+      before,
+      { type: 'UPDATE', row: makeRow({ id: 'c', start_time: '2026-01-21T18:00:00Z', end_time: '2026-01-21T20:00:00Z', participant_count: 2, version: 2 }) },
+      { sorted: false, boundary: null, now },
+    )
+    expect(store.byId.get('c')!.participant_count).toBe(2)
+    expect(store.byId.get('c')!.rank).toBe(0.9)
+  })
+})
+
+describe('applyGroupDelta', () => {
+  function payload(overrides: Partial<StudyGroup> = {}) {
+    const row = makeRow(overrides)
+    return { ...toStudyGroupWithCounts(row), version: row.version }
+  }
+
+  it('applies changed rows and tombstones in one pass', () => {
+    const store = applyGroupDelta(
+      makeStore(),
+      {
+        changed: [
+          payload(),
+          payload({ id: 'a', start_time: '2026-01-21T10:00:00Z', participant_count: 2, version: 3 }),
+        ],
+        deleted: ['c'],
+      },
+      { sorted: true, boundary: null, now },
+    )
+    expect(storeToList(store).map((g) => g.id)).toEqual(['a', 'b'])
+    expect(store.byId.get('a')!.participant_count).toBe(2)
+  })
+
+  it('keeps newer rows already applied from realtime', () => {
+    const before = applyGroupChange(
+      makeStore(),
+      { type: 'UPDATE', row: makeRow({ id: 'a', start_time: '2026-01-21T10:00:00Z', participant_count: 3, version: 3 }) },
+      { sorted: true, boundary: null, now },
+    ).store
+    const store = applyGroupDelta(
+      before,
+      { changed: [payload({ id: 'a', start_time: '2026-01-21T10:00:00Z', participant_count: 2, version: 2 })], deleted: [] },
+      { sorted: true, boundary: null, now },
+    )
+    expect(store.byId.get('a')!.participant_count).toBe(3)
+  })
+
+  it('drops unchanged groups that have ended since the last sync', () => {
+    const later = new Date('2026-01-21T17:00:00Z')
+    const store = applyGroupDelta(makeStore(), { changed: [], deleted: [] }, { sorted: true, boundary: null, now: later })
+    expect(storeToList(store).map((g) => g.id)).toEqual(['c'])
+  })
+
+  it('keeps ended groups when asked to', () => {
+    const later = new Date('2026-01-21T17:00:00Z')
+    const store = applyGroupDelta(
+      makeStore(),
+      { changed: [payload({ id: 'a', start_time: '2026-01-21T10:00:00Z', end_time: '2026-01-21T12:00:00Z', version: 2 })], deleted: [] },
+      { sorted: true, boundary: null, now: later, keepEnded: true },
+    )
+    expect(storeToList(store).map((g) => g.id)).toEqual(['a', 'c'])
+  })
+})
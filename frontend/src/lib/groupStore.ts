@@ -0,0 +1,174 @@
+// ABOUTME: Keyed in-memory store for the study group feed
+// ABOUTME: Applies realtime INSERT/UPDATE/DELETE events and catalogue deltas without refetching the list
+
+import type { StudyGroupWithCounts, VersionedGroup } from "./database.types";
+import { toStudyGroupWithCounts, type StudyGroupListRow } from "./studyGroups";
+
+/** A feed entry: search results carry a rank, every row carries its version. */
+export type FeedGroup = StudyGroupWithCounts & { rank?: number; version?: number };
+
+export interface GroupStore {
+  byId: ReadonlyMap<string, FeedGroup>;
+  order: readonly string[];
+}
+
+export type GroupChange =
+  | { type: "INSERT" | "UPDATE"; row: StudyGroupListRow & { version: number } }
+  | { type: "DELETE"; id: string };
+
+/** Rows changed and ids deleted since a catalogue version (get_study_groups_since). */
+export interface GroupDelta {
+  changed: VersionedGroup[];
+  deleted: string[];
+}
+
+export interface ApplyOptions {
+  /** Keep rows ordered by (start_time, id) and accept new rows. False for ranked search results. */
+  sorted: boolean;
+  /** Last loaded row when more pages remain; rows sorting after it are not loaded yet. */
+  boundary: FeedGroup | null;
+  /** Current time, used to drop groups that have ended. */
+  now?: Date;
+  /** Keep groups that have ended (the organizer dashboard lists them until cleanup). */
+  keepEnded?: boolean;
+}
+
+export interface ApplyResult {
+  store: GroupStore;
+  /** True when the change skipped one or more versions of a row we hold. */
+  gapDetected: boolean;
+}
+
+/**
+ * Build a store from rows in display order.
+ * @param rows - Rows as returned by the listing or search RPC
+ */
+export function createGroupStore(rows: FeedGroup[]): GroupStore {
+  return {
+    byId: new Map(rows.map((row) => [row.id, row])),
+    order: rows.map((row) => row.id),
+  };
+}
+
+/**
+ * List the store's groups in display order.
+ */
+export function storeToList(store: GroupStore): FeedGroup[] {
+  return store.order
+    .map((id) => store.byId.get(id))
+    .filter((group): group is FeedGroup => group !== undefined);
+}
+
+/**
+ * Compare two groups by the feed's (start_time, id) keyset order.
+ */
+export function compareFeedOrder(
+  a: Pick<FeedGroup, "start_time" | "id">,
+  b: Pick<FeedGroup, "start_time" | "id">,
+): number {
+  const byTime = Date.parse(a.start_time) - Date.parse(b.start_time);
+  if (byTime !== 0) return byTime;
+  return a.id < b.id ? -1 : a.id > b.id ? 1 : 0;
+}
+
+function withoutId(store: GroupStore, id: string): GroupStore {
+  if (!store.byId.has(id)) return store;
+  const byId = new Map(store.byId);
+  byId.delete(id);
+  return { byId, order: store.order.filter((existing) => existing !== id) };
+}
+
+/**
+ * Apply one realtime change to the store.
+ * @param store - Current store (not mutated)
+ * @param change - The INSERT, UPDATE or DELETE payload
+ * @param options - Ordering mode and loaded-window boundary
+ * @returns The new store and whether a version gap was seen
+ */
+export function applyGroupChange(
+  store: GroupStore,
+  change: GroupChange,
+  options: ApplyOptions,
+): ApplyResult {
+  if (change.type === "DELETE") {
+    return { store: withoutId(store, change.id), gapDetected: false };
+  }
+
+  const now = options.now ?? new Date();
+  const existing = store.byId.get(change.row.id);
+  const incoming: FeedGroup = {
+    ...toStudyGroupWithCounts(change.row),
+    version: change.row.version,
+    rank: existing?.rank,
+  };
+
+  // Ignore stale or duplicate deliveries
+  if (
+    existing?.version !== undefined &&
+    incoming.version !== undefined &&
+    incoming.version <= existing.version
+  ) {
+    return { store, gapDetected: false };
+  }
+
+  const gapDetected =
+    existing?.version !== undefined &&
+    incoming.version !== undefined &&
+    incoming.version > existing.version + 1;
+
+  // Ended groups leave the feed
+  if (!options.keepEnded && Date.parse(incoming.end_time) <= now.getTime()) {
+    return { store: withoutId(store, incoming.id), gapDetected };
+  }
+
+  // Ranked results: update rows in place, never guess whether a new row matches
+  if (!options.sorted) {
+    if (!existing) return { store, gapDetected };
+    const byId = new Map(store.byId);
+    byId.set(incoming.id, incoming);
+    return { store: { byId, order: store.order }, gapDetected };
+  }
+
+  // Rows past the loaded window arrive with the next page instead
+  const base = withoutId(store, incoming.id);
+  if (options.boundary && compareFeedOrder(incoming, options.boundary) > 0) {
+    return { store: base, gapDetected };
+  }
+
+  const byId = new Map(base.byId);
+  byId.set(incoming.id, incoming);
+  const order = [...base.order];
+  const index = order.findIndex(
+    (id) => compareFeedOrder(incoming, byId.get(id)!) < 0,
+  );
+  order.splice(index === -1 ? order.length : index, 0, incoming.id);
+
+  return { store: { byId, order }, gapDetected };
+}
+
+/**
+ * Apply a catalogue delta: deletes, then each changed row as an UPDATE.
+ * Rows already held at the same or a newer version are left alone, so a
+ * delta that overlaps earlier realtime events is harmless. Unless
+ * `keepEnded` is set, groups that ended since the last sync are dropped too,
+ * since ending is a matter of time and never shows up as a change.
+ * @param store - Current store (not mutated)
+ * @param delta - Response of get_study_groups_since
+ * @param options - Ordering mode and loaded-window boundary
+ */
+export function applyGroupDelta(
+  store: GroupStore,
+  delta: GroupDelta,
+  options: ApplyOptions,
+): GroupStore {
+  let next = delta.deleted.reduce(withoutId, store);
+  for (const row of delta.changed) {
+    next = applyGroupChange(next, { type: "UPDATE", row }, options).store;
+  }
+  if (options.keepEnded) return next;
+
+  const now = (options.now ?? new Date()).getTime();
+  return storeToList(next)
+    .filter((group) => Date.parse(group.end_time) <= now)
+    .reduce((current, group) => withoutId(current, group.id), next);
+}
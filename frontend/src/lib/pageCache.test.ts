@@ -0,0 +1,45 @@
+// ABOUTME: Tests for the per-page ETag cache
+// ABOUTME: Verifies cursor keys, lookups and eviction of the oldest pages
+
+import { describe, it, expect } from 'vitest'
+import { createPageCache, pageKey } from './pageCache'
+
+describe('pageKey', () => {
+  it('distinguishes the first page, cursors and limits', () => {
+    const after = { start_time: '2026-02-01T10:00:00+00:00', id: 'a' }
+
+    expect(pageKey(null, 24)).not.toBe(pageKey(after, 24))
+    expect(pageKey(after, 24)).not.toBe(pageKey(after, 100))
+    expect(pageKey(after, 24)).toBe(pageKey({ ...after }, 24))
+  })
+})
+
+describe('createPageCache', () => {
+  it('returns the rows and ETag a page was stored with', () => {
+    const cache = createPageCache<string>()
+    cache.set('p1', { etag: '1:100', rows: ['a', 'b'] })
+
+    expect(cache.get('p1')).toEqual({ etag: '1:100', rows: ['a', 'b'] })
+    expect(cache.get('p2')).toBeUndefined()
+  })
+
+  it('replaces a page stored again under the same key', () => {
+    const cache = createPageCache<string>()
+    cache.set('p1', { etag: '1:100', rows: ['a'] })
+    cache.set('p1', { etag: '2:200', rows: ['b'] })
+
+    expect(cache.get('p1')).toEqual({ etag: '2:200', rows: ['b'] })
+  })
+
+  it('drops the oldest stored pages past the limit', () => {
+    const cache = createPageCache<string>(2)
+    cache.set('p1', { etag: 'e', rows: [] })
+    cache.set('p2', { etag: 'e', rows: [] })
+    cache.set('p1', { etag: 'e', rows: [] })
+    cache.set('p3', { etag: 'e', rows: [] })
+
+    expect(cache.get('p2')).toBeUndefined()
+    expect(cache.get('p1')).toBeDefined()
+    expect(cache.get('p3')).toBeDefined()
+  })
+})
@@ -0,0 +1,53 @@
+// ABOUTME: Remembers listing pages by cursor together with the ETag each was served under
+// ABOUTME: A refetch sends the page's ETag and reuses the kept rows when the server says "not modified"
+
+export interface CachedPage<T> {
+  etag: string;
+  rows: T[];
+}
+
+export interface PageCache<T> {
+  /** The page last served for this key, if still kept. */
+  get: (key: string) => CachedPage<T> | undefined;
+  /** Keep a page, dropping the longest-kept ones past the limit. */
+  set: (key: string, page: CachedPage<T>) => void;
+}
+
+const DEFAULT_MAX_PAGES = 50;
+
+/**
+ * Key for the page that continues after `after` (null: the first page).
+ * The limit is part of the key: the same cursor with another limit is another page.
+ */
+export function pageKey(
+  after: { start_time: string; id: string } | null,
+  limit: number,
+): string {
+  return after ? `${after.start_time}|${after.id}|${limit}` : `|${limit}`;
+}
+
+/**
+ * Create an empty cache.
+ * @param maxPages - Pages kept at most; the oldest stored page goes first
+ */
+export function createPageCache<T>(
+  maxPages: number = DEFAULT_MAX_PAGES,
+): PageCache<T> {
+  const pages = new Map<string, CachedPage<T>>();
+
+  const set = (key: string, page: CachedPage<T>) => {
+    // Re-inserting moves the key to the end of the eviction order
+    pages.delete(key);
+    pages.set(key, page);
+    while (pages.size > maxPages) {
+      const oldest = pages.keys().next().value;
+      if (oldest === undefined) break;
+      pages.delete(oldest);
+    }
+  };
+
+  return {
+    get: (key) => pages.get(key),
+    set,
+  };
+}
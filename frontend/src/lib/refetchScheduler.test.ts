@@ -0,0 +1,95 @@
+// ABOUTME: Tests for the refetch scheduler
+// ABOUTME: Verifies burst coalescing, in-flight dedupe, echo suppression and counters
+
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest'
+import { createRefetchScheduler } from './refetchScheduler'
+
+function deferred() {
+  let resolve!: () => void
+  const promise = new Promise<void>((r) => {
+    resolve = r
+  })
+  return { promise, resolve }
+}
+
+describe('createRefetchScheduler', () => {
+  beforeEach(() => {
+    vi.useFakeTimers()
+  })
+
+  afterEach(() => {
+    vi.useRealTimers()
+  })
+
+  it('merges a burst of requests into one fetch per window', async () => {
+    const run = vi.fn().mockResolvedValue(undefined)
+    const scheduler = createRefetchScheduler(run, { windowMs: 100 })
+
+    for (let i = 0; i < 10; i++) {
+      scheduler.schedule()
+    }
+    await vi.advanceTimersByTimeAsync(100)
+
+    expect(run).toHaveBeenCalledTimes(1)
+    expect(scheduler.getStats()).toEqual({ issued: 1, suppressed: 9 })
+  })
+
+  it('joins an in-flight fetch and runs one trailing fetch', async () => {
+    const first = deferred()
+    const run = vi.fn()
+      .mockReturnValueOnce(first.promise)
+      .mockResolvedValue(undefined)
+    const scheduler = createRefetchScheduler(run)
+
+    const a = scheduler.flush()
+    const b = scheduler.flush()
+    const c = scheduler.flush()
+    expect(b).toBe(a)
+    expect(c).toBe(a)
+
+    first.resolve()
+    await a
+
+    expect(run).toHaveBeenCalledTimes(2)
+    expect(scheduler.getStats()).toEqual({ issued: 2, suppressed: 1 })
+  })
+
+  it('flush cancels a pending window', async () => {
+    const run = vi.fn().mockResolvedValue(undefined)
+    const scheduler = createRefetchScheduler(run, { windowMs: 100 })
+
+    scheduler.schedule()
+    await scheduler.flush()
+    await vi.advanceTimersByTimeAsync(100)
+
+    expect(run).toHaveBeenCalledTimes(1)
+  })
+
+  it('skips echoes of own writes until they expire', () => {
+    let clock = 0
+    const scheduler = createRefetchScheduler(vi.fn(), {
+      echoTtlMs: 1000,
+      now: () => clock,
+    })
+
+    scheduler.noteOwnWrite('group-1')
+    expect(scheduler.shouldSkipEcho('group-1')).toBe(true)
+    expect(scheduler.shouldSkipEcho('group-2')).toBe(false)
+
+    clock = 1000
+    expect(scheduler.shouldSkipEcho('group-1')).toBe(false)
+    expect(scheduler.getStats().suppressed).toBe(1)
+  })
+
+  it('ignores requests after dispose', async () => {
+    const run = vi.fn().mockResolvedValue(undefined)
+    const scheduler = createRefetchScheduler(run, { windowMs: 100 })
+
+    scheduler.schedule()
+    scheduler.dispose()
+    await vi.advanceTimersByTimeAsync(100)
+    await scheduler.flush()
+
+    expect(run).not.toHaveBeenCalled()
+  })
+})
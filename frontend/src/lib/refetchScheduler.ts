@@ -0,0 +1,132 @@
+// ABOUTME: Coalesces refetch requests triggered by realtime events and local writes
+// ABOUTME: One fetch per burst window, no duplicate in-flight fetches, own-write echoes skipped
+
+export interface RefetchStats {
+  /** Fetches actually sent */
+  issued: number;
+  /** Requests absorbed by a pending window, an in-flight fetch or the echo filter */
+  suppressed: number;
+}
+
+export interface RefetchSchedulerOptions {
+  /** Events within this window after the first one share a single fetch */
+  windowMs?: number;
+  /** How long realtime events for a locally written row count as echoes */
+  echoTtlMs?: number;
+  /** Clock, injectable for tests */
+  now?: () => number;
+}
+
+export interface RefetchScheduler {
+  /** Request a refetch at the end of the current window. */
+  schedule: () => void;
+  /** Refetch now, or join the fetch that is already running. */
+  flush: () => Promise<void>;
+  /** Record a write made by this client so its realtime echo can be ignored. */
+  noteOwnWrite: (key: string) => void;
+  /** True (and counted as suppressed) when an event is the echo of a recent own write. */
+  shouldSkipEcho: (key: string) => boolean;
+  getStats: () => RefetchStats;
+  /** Cancel any pending window; later requests are ignored. */
+  dispose: () => void;
+}
+
+const DEFAULT_WINDOW_MS = 250;
+const DEFAULT_ECHO_TTL_MS = 5000;
+
+/**
+ * Create a scheduler around a fetch function.
+ * @param run - Performs the refetch; should not throw (report errors via state)
+ * @param options - Window and echo timing
+ */
+export function createRefetchScheduler(
+  run: () => Promise<void>,
+  options: RefetchSchedulerOptions = {},
+): RefetchScheduler {
+  const windowMs = options.windowMs ?? DEFAULT_WINDOW_MS;
+  const echoTtlMs = options.echoTtlMs ?? DEFAULT_ECHO_TTL_MS;
+  const now = options.now ?? Date.now;
+
+  const stats: RefetchStats = { issued: 0, suppressed: 0 };
+  const ownWrites = new Map<string, number>();
+  let timer: ReturnType<typeof setTimeout> | null = null;
+  let inFlight: Promise<void> | null = null;
+  // Set when a request arrives mid-fetch: the running fetch may predate it
+  let stale = false;
+  let disposed = false;
+
+  const execute = async () => {
+    do {
+      stale = false;
+      stats.issued += 1;
+      await run();
+    } while (stale && !disposed);
+  };
+
+  const flush = (): Promise<void> => {
+    if (timer !== null) {
+      clearTimeout(timer);
+      timer = null;
+    }
+    if (disposed) return Promise.resolve();
+
+    if (inFlight) {
+      // One trailing fetch covers every request made while this one runs
+      if (stale) {
+        stats.suppressed += 1;
+      }
+      stale = true;
+      return inFlight;
+    }
+
+    inFlight = execute().finally(() => {
+      inFlight = null;
+    });
+    return inFlight;
+  };
+
+  const schedule = () => {
+    if (disposed) return;
+    if (timer !== null) {
+      stats.suppressed += 1;
+      return;
+    }
+    timer = setTimeout(() => {
+      timer = null;
+      flush();
+    }, windowMs);
+  };
+
+  const noteOwnWrite = (key: string) => {
+    ownWrites.set(key, now() + echoTtlMs);
+  };
+
+  const shouldSkipEcho = (key: string) => {
+    const expiresAt = ownWrites.get(key);
+    if (expiresAt === undefined) return false;
+    if (expiresAt <= now()) {
+      ownWrites.delete(key);
+      return false;
+    }
+    stats.suppressed += 1;
+    return true;
+  };
+
+  const dispose = () => {
+    disposed = true;
+    if (timer !== null) {
+      clearTimeout(timer);
+      timer = null;
+    }
+    ownWrites.clear();
+  };
+
+  return {
+    schedule,
+    flush,
+    noteOwnWrite,
+    shouldSkipEcho,
+    getStats: () => ({ ...stats }),
+    dispose,
+  };
+}
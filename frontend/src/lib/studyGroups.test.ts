@@ -0,0 +1,42 @@
+// ABOUTME: Tests for study group row helpers
+// ABOUTME: Verifies participant count and full-flag mapping
+
+import { describe, it, expect } from 'vitest'
+import { toStudyGroupWithCounts } from './studyGroups'
+
+const baseRow = {
+  id: '1',
+  subject: 'Calculus I',
+  description: null,
+  professor_name: 'Smith',
+  location: 'Butler Library',
+  start_time: '2026-01-20T14:00:00-05:00',
+  end_time: '2026-01-20T16:00:00-05:00',
+  student_limit: 3,
+  organizer_name: 'John Doe',
+  created_at: '2026-01-17T10:00:00-05:00',
+  expires_at: '2026-01-20T16:00:00-05:00',
+  participant_count: 2,
+}
+
+describe('toStudyGroupWithCounts', () => {
+  it('copies the maintained participant count', () => {
+    const result = toStudyGroupWithCounts(baseRow)
+    expect(result.participant_count).toBe(2)
+    expect(result.is_full).toBe(false)
+  })
+
+  it('marks a group full when the count reaches the limit', () => {
+    const result = toStudyGroupWithCounts({ ...baseRow, participant_count: 3 })
+    expect(result.is_full).toBe(true)
+  })
+
+  it('never marks unlimited groups full', () => {
+    const result = toStudyGroupWithCounts({
+      ...baseRow,
+      student_limit: null,
+      participant_count: 500,
+    })
+    expect(result.is_full).toBe(false)
+  })
+})
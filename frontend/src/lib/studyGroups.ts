@@ -0,0 +1,54 @@
+// ABOUTME: Shared helpers for study group list rows
+// ABOUTME: Column list for PostgREST selects and row → StudyGroupWithCounts mapping
+
+import type { StudyGroup, StudyGroupWithCounts } from "./database.types";
+
+/**
+ * Columns needed to render a study group card.
+ * Avoids `*`, which would also ship the generated search/range columns.
+ */
+export const STUDY_GROUP_LIST_COLUMNS =
+  "id, subject, description, professor_name, location, start_time, end_time, student_limit, organizer_name, created_at, expires_at, participant_count";
+
+export type StudyGroupListRow = Pick<
+  StudyGroup,
+  | "id"
+  | "subject"
+  | "description"
+  | "professor_name"
+  | "location"
+  | "start_time"
+  | "end_time"
+  | "student_limit"
+  | "organizer_name"
+  | "created_at"
+  | "expires_at"
+  | "participant_count"
+>;
+
+/**
+ * Convert a study_groups row into the shape used by list components.
+ * @param group - Row selected with STUDY_GROUP_LIST_COLUMNS
+ * @returns The group with its participant count and full flag
+ */
+export function toStudyGroupWithCounts(
+  group: StudyGroupListRow,
+): StudyGroupWithCounts {
+  return {
+    id: group.id,
+    subject: group.subject,
+    description: group.description,
+    professor_name: group.professor_name,
+    location: group.location,
+    start_time: group.start_time,
+    end_time: group.end_time,
+    student_limit: group.student_limit,
+    organizer_name: group.organizer_name,
+    created_at: group.created_at,
+    expires_at: group.expires_at,
+    participant_count: group.participant_count,
+    is_full: group.student_limit
+      ? group.participant_count >= group.student_limit
+      : false,
+  };
+}
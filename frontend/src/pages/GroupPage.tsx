@@ -7,30 +7,15 @@ import { supabase } from "../lib/supabase";
 import { useUserEmail } from "../contexts/UserEmailContext";
 import { useAuth } from "../contexts/AuthContext";
 import { formatTimeRange, getRelativeDay } from "../lib/timezone";
+import type {
+  GroupPageData,
+  GroupParticipant,
+  VersionedGroup,
+} from "../lib/database.types";
 import { LoadingSpinner } from "../components/LoadingSpinner";
 import { ErrorMessage } from "../components/ErrorMessage";
 import "./GroupPage.css";
 
-interface StudyGroup {
-  id: string;
-  subject: string;
-  description: string | null;
-  professor_name: string | null;
-  location: string;
-  start_time: string;
-  end_time: string;
-  student_limit: number | null;
-  organizer_name: string | null;
-  organizer_email: string;
-}
-
-interface Participant {
-  id: string;
-  name: string;
-  email: string;
-  joined_at: string;
-}
-
 export function GroupPage() {
   const { groupId } = useParams<{ groupId: string }>();
   const navigate = useNavigate();
@@ -38,11 +23,11 @@ export function GroupPage() {
   const { userEmail } = useUserEmail();
   const effectiveEmail = user?.email || userEmail;
 
-  const [group, setGroup] = useState<StudyGroup | null>(null);
-  const [participants, setParticipants] = useState<Participant[]>([]);
+  const [group, setGroup] = useState<VersionedGroup | null>(null);
+  const [participants, setParticipants] = useState<GroupParticipant[]>([]);
+  const [role, setRole] = useState<GroupPageData["role"]>("visitor");
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
-  const [isMember, setIsMember] = useState(false);
   const [isLeaving, setIsLeaving] = useState(false);
 
   useEffect(() => {
@@ -54,55 +39,23 @@ export function GroupPage() {
       }
 
       try {
-        // Fetch group details
-        const { data: groupData, error: groupError } = await supabase
-          .from("study_groups")
-          .select("*")
-          .eq("id", groupId)
-          .single();
-
-        if (groupError) {
+        // Group, live count, our role and the participants we may see, in one call
+        const { data, error: pageError } = await supabase.rpc(
+          "get_group_page",
+          {
+            p_study_group_id: groupId,
+            p_requester_email: effectiveEmail || null,
+          },
+        );
+
+        if (pageError || !data) {
           throw new Error("Study group not found");
         }
 
-        setGroup(groupData);
-
-        // Check if user is a member and fetch participants
-        if (effectiveEmail) {
-          const { data: participantData, error: participantError } =
-            await supabase.rpc("get_group_participants_if_member", {
-              p_study_group_id: groupId,
-              p_requester_email: effectiveEmail,
-            });
-
-          if (
-            !participantError &&
-            participantData &&
-            participantData.length > 0
-          ) {
-            setParticipants(participantData);
-            setIsMember(true);
-          } else {
-            // Check if user is the organizer
-            if (
-              groupData.organizer_email.toLowerCase() ===
-              effectiveEmail.toLowerCase()
-            ) {
-              setIsMember(true);
-              // Fetch participants as organizer
-              const { data: orgParticipants } = await supabase.rpc(
-                "get_group_participants_if_member",
-                {
-                  p_study_group_id: groupId,
-                  p_requester_email: effectiveEmail,
-                },
-              );
-              if (orgParticipants) {
-                setParticipants(orgParticipants);
-              }
-            }
-          }
-        }
+        const page = data as GroupPageData;
+        setGroup(page.group);
+        setRole(page.role);
+        setParticipants(page.participants);
       } catch (err) {
         setError(err instanceof Error ? err.message : "Failed to load group");
       } finally {
@@ -195,9 +148,8 @@ export function GroupPage() {
     group.location + " Columbia University New York",
   )}`;
 
-  const isOrganizer =
-    effectiveEmail &&
-    group.organizer_email.toLowerCase() === effectiveEmail.toLowerCase();
+  const isOrganizer = role === "organizer";
+  const isMember = role !== "visitor";
 
   return (
     <div className="group-page">
@@ -255,7 +207,7 @@ export function GroupPage() {
             <div className="group-page__detail">
               <span className="group-page__icon">👥</span>
               <span>
-                {participants.length}/{group.student_limit} spots filled
+                {group.participant_count}/{group.student_limit} spots filled
               </span>
             </div>
           )}
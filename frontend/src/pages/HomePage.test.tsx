@@ -166,6 +166,26 @@ describe("HomePage", () => {
     expect(screen.getByText("2 study groups available")).toBeInTheDocument();
   });
 
+  it("loads more groups when more pages remain", () => {
+    const mockLoadMore = vi.fn();
+    mockUseStudyGroups.mockReturnValue({
+      groups: mockGroups,
+      isLoading: false,
+      isLoadingMore: false,
+      hasMore: true,
+      error: null,
+      refetch: mockRefetch,
+      loadMore: mockLoadMore,
+      joinGroup: mockJoinGroup,
+    });
+
+    renderWithRouter(<HomePage />);
+
+    expect(screen.getByText("2+ study groups available")).toBeInTheDocument();
+    fireEvent.click(screen.getByRole("button", { name: /load more/i }));
+    expect(mockLoadMore).toHaveBeenCalled();
+  });
+
   it("opens join modal when Join clicked", () => {
     mockUseStudyGroups.mockReturnValue({
       groups: mockGroups,
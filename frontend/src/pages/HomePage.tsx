@@ -1,7 +1,7 @@
 // ABOUTME: Main homepage displaying all available study groups
 // ABOUTME: Includes search, filtering, and join functionality
 
-import { useState } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import { useAuth } from "../contexts/AuthContext";
 import { useUserEmail } from "../contexts/UserEmailContext";
@@ -20,13 +20,46 @@ export function HomePage() {
   const { user } = useAuth();
   const { setUserEmail } = useUserEmail();
   const [searchQuery, setSearchQuery] = useState("");
-  const { groups, isLoading, error, refetch, joinGroup } =
-    useStudyGroups(searchQuery);
+  const {
+    groups,
+    isLoading,
+    isLoadingMore,
+    hasMore,
+    error,
+    refetch,
+    loadMore,
+    joinGroup,
+  } = useStudyGroups(searchQuery);
+  const sentinelRef = useRef<HTMLDivElement | null>(null);
 
   const [joinTarget, setJoinTarget] = useState<StudyGroupWithCounts | null>(
     null,
   );
 
+  // Infinite scroll: load the next page when the sentinel nears the viewport
+  useEffect(() => {
+    const sentinel = sentinelRef.current;
+    if (!sentinel || !hasMore || typeof IntersectionObserver === "undefined") {
+      return;
+    }
+
+    const observer = new IntersectionObserver(
+      (entries) => {
+        if (entries.some((entry) => entry.isIntersecting)) {
+          loadMore();
+        }
+      },
+      { rootMargin: "400px" },
+    );
+    observer.observe(sentinel);
+
+    return () => observer.disconnect();
+  }, [hasMore, loadMore, groups.length]);
+
+  const countLabel = `${groups.length}${hasMore ? "+" : ""} study group${
+    groups.length !== 1 || hasMore ? "s" : ""
+  }`;
+
   const handleJoin = async (data: { name: string; email: string }) => {
     if (!joinTarget) return;
     try {
@@ -90,7 +123,7 @@ export function HomePage() {
         {!isLoading && !error && groups.length > 0 && (
           <div className="home-page__groups">
             <p className="home-page__count">
-              {groups.length} study group{groups.length !== 1 ? "s" : ""}{" "}
+              {countLabel}{" "}
               {searchQuery ? "found" : "available"}
             </p>
             <div className="home-page__grid">
@@ -102,6 +135,21 @@ export function HomePage() {
                 />
               ))}
             </div>
+            {hasMore && (
+              <div ref={sentinelRef} className="home-page__more">
+                {isLoadingMore ? (
+                  <LoadingSpinner message="Loading more study groups..." />
+                ) : (
+                  <button
+                    type="button"
+                    className="home-page__more-button"
+                    onClick={loadMore}
+                  >
+                    Load more
+                  </button>
+                )}
+              </div>
+            )}
           </div>
         )}
       </section>
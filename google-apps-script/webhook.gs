@@ -1,6 +1,6 @@
 /**
  * ABOUTME: Google Apps Script webhook for CU Study Groups
- * ABOUTME: Posts form submissions to Supabase and handles duplicate detection
+ * ABOUTME: Queues form submissions and flushes them to ingest_study_groups in batches
  *
  * Setup:
  * 1. Open the Google Sheet linked to your form
@@ -9,6 +9,8 @@
  * 4. Set the script properties (see setScriptProperties function)
  * 5. Run setScriptProperties() once to configure
  * 6. Create a trigger: onFormSubmit on form submission
+ * 7. Optional: a time-driven trigger for flushPendingRows retries rows left
+ *    queued by a failed call
  */
 
 // Column indices (0-based) - adjust if your form columns differ
@@ -27,6 +29,13 @@ const COLUMNS = {
   PROFESSOR_NAME: 11
 };
 
+// Prefix of the script properties holding submissions not yet accepted by
+// Supabase, one per row (a single property value is limited to 9 KB)
+const PENDING_PREFIX = 'PENDING:';
+
+// Rows per ingest_study_groups call (the RPC accepts up to 500)
+const MAX_BATCH = 100;
+
 /**
  * Run this function once to set up script properties.
  * Edit the values below before running.
@@ -50,10 +59,43 @@ function setScriptProperties() {
 function onFormSubmit(e) {
   try {
     const sheet = SpreadsheetApp.getActiveSpreadsheet().getActiveSheet();
-    const lastRow = sheet.getLastRow();
-    const rowData = sheet.getRange(lastRow, 1, 1, sheet.getLastColumn()).getValues()[0];
+    // The submitted row; the last row may already belong to a later submission
+    const rowNumber = e && e.range ? e.range.getRow() : sheet.getLastRow();
+
+    // Queue first, so a failed call below leaves the row for the next flush
+    queueSheetRows(sheet, rowNumber, rowNumber);
+    flushPendingRows();
+
+  } catch (error) {
+    Logger.log('Error in onFormSubmit: ' + error.message);
+    throw error;
+  }
+}
 
-    // Parse form data
+/**
+ * Re-queue a range of sheet rows and flush them, e.g. after submissions
+ * failed on an Apps Script quota. Rows already ingested come back as
+ * duplicates, so overlapping ranges are safe.
+ * @param {number} firstRow - First sheet row (1-based, after the header)
+ * @param {number} lastRow - Last sheet row (inclusive)
+ */
+function replaySheetRows(firstRow, lastRow) {
+  const sheet = SpreadsheetApp.getActiveSpreadsheet().getActiveSheet();
+  queueSheetRows(sheet, firstRow, lastRow);
+  flushPendingRows();
+}
+
+/**
+ * Parse sheet rows and add them to the pending queue.
+ * @param {Sheet} sheet - The form responses sheet
+ * @param {number} firstRow - First sheet row (1-based)
+ * @param {number} lastRow - Last sheet row (inclusive)
+ */
+function queueSheetRows(sheet, firstRow, lastRow) {
+  const values = sheet.getRange(firstRow, 1, lastRow - firstRow + 1, sheet.getLastColumn()).getValues();
+  const props = PropertiesService.getScriptProperties();
+
+  values.forEach((rowData, index) => {
     const formData = parseFormData(rowData);
 
     // Validate email domain
@@ -62,22 +104,103 @@ function onFormSubmit(e) {
       return;
     }
 
-    // Check for duplicates and send warning if found
-    const duplicates = checkForDuplicates(formData);
-    if (duplicates && duplicates.length > 0) {
-      sendDuplicateWarningEmail(formData, duplicates);
+    formData.idempotency_key = idempotencyKey(firstRow + index, rowData);
+    // Keyed by idempotency key, so queueing a row twice keeps one copy
+    props.setProperty(PENDING_PREFIX + formData.idempotency_key, JSON.stringify(formData));
+  });
+}
+
+/**
+ * Send every pending row to ingest_study_groups, MAX_BATCH rows per call.
+ * Rows the server answered for (created, duplicate or invalid) leave the
+ * queue; on a failed call the rest stay queued for the next flush.
+ */
+function flushPendingRows() {
+  withScriptLock(() => {
+    const props = PropertiesService.getScriptProperties();
+    let pending = readPendingRows();
+
+    while (pending.length > 0) {
+      const batch = pending.slice(0, MAX_BATCH);
+      const outcomes = ingestStudyGroups(batch);
+      const byKey = {};
+      outcomes.forEach(outcome => {
+        byKey[outcome.idempotency_key] = outcome;
+      });
+
+      batch.forEach(formData => {
+        const outcome = byKey[formData.idempotency_key];
+        if (!outcome) return;
+
+        if (outcome.status === 'created') {
+          Logger.log('Study group created: ' + outcome.study_group_id);
+          if (outcome.similar && outcome.similar.length > 0) {
+            sendDuplicateWarningEmail(formData, outcome.similar);
+          }
+        } else if (outcome.status === 'duplicate') {
+          Logger.log('Already ingested: ' + formData.idempotency_key);
+        } else {
+          Logger.log('Rejected ' + formData.idempotency_key + ': ' + outcome.error);
+        }
+        props.deleteProperty(PENDING_PREFIX + formData.idempotency_key);
+      });
+
+      const remaining = pending.filter(row => !byKey[row.idempotency_key]);
+      if (remaining.length === pending.length) {
+        break;
+      }
+      pending = remaining;
     }
+  });
+}
 
-    // Insert into Supabase
-    const result = insertStudyGroup(formData);
-    Logger.log('Study group created: ' + JSON.stringify(result));
+/**
+ * Stable key for a sheet row: replaying the same submission yields the same key.
+ * @param {number} rowNumber - Sheet row (1-based)
+ * @param {Array} rowData - Cell values of the row
+ * @returns {string} Idempotency key
+ */
+function idempotencyKey(rowNumber, rowData) {
+  const sheetId = SpreadsheetApp.getActiveSpreadsheet().getId();
+  const timestamp = new Date(rowData[COLUMNS.TIMESTAMP]).getTime();
+  return 'form:' + sheetId + ':' + rowNumber + ':' + timestamp;
+}
 
-  } catch (error) {
-    Logger.log('Error in onFormSubmit: ' + error.message);
-    throw error;
+/**
+ * Run a function while holding the script lock, so concurrent triggers
+ * never send the same pending rows at the same time.
+ * @param {Function} fn - Work to do under the lock
+ */
+function withScriptLock(fn) {
+  const lock = LockService.getScriptLock();
+  lock.waitLock(30000);
+  try {
+    return fn();
+  } finally {
+    lock.releaseLock();
   }
 }
 
+/**
+ * Pending form rows in submission order.
+ * @returns {Array} Parsed form rows, each with an idempotency_key
+ */
+function readPendingRows() {
+  const all = PropertiesService.getScriptProperties().getProperties();
+  return Object.keys(all)
+    .filter(name => name.indexOf(PENDING_PREFIX) === 0)
+    .map(name => JSON.parse(all[name]))
+    .sort((a, b) => submittedAt(a.idempotency_key) - submittedAt(b.idempotency_key));
+}
+
+/**
+ * @param {string} key - Idempotency key built by idempotencyKey()
+ * @returns {number} Submission time in milliseconds
+ */
+function submittedAt(key) {
+  return Number(key.split(':').pop());
+}
+
 /**
  * Parse form row data into a structured object.
  * @param {Array} rowData - Array of cell values from the form response row
@@ -182,51 +305,18 @@ function isColumbiaEmail(email) {
 }
 
 /**
- * Insert a study group into Supabase.
- * @param {Object} formData - The parsed form data
- * @returns {Object} The created study group
+ * Create study groups in one call; the server dedupes on idempotency_key
+ * and runs the similarity check for the whole batch.
+ * @param {Array} rows - Parsed form rows, each with an idempotency_key
+ * @returns {Array} One outcome per row: idempotency_key, status
+ *   (created | duplicate | invalid), study_group_id, error, similar
  */
-function insertStudyGroup(formData) {
+function ingestStudyGroups(rows) {
   const props = PropertiesService.getScriptProperties();
   const supabaseUrl = props.getProperty('SUPABASE_URL');
   const serviceRoleKey = props.getProperty('SUPABASE_SERVICE_ROLE_KEY');
 
-  const url = supabaseUrl + '/rest/v1/study_groups';
-
-  const options = {
-    method: 'POST',
-    headers: {
-      'apikey': serviceRoleKey,
-      'Authorization': 'Bearer ' + serviceRoleKey,
-      'Content-Type': 'application/json',
-      'Prefer': 'return=representation'
-    },
-    payload: JSON.stringify(formData),
-    muteHttpExceptions: true
-  };
-
-  const response = UrlFetchApp.fetch(url, options);
-  const statusCode = response.getResponseCode();
-  const responseText = response.getContentText();
-
-  if (statusCode !== 201) {
-    throw new Error('Supabase insert failed: ' + statusCode + ' - ' + responseText);
-  }
-
-  return JSON.parse(responseText);
-}
-
-/**
- * Check for similar/duplicate study groups.
- * @param {Object} formData - The parsed form data
- * @returns {Array} Array of similar study groups
- */
-function checkForDuplicates(formData) {
-  const props = PropertiesService.getScriptProperties();
-  const supabaseUrl = props.getProperty('SUPABASE_URL');
-  const serviceRoleKey = props.getProperty('SUPABASE_SERVICE_ROLE_KEY');
-
-  const url = supabaseUrl + '/rest/v1/rpc/find_similar_study_groups';
+  const url = supabaseUrl + '/rest/v1/rpc/ingest_study_groups';
 
   const options = {
     method: 'POST',
@@ -235,24 +325,19 @@ function checkForDuplicates(formData) {
       'Authorization': 'Bearer ' + serviceRoleKey,
       'Content-Type': 'application/json'
     },
-    payload: JSON.stringify({
-      p_subject: formData.subject,
-      p_professor_name: formData.professor_name,
-      p_start_time: formData.start_time,
-      p_end_time: formData.end_time
-    }),
+    payload: JSON.stringify({ p_rows: rows }),
     muteHttpExceptions: true
   };
 
   const response = UrlFetchApp.fetch(url, options);
   const statusCode = response.getResponseCode();
+  const responseText = response.getContentText();
 
   if (statusCode !== 200) {
-    Logger.log('Duplicate check failed: ' + response.getContentText());
-    return [];
+    throw new Error('Supabase ingest failed: ' + statusCode + ' - ' + responseText);
   }
 
-  return JSON.parse(response.getContentText());
+  return JSON.parse(responseText);
 }
 
 /**
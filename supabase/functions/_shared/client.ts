@@ -0,0 +1,24 @@
+// ABOUTME: Service-role Supabase client shared by every invocation in an isolate
+// ABOUTME: Created on first use, then reused by warm invocations
+
+import {
+  createClient,
+  type SupabaseClient,
+} from "https://esm.sh/@supabase/supabase-js@2";
+
+let serviceClient: SupabaseClient | null = null;
+
+/**
+ * Return the isolate's service-role client, creating it on first call.
+ * Sessions are not persisted: edge functions authenticate with the key alone.
+ */
+export function getServiceClient(): SupabaseClient {
+  if (!serviceClient) {
+    serviceClient = createClient(
+      Deno.env.get("SUPABASE_URL")!,
+      Deno.env.get("SUPABASE_SERVICE_ROLE_KEY")!,
+      { auth: { persistSession: false, autoRefreshToken: false } },
+    );
+  }
+  return serviceClient;
+}
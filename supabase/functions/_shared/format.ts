@@ -0,0 +1,39 @@
+// ABOUTME: Date and time formatting for emails, in Columbia's time zone
+// ABOUTME: Intl.DateTimeFormat instances are built once per isolate and reused
+
+const TIME_ZONE = "America/New_York";
+
+const dateFormat = new Intl.DateTimeFormat("en-US", {
+  weekday: "long",
+  year: "numeric",
+  month: "long",
+  day: "numeric",
+  timeZone: TIME_ZONE,
+});
+
+const timeFormat = new Intl.DateTimeFormat("en-US", {
+  hour: "numeric",
+  minute: "2-digit",
+  timeZone: TIME_ZONE,
+});
+
+export interface Schedule {
+  /** e.g. "Tuesday, January 20, 2026" */
+  date: string;
+  /** e.g. "2:00 PM – 4:00 PM" */
+  time: string;
+}
+
+/**
+ * Format a study group's start and end for display.
+ * @param startTime - ISO timestamp
+ * @param endTime - ISO timestamp
+ */
+export function formatSchedule(startTime: string, endTime: string): Schedule {
+  const start = new Date(startTime);
+  const end = new Date(endTime);
+  return {
+    date: dateFormat.format(start),
+    time: `${timeFormat.format(start)} – ${timeFormat.format(end)}`,
+  };
+}
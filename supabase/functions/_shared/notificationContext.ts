@@ -0,0 +1,37 @@
+// ABOUTME: Loads the data a join email needs with one get_notification_context call
+// ABOUTME: Group fields, live participant count, remaining seats and the participant row
+
+import type { SupabaseClient } from "https://esm.sh/@supabase/supabase-js@2";
+import type { EmailGroup } from "./templates.ts";
+
+export interface NotificationContext extends EmailGroup {
+  organizer_email: string;
+  participant_count: number;
+  /** NULL for groups without a student limit */
+  remaining_seats: number | null;
+  /** NULL when no (matching) participant id was given */
+  participant_name: string | null;
+  participant_email: string | null;
+}
+
+/**
+ * Fetch the notification context for a group, or null if the group does not exist.
+ * @throws Error when the database call fails
+ */
+export async function fetchNotificationContext(
+  supabase: SupabaseClient,
+  studyGroupId: string,
+  participantId?: string | null,
+): Promise<NotificationContext | null> {
+  const { data, error } = await supabase
+    .rpc("get_notification_context", {
+      p_study_group_id: studyGroupId,
+      p_participant_id: participantId ?? null,
+    })
+    .maybeSingle();
+
+  if (error) {
+    throw new Error(error.message);
+  }
+  return (data as NotificationContext | null) ?? null;
+}
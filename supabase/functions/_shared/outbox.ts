@@ -0,0 +1,247 @@
+// ABOUTME: Notification outbox worker logic shared by the edge function and its tests
+// ABOUTME: Claims queued join emails, coalesces one digest per organizer and sends via Resend's batch API
+
+import {
+  renderJoinConfirmation,
+  renderOrganizerDigest,
+  renderOrganizerNotice,
+  renderOrganizerSummary,
+  type RenderedEmail,
+} from "./templates.ts";
+
+export type OutboxKind = "join_confirmation" | "organizer_join";
+
+export interface JoinPayload {
+  participant_id: string;
+  participant_name: string;
+  participant_email: string;
+  subject: string;
+  professor_name: string | null;
+  location: string;
+  start_time: string;
+  end_time: string;
+  student_limit: number | null;
+  organizer_name: string | null;
+  participant_count: number;
+}
+
+export interface OutboxRow {
+  id: number;
+  kind: OutboxKind;
+  /** null once the group was deleted; the payload still describes it */
+  study_group_id: string | null;
+  recipient: string;
+  payload: JoinPayload;
+  attempts: number;
+}
+
+export interface OutgoingEmail {
+  from: string;
+  to: string[];
+  subject: string;
+  html: string;
+}
+
+/** One email and the outbox rows it settles. */
+export interface Delivery {
+  ids: number[];
+  email: OutgoingEmail;
+}
+
+export interface ResendConfig {
+  apiKey: string;
+  /** Base URL, e.g. https://api.resend.com (override to point at a local stand-in) */
+  apiUrl: string;
+  from: string;
+  fetch?: typeof fetch;
+}
+
+/** Minimal slice of the Supabase client used by the worker. */
+export interface OutboxClient {
+  rpc(
+    fn: string,
+    args?: Record<string, unknown>,
+  ): PromiseLike<{ data: unknown; error: { message: string } | null }>;
+}
+
+export interface ProcessOptions {
+  batchSize?: number;
+  maxAttempts?: number;
+}
+
+export interface ProcessResult {
+  claimed: number;
+  emails: number;
+  sent: number;
+  failed: number;
+}
+
+// Resend accepts at most 100 emails per batch request
+export const RESEND_BATCH_LIMIT = 100;
+
+function confirmationEmail(row: OutboxRow, from: string): OutgoingEmail {
+  const { subject, html } = renderJoinConfirmation(
+    row.payload,
+    row.payload.participant_name,
+  );
+  return { from, to: [row.recipient], subject, html };
+}
+
+// Rows of a deleted group have no id left, but their payloads still name the same session
+function groupKey(row: OutboxRow): string {
+  return row.study_group_id ?? `${row.payload.subject}|${row.payload.start_time}`;
+}
+
+function groupEmail(rows: OutboxRow[]): RenderedEmail {
+  // Rows arrive in id order, so the last one carries the most recent count
+  const latest = rows[rows.length - 1].payload;
+  return rows.length === 1
+    ? renderOrganizerNotice(latest, latest.participant_name, latest.participant_count)
+    : renderOrganizerDigest(
+      latest,
+      rows.map((row) => row.payload.participant_name),
+      latest.participant_count,
+    );
+}
+
+function organizerEmail(rows: OutboxRow[], from: string): OutgoingEmail {
+  const byGroup = new Map<string, OutboxRow[]>();
+  for (const row of rows) {
+    const groupRows = byGroup.get(groupKey(row));
+    if (groupRows) {
+      groupRows.push(row);
+    } else {
+      byGroup.set(groupKey(row), [row]);
+    }
+  }
+
+  const groups = [...byGroup.values()];
+  const { subject, html } = groups.length === 1
+    ? groupEmail(groups[0])
+    : renderOrganizerSummary(groups.map((groupRows) => {
+      const latest = groupRows[groupRows.length - 1].payload;
+      return {
+        group: latest,
+        participantNames: groupRows.map((row) => row.payload.participant_name),
+        participantCount: latest.participant_count,
+      };
+    }));
+  return { from, to: [rows[0].recipient], subject, html };
+}
+
+/**
+ * Turn claimed outbox rows into emails.
+ * Confirmations go out one per participant. Organizer notices are coalesced
+ * into one email per organizer: a notice or digest for a single group, or a
+ * summary with a section per group when several of their groups had joins.
+ */
+export function buildDeliveries(rows: OutboxRow[], from: string): Delivery[] {
+  const deliveries: Delivery[] = [];
+  const digests = new Map<string, OutboxRow[]>();
+
+  for (const row of [...rows].sort((a, b) => a.id - b.id)) {
+    if (row.kind === "join_confirmation") {
+      deliveries.push({ ids: [row.id], email: confirmationEmail(row, from) });
+      continue;
+    }
+    const digest = digests.get(row.recipient);
+    if (digest) {
+      digest.push(row);
+    } else {
+      digests.set(row.recipient, [row]);
+    }
+  }
+
+  for (const digest of digests.values()) {
+    deliveries.push({
+      ids: digest.map((row) => row.id),
+      email: organizerEmail(digest, from),
+    });
+  }
+
+  return deliveries;
+}
+
+/**
+ * Send up to RESEND_BATCH_LIMIT emails in one request to Resend's batch endpoint.
+ * @throws Error when the provider rejects the batch
+ */
+export async function sendBatch(
+  emails: OutgoingEmail[],
+  config: ResendConfig,
+): Promise<void> {
+  const doFetch = config.fetch ?? fetch;
+  const response = await doFetch(`${config.apiUrl.replace(/\/$/, "")}/emails/batch`, {
+    method: "POST",
+    headers: {
+      Authorization: `Bearer ${config.apiKey}`,
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify(emails),
+  });
+
+  if (!response.ok) {
+    const details = await response.text();
+    throw new Error(`Resend batch failed (${response.status}): ${details}`);
+  }
+  await response.body?.cancel();
+}
+
+/**
+ * Claim one batch from the outbox, send it, and settle every claimed row.
+ * A failed provider call reschedules its rows with backoff (see fail_notifications).
+ */
+export async function processOutbox(
+  client: OutboxClient,
+  config: ResendConfig,
+  options: ProcessOptions = {},
+): Promise<ProcessResult> {
+  const batchSize = options.batchSize ?? RESEND_BATCH_LIMIT;
+  const maxAttempts = options.maxAttempts ?? 5;
+
+  const { data, error } = await client.rpc("claim_notification_batch", {
+    p_limit: batchSize,
+  });
+  if (error) {
+    throw new Error(`Failed to claim notifications: ${error.message}`);
+  }
+
+  const rows = (data as OutboxRow[] | null) ?? [];
+  const result: ProcessResult = { claimed: rows.length, emails: 0, sent: 0, failed: 0 };
+  if (rows.length === 0) {
+    return result;
+  }
+
+  const deliveries = buildDeliveries(rows, config.from);
+  result.emails = deliveries.length;
+
+  for (let i = 0; i < deliveries.length; i += RESEND_BATCH_LIMIT) {
+    const chunk = deliveries.slice(i, i + RESEND_BATCH_LIMIT);
+    const ids = chunk.flatMap((delivery) => delivery.ids);
+
+    try {
+      await sendBatch(chunk.map((delivery) => delivery.email), config);
+    } catch (err) {
+      const message = err instanceof Error ? err.message : String(err);
+      console.error("Notification batch failed:", message);
+      await client.rpc("fail_notifications", {
+        p_ids: ids,
+        p_error: message,
+        p_max_attempts: maxAttempts,
+      });
+      result.failed += ids.length;
+      continue;
+    }
+
+    const { error: completeError } = await client.rpc("complete_notifications", {
+      p_ids: ids,
+    });
+    if (completeError) {
+      // Rows stay 'sending' and are reclaimed after the lease; duplicates beat losses
+      console.error("Failed to mark notifications sent:", completeError.message);
+    }
+    result.sent += ids.length;
+  }
+
+  return result;
+}
@@ -0,0 +1,160 @@
+// ABOUTME: Tests for the notification outbox worker against a local Resend stand-in
+// ABOUTME: Run with: deno test --allow-net supabase/functions/_shared/outbox_test.ts
+
+import {
+  assertEquals,
+  assertStringIncludes,
+} from "https://deno.land/std@0.168.0/testing/asserts.ts";
+import {
+  buildDeliveries,
+  type OutboxClient,
+  type OutboxRow,
+  processOutbox,
+} from "./outbox.ts";
+
+const FROM = "CU Study Groups <noreply@resend.dev>";
+
+function makeRow(id: number, overrides: Partial<OutboxRow> = {}): OutboxRow {
+  return {
+    id,
+    kind: "organizer_join",
+    study_group_id: "group-1",
+    recipient: "organizer@columbia.edu",
+    attempts: 1,
+    payload: {
+      participant_id: `participant-${id}`,
+      participant_name: `Student ${id}`,
+      participant_email: `student${id}@columbia.edu`,
+      subject: "Calculus I",
+      professor_name: null,
+      location: "Butler Library",
+      start_time: "2026-01-20T19:00:00Z",
+      end_time: "2026-01-20T21:00:00Z",
+      student_limit: 5,
+      organizer_name: "Olivia",
+      participant_count: id + 1,
+    },
+    ...overrides,
+  };
+}
+
+/** Records RPC calls and serves the given rows from claim_notification_batch. */
+function fakeClient(rows: OutboxRow[]) {
+  const calls: { fn: string; args?: Record<string, unknown> }[] = [];
+  const client: OutboxClient = {
+    rpc(fn, args) {
+      calls.push({ fn, args });
+      const data = fn === "claim_notification_batch" ? rows : rows.length;
+      return Promise.resolve({ data, error: null });
+    },
+  };
+  return { client, calls };
+}
+
+/** Local stand-in for Resend that records batch requests. */
+function startResendStandIn(status = 200) {
+  const requests: unknown[][] = [];
+  const controller = new AbortController();
+  const server = Deno.serve(
+    { port: 0, signal: controller.signal, onListen: () => {} },
+    async (req) => {
+      requests.push(await req.json());
+      return Response.json({ data: [] }, { status });
+    },
+  );
+  const { port } = server.addr as Deno.NetAddr;
+  return {
+    url: `http://localhost:${port}`,
+    requests,
+    close: async () => {
+      controller.abort();
+      await server.finished;
+    },
+  };
+}
+
+Deno.test("organizer notices for one group become a single digest", () => {
+  const deliveries = buildDeliveries([makeRow(1), makeRow(2), makeRow(3)], FROM);
+
+  assertEquals(deliveries.length, 1);
+  assertEquals(deliveries[0].ids, [1, 2, 3]);
+  assertEquals(deliveries[0].email.subject, "3 people joined your Calculus I study group");
+  assertStringIncludes(deliveries[0].email.html, "4 students joined");
+});
+
+Deno.test("an organizer gets one summary for joins across their groups", () => {
+  const deliveries = buildDeliveries([
+    makeRow(1),
+    makeRow(2, {
+      study_group_id: "group-2",
+      payload: { ...makeRow(2).payload, subject: "Physics II" },
+    }),
+    makeRow(3),
+    makeRow(4, { recipient: "other@columbia.edu" }),
+  ], FROM);
+
+  assertEquals(deliveries.map((d) => d.ids), [[1, 2, 3], [4]]);
+  assertEquals(deliveries[0].email.subject, "3 people joined 2 of your study groups");
+  assertStringIncludes(deliveries[0].email.html, "Calculus I");
+  assertStringIncludes(deliveries[0].email.html, "Physics II");
+  assertEquals(deliveries[1].email.to, ["other@columbia.edu"]);
+});
+
+Deno.test("notices of a deleted group still share one digest", () => {
+  const deliveries = buildDeliveries([
+    makeRow(1, { study_group_id: null }),
+    makeRow(2, { study_group_id: null }),
+  ], FROM);
+
+  assertEquals(deliveries.length, 1);
+  assertEquals(deliveries[0].email.subject, "2 people joined your Calculus I study group");
+});
+
+Deno.test("confirmations are sent individually and names are escaped", () => {
+  const deliveries = buildDeliveries([
+    makeRow(1, { kind: "join_confirmation", recipient: "a@columbia.edu" }),
+    makeRow(2, {
+      kind: "join_confirmation",
+      recipient: "b@columbia.edu",
+      payload: { ...makeRow(2).payload, participant_name: "<b>Bob</b>" },
+    }),
+  ], FROM);
+
+  assertEquals(deliveries.map((d) => d.email.to[0]), ["a@columbia.edu", "b@columbia.edu"]);
+  assertStringIncludes(deliveries[1].email.html, "&lt;b&gt;Bob&lt;/b&gt;");
+});
+
+Deno.test("processOutbox sends one batch request and completes the rows", async () => {
+  const resend = startResendStandIn();
+  try {
+    const { client, calls } = fakeClient([
+      makeRow(1, { kind: "join_confirmation", recipient: "student1@columbia.edu" }),
+      makeRow(2),
+      makeRow(3),
+    ]);
+
+    const result = await processOutbox(client, { apiKey: "test", apiUrl: resend.url, from: FROM });
+
+    assertEquals(result, { claimed: 3, emails: 2, sent: 3, failed: 0 });
+    assertEquals(resend.requests.length, 1);
+    assertEquals(resend.requests[0].length, 2);
+    assertEquals(calls.map((c) => c.fn), ["claim_notification_batch", "complete_notifications"]);
+  } finally {
+    await resend.close();
+  }
+});
+
+Deno.test("processOutbox reschedules rows when the provider fails", async () => {
+  const resend = startResendStandIn(500);
+  try {
+    const { client, calls } = fakeClient([makeRow(1), makeRow(2)]);
+
+    const result = await processOutbox(client, { apiKey: "test", apiUrl: resend.url, from: FROM });
+
+    assertEquals(result.failed, 2);
+    assertEquals(calls[1].fn, "fail_notifications");
+    assertEquals(calls[1].args?.p_ids, [1, 2]);
+  } finally {
+    await resend.close();
+  }
+});
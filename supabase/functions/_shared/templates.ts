@@ -0,0 +1,254 @@
+// ABOUTME: Precompiled HTML email templates for join notifications
+// ABOUTME: Templates are parsed once per isolate; rendering only joins strings and escapes values
+
+import { formatSchedule } from "./format.ts";
+
+const HTML_ESCAPES: Record<string, string> = {
+  "&": "&amp;",
+  "<": "&lt;",
+  ">": "&gt;",
+  '"': "&quot;",
+  "'": "&#39;",
+};
+
+export function escapeHtml(value: string): string {
+  return value.replace(/[&<>"']/g, (char) => HTML_ESCAPES[char]);
+}
+
+type TemplateValues = Record<string, string | number | null | undefined>;
+
+export interface CompiledTemplate {
+  render(values: TemplateValues): string;
+}
+
+/**
+ * Compile a template with `{{name}}` (HTML-escaped) and `{{{name}}}` (raw) slots.
+ * The source is split once; render() just interleaves the static parts with values.
+ */
+export function compileTemplate(source: string): CompiledTemplate {
+  const statics: string[] = [];
+  const slots: { name: string; raw: boolean }[] = [];
+  const pattern = /\{\{(\{?)\s*(\w+)\s*\}?\}\}/g;
+
+  let last = 0;
+  for (const match of source.matchAll(pattern)) {
+    statics.push(source.slice(last, match.index));
+    slots.push({ name: match[2], raw: match[1] === "{" });
+    last = match.index! + match[0].length;
+  }
+  statics.push(source.slice(last));
+
+  return {
+    render(values: TemplateValues): string {
+      let out = statics[0];
+      for (let i = 0; i < slots.length; i++) {
+        const value = values[slots[i].name];
+        const text = value === null || value === undefined ? "" : String(value);
+        out += (slots[i].raw ? text : escapeHtml(text)) + statics[i + 1];
+      }
+      return out;
+    },
+  };
+}
+
+const LAYOUT = compileTemplate(`
+      <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+        <div style="background: #003366; color: white; padding: 20px; text-align: center;">
+          <h1 style="margin: 0;">{{title}}</h1>
+        </div>
+        <div style="padding: 20px; background: #f9f9f9;">
+          {{{body}}}
+          <p>Best,<br>CU Study Groups</p>
+        </div>
+        <div style="background: #eee; padding: 10px; text-align: center; font-size: 12px; color: #666;">
+          Columbia University Study Groups
+        </div>
+      </div>
+    `);
+
+const GROUP_CARD = compileTemplate(`
+          <div style="background: white; border-radius: 8px; padding: 20px; margin: 20px 0; border-left: 4px solid #003366;">
+            <h2 style="margin-top: 0; color: #003366;">{{subject}}</h2>
+            {{{professorRow}}}
+            <p><strong>Date:</strong> {{date}}</p>
+            <p><strong>Time:</strong> {{time}}</p>
+            {{{detailRows}}}
+          </div>`);
+
+const ROW = compileTemplate(`<p><strong>{{label}}:</strong> {{value}}</p>`);
+
+const LINK_ROW = compileTemplate(
+  `<p><strong>{{label}}:</strong> <a href="{{href}}" style="color: #003366;">{{value}}</a></p>`,
+);
+
+const CONFIRMATION_BODY = compileTemplate(`<p>Hi {{participantName}},</p>
+          <p>You've successfully joined a study group!</p>
+          {{{card}}}
+          <p>Good luck with your studying!</p>`);
+
+const ORGANIZER_BODY = compileTemplate(`{{{greeting}}}
+          <p><strong>{{participantName}}</strong> just joined your study group!</p>
+          {{{card}}}
+          <p>You can manage your study groups from the dashboard.</p>`);
+
+const DIGEST_BODY = compileTemplate(`{{{greeting}}}
+          <p>{{count}} students just joined your study group:</p>
+          <ul>{{{names}}}</ul>
+          {{{card}}}
+          <p>You can manage your study groups from the dashboard.</p>`);
+
+const SUMMARY_BODY = compileTemplate(`{{{greeting}}}
+          <p>{{count}} students just joined {{groups}} of your study groups:</p>
+          {{{sections}}}
+          <p>You can manage your study groups from the dashboard.</p>`);
+
+const SUMMARY_SECTION = compileTemplate(`{{{card}}}
+          <ul>{{{names}}}</ul>`);
+
+const GREETING = compileTemplate(`<p>Hi{{name}},</p>`);
+const LIST_ITEM = compileTemplate(`<li>{{name}}</li>`);
+
+/** The group fields the emails display. */
+export interface EmailGroup {
+  subject: string;
+  professor_name: string | null;
+  location: string;
+  start_time: string;
+  end_time: string;
+  student_limit: number | null;
+  organizer_name: string | null;
+}
+
+export interface RenderedEmail {
+  subject: string;
+  html: string;
+}
+
+function optionalRow(label: string, value: string | null): string {
+  return value ? ROW.render({ label, value }) : "";
+}
+
+function card(group: EmailGroup, detailRows: string): string {
+  const { date, time } = formatSchedule(group.start_time, group.end_time);
+  return GROUP_CARD.render({
+    subject: group.subject,
+    professorRow: optionalRow("Professor", group.professor_name),
+    date,
+    time,
+    detailRows,
+  });
+}
+
+function capacityInfo(group: EmailGroup, participantCount: number): string {
+  let info = `${participantCount} student${participantCount !== 1 ? "s" : ""} joined`;
+  if (group.student_limit) {
+    info += ` (${group.student_limit - participantCount} spots remaining)`;
+  }
+  return info;
+}
+
+function organizerCard(group: EmailGroup, participantCount: number): string {
+  return card(
+    group,
+    ROW.render({ label: "Location", value: group.location }) +
+      ROW.render({ label: "Status", value: capacityInfo(group, participantCount) }),
+  );
+}
+
+function greeting(group: EmailGroup): string {
+  return GREETING.render({
+    name: group.organizer_name ? ` ${group.organizer_name}` : "",
+  });
+}
+
+/** Email to a participant confirming their join. */
+export function renderJoinConfirmation(
+  group: EmailGroup,
+  participantName: string,
+): RenderedEmail {
+  const mapsLink = `https://www.google.com/maps/search/?api=1&query=${encodeURIComponent(
+    group.location + " Columbia University New York",
+  )}`;
+  const details =
+    LINK_ROW.render({ label: "Location", href: mapsLink, value: group.location }) +
+    optionalRow("Organized by", group.organizer_name);
+
+  return {
+    subject: `You joined: ${group.subject} Study Group`,
+    html: LAYOUT.render({
+      title: "You're In!",
+      body: CONFIRMATION_BODY.render({
+        participantName,
+        card: card(group, details),
+      }),
+    }),
+  };
+}
+
+/** Email to an organizer about a single new participant. */
+export function renderOrganizerNotice(
+  group: EmailGroup,
+  participantName: string,
+  participantCount: number,
+): RenderedEmail {
+  return {
+    subject: `${participantName} joined your ${group.subject} study group`,
+    html: LAYOUT.render({
+      title: "New Student Joined!",
+      body: ORGANIZER_BODY.render({
+        greeting: greeting(group),
+        participantName,
+        card: organizerCard(group, participantCount),
+      }),
+    }),
+  };
+}
+
+/** Email to an organizer about several participants who joined since the last send. */
+export function renderOrganizerDigest(
+  group: EmailGroup,
+  participantNames: string[],
+  participantCount: number,
+): RenderedEmail {
+  return {
+    subject: `${participantNames.length} people joined your ${group.subject} study group`,
+    html: LAYOUT.render({
+      title: "New Students Joined!",
+      body: DIGEST_BODY.render({
+        greeting: greeting(group),
+        count: participantNames.length,
+        names: participantNames.map((name) => LIST_ITEM.render({ name })).join(""),
+        card: organizerCard(group, participantCount),
+      }),
+    }),
+  };
+}
+
+/** One group's joins within an organizer summary. */
+export interface DigestSection {
+  group: EmailGroup;
+  participantNames: string[];
+  participantCount: number;
+}
+
+/** Email to an organizer about participants who joined several of their groups since the last send. */
+export function renderOrganizerSummary(sections: DigestSection[]): RenderedEmail {
+  const count = sections.reduce((sum, section) => sum + section.participantNames.length, 0);
+  return {
+    subject: `${count} people joined ${sections.length} of your study groups`,
+    html: LAYOUT.render({
+      title: "New Students Joined!",
+      body: SUMMARY_BODY.render({
+        greeting: greeting(sections[0].group),
+        count,
+        groups: sections.length,
+        sections: sections.map((section) =>
+          SUMMARY_SECTION.render({
+            card: organizerCard(section.group, section.participantCount),
+            names: section.participantNames.map((name) => LIST_ITEM.render({ name })).join(""),
+          })
+        ).join(""),
+      }),
+    }),
+  };
+}
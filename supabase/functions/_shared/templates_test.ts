@@ -0,0 +1,42 @@
+// ABOUTME: Tests for precompiled email templates and cached date formatting
+// ABOUTME: Run with: deno test supabase/functions/_shared/templates_test.ts
+
+import {
+  assertEquals,
+  assertStringIncludes,
+} from "https://deno.land/std@0.168.0/testing/asserts.ts";
+import { formatSchedule } from "./format.ts";
+import { compileTemplate, renderOrganizerNotice } from "./templates.ts";
+
+Deno.test("compiled templates escape {{slots}} and keep {{{raw}}} slots", () => {
+  const template = compileTemplate("<p>{{name}}</p>{{{html}}}{{missing}}");
+
+  assertEquals(
+    template.render({ name: "<Ann & Bo>", html: "<br>" }),
+    "<p>&lt;Ann &amp; Bo&gt;</p><br>",
+  );
+});
+
+Deno.test("schedules are formatted in New York time", () => {
+  const schedule = formatSchedule("2026-01-20T19:00:00Z", "2026-01-20T21:00:00Z");
+
+  assertEquals(schedule.date, "Tuesday, January 20, 2026");
+  assertEquals(schedule.time, "2:00 PM – 4:00 PM");
+});
+
+Deno.test("organizer notice shows remaining spots", () => {
+  const email = renderOrganizerNotice({
+    subject: "Calculus I",
+    professor_name: "Dr. <Smith>",
+    location: "Butler Library",
+    start_time: "2026-01-20T19:00:00Z",
+    end_time: "2026-01-20T21:00:00Z",
+    student_limit: 5,
+    organizer_name: null,
+  }, "Jane", 2);
+
+  assertEquals(email.subject, "Jane joined your Calculus I study group");
+  assertStringIncludes(email.html, "2 students joined (3 spots remaining)");
+  assertStringIncludes(email.html, "Dr. &lt;Smith&gt;");
+  assertStringIncludes(email.html, "<p>Hi,</p>");
+});
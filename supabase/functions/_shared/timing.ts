@@ -0,0 +1,54 @@
+// ABOUTME: Cold-start versus warm invocation timing for edge functions
+// ABOUTME: Logs one line per request and adds a Server-Timing header to the response
+
+// Evaluated once per isolate, when the function's modules are first loaded
+const isolateStartedAt = performance.now();
+let invocations = 0;
+
+export interface InvocationTiming {
+  cold: boolean;
+  /** Time from module load to the start of this request (cold starts only) */
+  bootMs: number | null;
+  durationMs: number;
+  /** 1 for the isolate's first request */
+  invocation: number;
+}
+
+/**
+ * Wrap a request handler so every response reports whether it ran cold or warm.
+ * @param name - Function name used in log lines
+ * @param handler - The serve handler
+ */
+export function withTiming(
+  name: string,
+  handler: (req: Request) => Promise<Response>,
+): (req: Request) => Promise<Response> {
+  return async (req: Request) => {
+    invocations += 1;
+    const invocation = invocations;
+    const startedAt = performance.now();
+    const cold = invocation === 1;
+
+    const response = await handler(req);
+
+    const timing: InvocationTiming = {
+      cold,
+      bootMs: cold ? Math.round(startedAt - isolateStartedAt) : null,
+      durationMs: Math.round(performance.now() - startedAt),
+      invocation,
+    };
+    console.log(JSON.stringify({ function: name, ...timing }));
+
+    const serverTiming = [
+      `${cold ? "cold" : "warm"};dur=${timing.durationMs}`,
+      ...(timing.bootMs !== null ? [`boot;dur=${timing.bootMs}`] : []),
+    ].join(", ");
+    const headers = new Headers(response.headers);
+    headers.set("Server-Timing", serverTiming);
+    return new Response(response.body, {
+      status: response.status,
+      statusText: response.statusText,
+      headers,
+    });
+  };
+}
@@ -1,13 +1,26 @@
 // ABOUTME: Edge Function to cleanup expired study groups
-// ABOUTME: Called on a schedule to remove old groups and free up space
+// ABOUTME: Called on a schedule to remove old groups in bounded batches
 
 import { serve } from "https://deno.land/std@0.168.0/http/server.ts";
-import { createClient } from "https://esm.sh/@supabase/supabase-js@2";
+import { getServiceClient } from "../_shared/client.ts";
+import { withTiming } from "../_shared/timing.ts";
 
-const SUPABASE_URL = Deno.env.get("SUPABASE_URL");
-const SUPABASE_SERVICE_ROLE_KEY = Deno.env.get("SUPABASE_SERVICE_ROLE_KEY");
 
-serve(async (req: Request) => {
+const DEFAULT_BATCH_SIZE = 500;
+const DEFAULT_MAX_BATCHES = 100;
+
+interface CleanupOptions {
+  batch_size?: number;
+  max_batches?: number;
+}
+
+interface BatchStats {
+  deleted_groups: number;
+  deleted_participants: number;
+  has_more: boolean;
+}
+
+serve(withTiming("cleanup-expired-groups", async (req: Request) => {
   try {
     // Verify this is an authorized request (from cron or admin)
     const authHeader = req.headers.get("Authorization");
@@ -18,27 +31,53 @@ serve(async (req: Request) => {
       );
     }
 
-    // Create Supabase client with service role
-    const supabase = createClient(SUPABASE_URL!, SUPABASE_SERVICE_ROLE_KEY!);
+    // Body is optional - scheduled calls send none
+    let options: CleanupOptions = {};
+    try {
+      options = await req.json();
+    } catch {
+      options = {};
+    }
+    const batchSize = options.batch_size ?? DEFAULT_BATCH_SIZE;
+    const maxBatches = options.max_batches ?? DEFAULT_MAX_BATCHES;
 
-    // Call the cleanup function we defined in the database
-    const { data, error } = await supabase.rpc("cleanup_expired_groups");
+    // Service role client, reused across warm invocations
+    const supabase = getServiceClient();
 
-    if (error) {
-      console.error("Cleanup error:", error);
-      return new Response(
-        JSON.stringify({ error: error.message }),
-        { status: 500, headers: { "Content-Type": "application/json" } }
-      );
+    // Each RPC call is its own transaction, so locks are released between batches
+    const batches: BatchStats[] = [];
+    while (batches.length < maxBatches) {
+      const { data, error } = await supabase
+        .rpc("cleanup_expired_groups_batch", { p_batch_size: batchSize })
+        .single();
+
+      if (error) {
+        console.error("Cleanup error:", error);
+        return new Response(
+          JSON.stringify({ error: error.message, batches }),
+          { status: 500, headers: { "Content-Type": "application/json" } }
+        );
+      }
+
+      const batch = data as BatchStats;
+      batches.push(batch);
+
+      // Stop when done or when only rows locked by in-flight joins remain
+      if (!batch.has_more || batch.deleted_groups === 0) {
+        break;
+      }
     }
 
-    const deletedCount = data || 0;
-    console.log(`Cleanup completed: ${deletedCount} groups deleted`);
+    const deletedCount = batches.reduce((sum, b) => sum + b.deleted_groups, 0);
+    console.log(
+      `Cleanup completed: ${deletedCount} groups deleted in ${batches.length} batches`
+    );
 
     return new Response(
       JSON.stringify({
         success: true,
         deletedCount,
+        batches,
         timestamp: new Date().toISOString(),
       }),
       { status: 200, headers: { "Content-Type": "application/json" } }
@@ -50,4 +89,4 @@ serve(async (req: Request) => {
       { status: 500, headers: { "Content-Type": "application/json" } }
     );
   }
-});
+}));
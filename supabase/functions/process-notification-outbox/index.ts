@@ -0,0 +1,56 @@
+// ABOUTME: Edge Function that drains the notification outbox in batches
+// ABOUTME: Invoked every minute by pg_cron (dispatch_notification_worker) or manually
+
+import { serve } from "https://deno.land/std@0.168.0/http/server.ts";
+import { getServiceClient } from "../_shared/client.ts";
+import { processOutbox } from "../_shared/outbox.ts";
+import { withTiming } from "../_shared/timing.ts";
+
+const RESEND_API_KEY = Deno.env.get("RESEND_API_KEY");
+// Override to point the worker at a local Resend stand-in
+const RESEND_API_URL = Deno.env.get("RESEND_API_URL") ?? "https://api.resend.com";
+const EMAIL_FROM = Deno.env.get("EMAIL_FROM") ?? "CU Study Groups <noreply@resend.dev>";
+
+// Upper bound on batches per invocation so one run stays within the function time limit
+const MAX_BATCHES = 10;
+const BATCH_SIZE = 100;
+
+serve(withTiming("process-notification-outbox", async (_req: Request) => {
+  try {
+    if (!RESEND_API_KEY) {
+      // Leave messages queued until email delivery is configured
+      return new Response(
+        JSON.stringify({ success: true, skipped: "RESEND_API_KEY not set" }),
+        { status: 200, headers: { "Content-Type": "application/json" } }
+      );
+    }
+
+    const supabase = getServiceClient();
+    const config = { apiKey: RESEND_API_KEY, apiUrl: RESEND_API_URL, from: EMAIL_FROM };
+
+    const totals = { batches: 0, claimed: 0, emails: 0, sent: 0, failed: 0 };
+    while (totals.batches < MAX_BATCHES) {
+      const result = await processOutbox(supabase, config, { batchSize: BATCH_SIZE });
+      totals.batches += 1;
+      totals.claimed += result.claimed;
+      totals.emails += result.emails;
+      totals.sent += result.sent;
+      totals.failed += result.failed;
+
+      if (result.claimed < BATCH_SIZE) {
+        break;
+      }
+    }
+
+    return new Response(
+      JSON.stringify({ success: true, ...totals }),
+      { status: 200, headers: { "Content-Type": "application/json" } }
+    );
+  } catch (error) {
+    console.error("Error:", error);
+    return new Response(
+      JSON.stringify({ error: error.message }),
+      { status: 500, headers: { "Content-Type": "application/json" } }
+    );
+  }
+}));
@@ -0,0 +1,258 @@
+-- ABOUTME: Denormalized participant_count column on study_groups maintained by triggers
+-- ABOUTME: Replaces per-row COUNT(*) subqueries in listing RPCs, capacity checks, and cleanup
+
+-- Add the counter column (every existing group starts at 0 and is backfilled below)
+ALTER TABLE study_groups
+ADD COLUMN participant_count INTEGER NOT NULL DEFAULT 0
+    CONSTRAINT participant_count_non_negative CHECK (participant_count >= 0);
+
+COMMENT ON COLUMN study_groups.participant_count IS 'Number of rows in participants for this group. Maintained by triggers on participants; do not write directly.';
+
+-- Backfill counts for existing groups
+UPDATE study_groups sg
+SET participant_count = counts.total
+FROM (
+    SELECT study_group_id, COUNT(*)::INTEGER AS total
+    FROM participants
+    GROUP BY study_group_id
+) counts
+WHERE counts.study_group_id = sg.id;
+
+-- New groups always start empty, whatever the client sends
+CREATE OR REPLACE FUNCTION reset_participant_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.participant_count := 0;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_reset_participant_count
+    BEFORE INSERT ON study_groups
+    FOR EACH ROW
+    EXECUTE FUNCTION reset_participant_count();
+
+-- Organizers may update their own groups, but not the counter the capacity check relies on.
+-- The participants triggers and repair_participant_counts() are SECURITY DEFINER, so their
+-- updates run as the table owner; only the API roles are stopped here.
+CREATE OR REPLACE FUNCTION guard_participant_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.participant_count IS DISTINCT FROM OLD.participant_count
+       AND current_user IN ('anon', 'authenticated') THEN
+        RAISE EXCEPTION 'participant_count is maintained by triggers and cannot be updated'
+            USING ERRCODE = 'insufficient_privilege';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_guard_participant_count
+    BEFORE UPDATE OF participant_count ON study_groups
+    FOR EACH ROW
+    EXECUTE FUNCTION guard_participant_count();
+
+-- Trigger function to keep participant_count in sync with the participants table
+-- SECURITY DEFINER because anonymous joins have no UPDATE rights on study_groups
+CREATE OR REPLACE FUNCTION sync_participant_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE study_groups
+        SET participant_count = participant_count + 1
+        WHERE id = NEW.study_group_id;
+        RETURN NEW;
+    END IF;
+
+    -- DELETE (also fires during ON DELETE CASCADE, when the group row is already gone)
+    UPDATE study_groups
+    SET participant_count = participant_count - 1
+    WHERE id = OLD.study_group_id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE TRIGGER trigger_sync_participant_count
+    AFTER INSERT OR DELETE ON participants
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_participant_count();
+
+-- Function to repair any drift between participant_count and the participants table
+-- Returns the number of groups whose count was corrected
+CREATE OR REPLACE FUNCTION repair_participant_counts()
+RETURNS INTEGER AS $$
+DECLARE
+    v_repaired_count INTEGER;
+BEGIN
+    WITH actual AS (
+        SELECT sg.id, COUNT(p.id)::INTEGER AS total
+        FROM study_groups sg
+        LEFT JOIN participants p ON p.study_group_id = sg.id
+        GROUP BY sg.id
+    )
+    UPDATE study_groups sg
+    SET participant_count = actual.total
+    FROM actual
+    WHERE actual.id = sg.id
+      AND sg.participant_count <> actual.total;
+    GET DIAGNOSTICS v_repaired_count = ROW_COUNT;
+
+    RETURN v_repaired_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Read the maintained counter instead of counting rows
+CREATE OR REPLACE FUNCTION get_participant_count(p_study_group_id UUID)
+RETURNS INTEGER AS $$
+BEGIN
+    RETURN (
+        SELECT participant_count
+        FROM study_groups
+        WHERE id = p_study_group_id
+    );
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Single lookup for limit and count
+CREATE OR REPLACE FUNCTION is_study_group_full(p_study_group_id UUID)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_limit INTEGER;
+    v_count INTEGER;
+BEGIN
+    SELECT student_limit, participant_count INTO v_limit, v_count
+    FROM study_groups
+    WHERE id = p_study_group_id;
+
+    -- No limit means never full
+    IF v_limit IS NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    RETURN v_count >= v_limit;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Capacity check reads the counter directly
+CREATE OR REPLACE FUNCTION check_study_group_capacity()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_limit INTEGER;
+    v_count INTEGER;
+BEGIN
+    SELECT student_limit, participant_count INTO v_limit, v_count
+    FROM study_groups
+    WHERE id = NEW.study_group_id;
+
+    IF v_limit IS NOT NULL AND v_count >= v_limit THEN
+        RAISE EXCEPTION 'Study group is full'
+            USING ERRCODE = 'check_violation';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Listing RPC: one scan of study_groups, no per-row subqueries
+CREATE OR REPLACE FUNCTION get_study_groups_with_counts()
+RETURNS TABLE (
+    id UUID,
+    subject TEXT,
+    professor_name TEXT,
+    location TEXT,
+    start_time TIMESTAMPTZ,
+    end_time TIMESTAMPTZ,
+    student_limit INTEGER,
+    organizer_name TEXT,
+    created_at TIMESTAMPTZ,
+    expires_at TIMESTAMPTZ,
+    participant_count INTEGER,
+    is_full BOOLEAN
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        sg.id,
+        sg.subject,
+        sg.professor_name,
+        sg.location,
+        sg.start_time,
+        sg.end_time,
+        sg.student_limit,
+        sg.organizer_name,
+        sg.created_at,
+        sg.expires_at,
+        sg.participant_count,
+        (sg.student_limit IS NOT NULL AND sg.participant_count >= sg.student_limit) AS is_full
+    FROM study_groups sg
+    WHERE sg.expires_at > NOW()
+      AND sg.end_time > NOW()
+    ORDER BY sg.start_time ASC;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+CREATE OR REPLACE FUNCTION get_my_study_groups()
+RETURNS TABLE (
+    id UUID,
+    subject TEXT,
+    professor_name TEXT,
+    location TEXT,
+    start_time TIMESTAMPTZ,
+    end_time TIMESTAMPTZ,
+    student_limit INTEGER,
+    organizer_name TEXT,
+    organizer_email TEXT,
+    created_at TIMESTAMPTZ,
+    expires_at TIMESTAMPTZ,
+    participant_count INTEGER,
+    is_full BOOLEAN
+) AS $$
+BEGIN
+    -- Only return groups for the authenticated user
+    IF auth.jwt() IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    RETURN QUERY
+    SELECT
+        sg.id,
+        sg.subject,
+        sg.professor_name,
+        sg.location,
+        sg.start_time,
+        sg.end_time,
+        sg.student_limit,
+        sg.organizer_name,
+        sg.organizer_email,
+        sg.created_at,
+        sg.expires_at,
+        sg.participant_count,
+        (sg.student_limit IS NOT NULL AND sg.participant_count >= sg.student_limit) AS is_full
+    FROM study_groups sg
+    WHERE sg.organizer_email = auth.jwt() ->> 'email'
+    ORDER BY sg.created_at DESC;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Cleanup filters on the counter column instead of calling get_participant_count per row
+CREATE OR REPLACE FUNCTION cleanup_expired_groups()
+RETURNS INTEGER AS $$
+DECLARE
+    deleted_count INTEGER;
+BEGIN
+    WITH deleted AS (
+        DELETE FROM study_groups
+        WHERE
+            -- Expired with no participants
+            (expires_at < NOW() AND participant_count = 0)
+            -- Or past end time
+            OR end_time < NOW()
+        RETURNING id
+    )
+    SELECT COUNT(*) INTO deleted_count FROM deleted;
+
+    RETURN deleted_count;
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION repair_participant_counts() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION repair_participant_counts() TO service_role;
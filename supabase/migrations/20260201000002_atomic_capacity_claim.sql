@@ -0,0 +1,68 @@
+-- ABOUTME: Race-free capacity enforcement for concurrent joins
+-- ABOUTME: Claims a seat with a conditional counter increment that row-locks only the target group
+
+-- Trigger function to claim a seat once a participant row has been inserted.
+-- The conditional UPDATE takes a row lock on the one study group being joined, so
+-- simultaneous joins to the same group queue behind each other and re-check the
+-- limit after the lock is granted, while joins to other groups run in parallel.
+-- It runs AFTER INSERT so only rows that actually land take a seat: an
+-- INSERT ... ON CONFLICT DO NOTHING on a duplicate email inserts nothing and claims
+-- nothing. Raising here still aborts the insert. Moving a participant to another
+-- group hands the old seat back and claims one in the new group.
+CREATE OR REPLACE FUNCTION check_study_group_capacity()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF NEW.study_group_id IS NOT DISTINCT FROM OLD.study_group_id THEN
+            RETURN NULL;
+        END IF;
+
+        UPDATE study_groups
+        SET participant_count = participant_count - 1
+        WHERE id = OLD.study_group_id;
+    END IF;
+
+    UPDATE study_groups
+    SET participant_count = participant_count + 1
+    WHERE id = NEW.study_group_id
+      AND (student_limit IS NULL OR participant_count < student_limit);
+
+    IF NOT FOUND THEN
+        IF EXISTS (SELECT 1 FROM study_groups WHERE id = NEW.study_group_id) THEN
+            RAISE EXCEPTION 'Study group is full'
+                USING ERRCODE = 'check_violation';
+        END IF;
+        -- Unknown group: the foreign key constraint reports the error
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Same name as before, so it still fires after the foreign key check ("RI_..." sorts first)
+-- and before trigger_enqueue_join_notifications, which reads the claimed count
+DROP TRIGGER IF EXISTS trigger_check_capacity ON participants;
+
+CREATE TRIGGER trigger_check_capacity
+    AFTER INSERT OR UPDATE OF study_group_id ON participants
+    FOR EACH ROW
+    EXECUTE FUNCTION check_study_group_capacity();
+
+-- The seat claim now performs the increment, so the AFTER trigger only handles leaves
+CREATE OR REPLACE FUNCTION sync_participant_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Also fires during ON DELETE CASCADE, when the group row is already gone
+    UPDATE study_groups
+    SET participant_count = participant_count - 1
+    WHERE id = OLD.study_group_id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS trigger_sync_participant_count ON participants;
+
+CREATE TRIGGER trigger_sync_participant_count
+    AFTER DELETE ON participants
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_participant_count();
@@ -0,0 +1,118 @@
+-- ABOUTME: Batched, index-friendly cleanup of expired study groups
+-- ABOUTME: Deletes in bounded chunks so the hourly job never holds locks long enough to stall joins
+
+-- Supports the "past end time" branch of the cleanup predicate
+CREATE INDEX IF NOT EXISTS idx_study_groups_end_time ON study_groups(end_time);
+
+-- Function to delete one batch of expired groups (participants cascade)
+-- Each predicate is its own index range scan; rows locked by in-flight joins are skipped
+-- and picked up by a later batch.
+CREATE OR REPLACE FUNCTION cleanup_expired_groups_batch(p_batch_size INTEGER DEFAULT 500)
+RETURNS TABLE (
+    deleted_groups INTEGER,
+    deleted_participants INTEGER,
+    has_more BOOLEAN
+) AS $$
+DECLARE
+    v_now TIMESTAMPTZ := NOW();
+    v_deleted_groups INTEGER;
+    v_deleted_participants INTEGER;
+BEGIN
+    IF p_batch_size IS NULL OR p_batch_size < 1 THEN
+        RAISE EXCEPTION 'Batch size must be a positive integer';
+    END IF;
+
+    WITH ended AS (
+        -- Past end time, regardless of participants
+        SELECT sg.id
+        FROM study_groups sg
+        WHERE sg.end_time < v_now
+        ORDER BY sg.end_time
+        LIMIT p_batch_size
+        FOR UPDATE SKIP LOCKED
+    ),
+    abandoned AS (
+        -- Expired with no participants
+        SELECT sg.id
+        FROM study_groups sg
+        WHERE sg.expires_at < v_now
+          AND sg.participant_count = 0
+        ORDER BY sg.expires_at
+        LIMIT p_batch_size
+        FOR UPDATE SKIP LOCKED
+    ),
+    batch AS (
+        SELECT ended.id FROM ended
+        UNION
+        SELECT abandoned.id FROM abandoned
+        LIMIT p_batch_size
+    ),
+    deleted AS (
+        DELETE FROM study_groups sg
+        USING batch
+        WHERE sg.id = batch.id
+        RETURNING sg.participant_count
+    )
+    SELECT COUNT(*)::INTEGER, COALESCE(SUM(deleted.participant_count), 0)::INTEGER
+    INTO v_deleted_groups, v_deleted_participants
+    FROM deleted;
+
+    deleted_groups := v_deleted_groups;
+    deleted_participants := v_deleted_participants;
+    has_more := EXISTS (
+        SELECT 1 FROM study_groups sg WHERE sg.end_time < v_now
+    ) OR EXISTS (
+        SELECT 1 FROM study_groups sg WHERE sg.expires_at < v_now AND sg.participant_count = 0
+    );
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Procedure for pg_cron: commits after every batch so locks are released between chunks
+CREATE OR REPLACE PROCEDURE run_expired_groups_cleanup(
+    p_batch_size INTEGER DEFAULT 500,
+    p_max_batches INTEGER DEFAULT 1000
+)
+AS $$
+DECLARE
+    v_batch RECORD;
+    v_batches INTEGER := 0;
+BEGIN
+    LOOP
+        SELECT * INTO v_batch FROM cleanup_expired_groups_batch(p_batch_size);
+        COMMIT;
+        v_batches := v_batches + 1;
+
+        -- Stop when done, when only locked rows remain, or at the safety cap
+        EXIT WHEN NOT v_batch.has_more
+            OR v_batch.deleted_groups = 0
+            OR v_batches >= p_max_batches;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Keep the single-call API, built on the batched path (runs in the caller's transaction)
+CREATE OR REPLACE FUNCTION cleanup_expired_groups()
+RETURNS INTEGER AS $$
+DECLARE
+    v_batch RECORD;
+    deleted_count INTEGER := 0;
+BEGIN
+    LOOP
+        SELECT * INTO v_batch FROM cleanup_expired_groups_batch(500);
+        deleted_count := deleted_count + v_batch.deleted_groups;
+        EXIT WHEN NOT v_batch.has_more OR v_batch.deleted_groups = 0;
+    END LOOP;
+
+    RETURN deleted_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Reschedule the hourly job onto the batched procedure (same job name replaces the old command)
+SELECT cron.schedule(
+    'cleanup-expired-study-groups',
+    '0 * * * *',
+    $$CALL run_expired_groups_cleanup()$$
+);
+
+GRANT EXECUTE ON FUNCTION cleanup_expired_groups_batch(INTEGER) TO service_role;
@@ -0,0 +1,76 @@
+-- ABOUTME: Range-typed, GiST-indexed overlap search for duplicate study group detection
+-- ABOUTME: Adds a generated time_range column and rewrites find_similar_study_groups() to use &&
+
+-- btree_gist lets a single GiST index combine equality on subject with range overlap
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- Half-open [start_time, end_time) range, kept in sync automatically
+ALTER TABLE study_groups
+ADD COLUMN time_range TSTZRANGE
+    GENERATED ALWAYS AS (tstzrange(start_time, end_time, '[)')) STORED;
+
+COMMENT ON COLUMN study_groups.time_range IS 'Generated [start_time, end_time) range used for overlap searches';
+
+-- Case-insensitive subject + overlapping time in one index
+CREATE INDEX idx_study_groups_subject_time_range
+    ON study_groups USING gist (LOWER(subject), time_range);
+
+-- Case-insensitive professor filter
+CREATE INDEX idx_study_groups_professor_lower
+    ON study_groups (LOWER(professor_name));
+
+-- The raw subject index never matched the LOWER(subject) predicate
+DROP INDEX IF EXISTS idx_study_groups_subject;
+
+-- Return type gains an overlap column, so the function must be recreated
+DROP FUNCTION IF EXISTS find_similar_study_groups(TEXT, TEXT, TIMESTAMPTZ, TIMESTAMPTZ);
+
+-- Function to find similar/duplicate study groups (for warning), largest overlap first
+CREATE FUNCTION find_similar_study_groups(
+    p_subject TEXT,
+    p_professor_name TEXT,
+    p_start_time TIMESTAMPTZ,
+    p_end_time TIMESTAMPTZ
+)
+RETURNS TABLE (
+    id UUID,
+    subject TEXT,
+    professor_name TEXT,
+    start_time TIMESTAMPTZ,
+    end_time TIMESTAMPTZ,
+    organizer_email TEXT,
+    overlap INTERVAL
+) AS $$
+DECLARE
+    -- OVERLAPS accepted endpoints in either order, so normalize before building the range
+    v_range TSTZRANGE := tstzrange(
+        LEAST(p_start_time, p_end_time),
+        GREATEST(p_start_time, p_end_time),
+        '[)'
+    );
+BEGIN
+    RETURN QUERY
+    SELECT
+        sg.id,
+        sg.subject,
+        sg.professor_name,
+        sg.start_time,
+        sg.end_time,
+        sg.organizer_email,
+        UPPER(sg.time_range * v_range) - LOWER(sg.time_range * v_range) AS overlap
+    FROM study_groups sg
+    WHERE LOWER(sg.subject) = LOWER(p_subject)
+      AND sg.time_range && v_range
+      AND sg.expires_at > NOW()
+      AND sg.end_time > NOW()
+      AND (
+          -- Same professor (if provided)
+          p_professor_name IS NULL
+          OR LOWER(sg.professor_name) = LOWER(p_professor_name)
+      )
+    ORDER BY UPPER(sg.time_range * v_range) - LOWER(sg.time_range * v_range) DESC,
+             sg.start_time ASC;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+GRANT EXECUTE ON FUNCTION find_similar_study_groups(TEXT, TEXT, TIMESTAMPTZ, TIMESTAMPTZ) TO service_role;
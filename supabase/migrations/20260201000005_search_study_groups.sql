@@ -0,0 +1,115 @@
+-- ABOUTME: Server-side full-text search for study groups
+-- ABOUTME: Weighted tsvector + trigram columns with GIN indexes and a cursor-paginated search RPC
+
+-- Trigram matching for partial words like "calc"
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Weighted document: subject > professor > organizer/location > description
+ALTER TABLE study_groups
+ADD COLUMN search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', COALESCE(subject, '')), 'A') ||
+    setweight(to_tsvector('english', COALESCE(professor_name, '')), 'B') ||
+    setweight(to_tsvector('english', COALESCE(organizer_name, '')), 'C') ||
+    setweight(to_tsvector('english', COALESCE(location, '')), 'C') ||
+    setweight(to_tsvector('english', COALESCE(description, '')), 'D')
+) STORED;
+
+-- Lowercased concatenation of the same fields for substring/trigram matching
+ALTER TABLE study_groups
+ADD COLUMN search_text TEXT GENERATED ALWAYS AS (
+    LOWER(
+        COALESCE(subject, '') || ' ' ||
+        COALESCE(professor_name, '') || ' ' ||
+        COALESCE(organizer_name, '') || ' ' ||
+        COALESCE(location, '') || ' ' ||
+        COALESCE(description, '')
+    )
+) STORED;
+
+COMMENT ON COLUMN study_groups.search_vector IS 'Generated weighted full-text document used by search_study_groups()';
+COMMENT ON COLUMN study_groups.search_text IS 'Generated lowercase text used for trigram/substring matching in search_study_groups()';
+
+CREATE INDEX idx_study_groups_search_vector
+    ON study_groups USING gin (search_vector);
+
+CREATE INDEX idx_study_groups_search_text_trgm
+    ON study_groups USING gin (search_text gin_trgm_ops);
+
+-- Function to search upcoming study groups, best match first
+-- Keyset cursor: pass the rank, start_time and id of the last row from the previous page
+CREATE OR REPLACE FUNCTION search_study_groups(
+    p_query TEXT,
+    p_limit INTEGER DEFAULT 20,
+    p_after_rank REAL DEFAULT NULL,
+    p_after_start_time TIMESTAMPTZ DEFAULT NULL,
+    p_after_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    subject TEXT,
+    description TEXT,
+    professor_name TEXT,
+    location TEXT,
+    start_time TIMESTAMPTZ,
+    end_time TIMESTAMPTZ,
+    student_limit INTEGER,
+    organizer_name TEXT,
+    created_at TIMESTAMPTZ,
+    expires_at TIMESTAMPTZ,
+    participant_count INTEGER,
+    is_full BOOLEAN,
+    rank REAL
+) AS $$
+DECLARE
+    v_query TEXT := LOWER(BTRIM(COALESCE(p_query, '')));
+    v_tsquery TSQUERY;
+    v_pattern TEXT;
+BEGIN
+    IF v_query = '' THEN
+        RETURN;
+    END IF;
+
+    v_tsquery := websearch_to_tsquery('english', v_query);
+    -- Escape LIKE wildcards so user input is matched literally
+    v_pattern := '%' || replace(replace(replace(v_query, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+
+    RETURN QUERY
+    WITH matches AS (
+        SELECT
+            sg.*,
+            (ts_rank(sg.search_vector, v_tsquery) + word_similarity(v_query, sg.search_text))::REAL AS match_rank
+        FROM study_groups sg
+        WHERE (sg.search_vector @@ v_tsquery OR sg.search_text LIKE v_pattern)
+          AND sg.end_time > NOW()
+          AND sg.expires_at > NOW()
+    )
+    SELECT
+        m.id,
+        m.subject,
+        m.description,
+        m.professor_name,
+        m.location,
+        m.start_time,
+        m.end_time,
+        m.student_limit,
+        m.organizer_name,
+        m.created_at,
+        m.expires_at,
+        m.participant_count,
+        (m.student_limit IS NOT NULL AND m.participant_count >= m.student_limit) AS is_full,
+        m.match_rank
+    FROM matches m
+    -- A cursor with only a rank continues from the start of that rank, as the page RPC
+    -- treats a missing start_time/id, instead of comparing against NULL and dropping it
+    WHERE p_after_rank IS NULL
+       OR m.match_rank < p_after_rank
+       OR (m.match_rank = p_after_rank AND (m.start_time, m.id) > (
+            COALESCE(p_after_start_time, '-infinity'::TIMESTAMPTZ),
+            COALESCE(p_after_id, '00000000-0000-0000-0000-000000000000'::UUID)
+          ))
+    ORDER BY m.match_rank DESC, m.start_time ASC, m.id ASC
+    LIMIT LEAST(GREATEST(COALESCE(p_limit, 20), 1), 100);
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+GRANT EXECUTE ON FUNCTION search_study_groups(TEXT, INTEGER, REAL, TIMESTAMPTZ, UUID) TO anon, authenticated;
@@ -0,0 +1,61 @@
+-- ABOUTME: Keyset-paginated listing RPC for the home page feed
+-- ABOUTME: Pages upcoming groups by (start_time, id) using a matching composite index
+
+-- Composite index that serves both the ORDER BY and the row-comparison cursor
+CREATE INDEX idx_study_groups_start_time_id ON study_groups (start_time, id);
+
+-- Superseded by the composite index above (same leading column)
+DROP INDEX IF EXISTS idx_study_groups_start_time;
+
+-- Function to get one page of upcoming study groups
+-- Pass the start_time and id of the last row from the previous page to continue
+CREATE OR REPLACE FUNCTION get_study_groups_page(
+    p_limit INTEGER DEFAULT 24,
+    p_after_start_time TIMESTAMPTZ DEFAULT NULL,
+    p_after_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    subject TEXT,
+    description TEXT,
+    professor_name TEXT,
+    location TEXT,
+    start_time TIMESTAMPTZ,
+    end_time TIMESTAMPTZ,
+    student_limit INTEGER,
+    organizer_name TEXT,
+    created_at TIMESTAMPTZ,
+    expires_at TIMESTAMPTZ,
+    participant_count INTEGER,
+    is_full BOOLEAN
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        sg.id,
+        sg.subject,
+        sg.description,
+        sg.professor_name,
+        sg.location,
+        sg.start_time,
+        sg.end_time,
+        sg.student_limit,
+        sg.organizer_name,
+        sg.created_at,
+        sg.expires_at,
+        sg.participant_count,
+        (sg.student_limit IS NOT NULL AND sg.participant_count >= sg.student_limit) AS is_full
+    FROM study_groups sg
+    -- A missing cursor becomes the lowest possible key, keeping one indexable predicate
+    WHERE (sg.start_time, sg.id) > (
+            COALESCE(p_after_start_time, '-infinity'::TIMESTAMPTZ),
+            COALESCE(p_after_id, '00000000-0000-0000-0000-000000000000'::UUID)
+          )
+      AND sg.end_time > NOW()
+      AND sg.expires_at > NOW()
+    ORDER BY sg.start_time ASC, sg.id ASC
+    LIMIT LEAST(GREATEST(COALESCE(p_limit, 24), 1), 100);
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+GRANT EXECUTE ON FUNCTION get_study_groups_page(INTEGER, TIMESTAMPTZ, UUID) TO anon, authenticated;
@@ -0,0 +1,157 @@
+-- ABOUTME: Per-row version counter on study_groups for realtime delta application
+-- ABOUTME: Lets clients drop out-of-order events and detect missed ones (version gaps)
+
+ALTER TABLE study_groups
+ADD COLUMN version BIGINT NOT NULL DEFAULT 1;
+
+COMMENT ON COLUMN study_groups.version IS 'Incremented on every update (including participant_count changes). Realtime clients resync when they see a gap.';
+
+-- Trigger function to bump the row version on every update
+CREATE OR REPLACE FUNCTION bump_study_group_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_bump_study_group_version
+    BEFORE UPDATE ON study_groups
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_study_group_version();
+
+-- Listing RPCs return the version so clients can seed their stores with it
+DROP FUNCTION IF EXISTS get_study_groups_page(INTEGER, TIMESTAMPTZ, UUID);
+
+CREATE FUNCTION get_study_groups_page(
+    p_limit INTEGER DEFAULT 24,
+    p_after_start_time TIMESTAMPTZ DEFAULT NULL,
+    p_after_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    subject TEXT,
+    description TEXT,
+    professor_name TEXT,
+    location TEXT,
+    start_time TIMESTAMPTZ,
+    end_time TIMESTAMPTZ,
+    student_limit INTEGER,
+    organizer_name TEXT,
+    created_at TIMESTAMPTZ,
+    expires_at TIMESTAMPTZ,
+    participant_count INTEGER,
+    is_full BOOLEAN,
+    version BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        sg.id,
+        sg.subject,
+        sg.description,
+        sg.professor_name,
+        sg.location,
+        sg.start_time,
+        sg.end_time,
+        sg.student_limit,
+        sg.organizer_name,
+        sg.created_at,
+        sg.expires_at,
+        sg.participant_count,
+        (sg.student_limit IS NOT NULL AND sg.participant_count >= sg.student_limit) AS is_full,
+        sg.version
+    FROM study_groups sg
+    -- A missing cursor becomes the lowest possible key, keeping one indexable predicate
+    WHERE (sg.start_time, sg.id) > (
+            COALESCE(p_after_start_time, '-infinity'::TIMESTAMPTZ),
+            COALESCE(p_after_id, '00000000-0000-0000-0000-000000000000'::UUID)
+          )
+      AND sg.end_time > NOW()
+      AND sg.expires_at > NOW()
+    ORDER BY sg.start_time ASC, sg.id ASC
+    LIMIT LEAST(GREATEST(COALESCE(p_limit, 24), 1), 100);
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+DROP FUNCTION IF EXISTS search_study_groups(TEXT, INTEGER, REAL, TIMESTAMPTZ, UUID);
+
+CREATE FUNCTION search_study_groups(
+    p_query TEXT,
+    p_limit INTEGER DEFAULT 20,
+    p_after_rank REAL DEFAULT NULL,
+    p_after_start_time TIMESTAMPTZ DEFAULT NULL,
+    p_after_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    subject TEXT,
+    description TEXT,
+    professor_name TEXT,
+    location TEXT,
+    start_time TIMESTAMPTZ,
+    end_time TIMESTAMPTZ,
+    student_limit INTEGER,
+    organizer_name TEXT,
+    created_at TIMESTAMPTZ,
+    expires_at TIMESTAMPTZ,
+    participant_count INTEGER,
+    is_full BOOLEAN,
+    version BIGINT,
+    rank REAL
+) AS $$
+DECLARE
+    v_query TEXT := LOWER(BTRIM(COALESCE(p_query, '')));
+    v_tsquery TSQUERY;
+    v_pattern TEXT;
+BEGIN
+    IF v_query = '' THEN
+        RETURN;
+    END IF;
+
+    v_tsquery := websearch_to_tsquery('english', v_query);
+    -- Escape LIKE wildcards so user input is matched literally
+    v_pattern := '%' || replace(replace(replace(v_query, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+
+    RETURN QUERY
+    WITH matches AS (
+        SELECT
+            sg.*,
+            (ts_rank(sg.search_vector, v_tsquery) + word_similarity(v_query, sg.search_text))::REAL AS match_rank
+        FROM study_groups sg
+        WHERE (sg.search_vector @@ v_tsquery OR sg.search_text LIKE v_pattern)
+          AND sg.end_time > NOW()
+          AND sg.expires_at > NOW()
+    )
+    SELECT
+        m.id,
+        m.subject,
+        m.description,
+        m.professor_name,
+        m.location,
+        m.start_time,
+        m.end_time,
+        m.student_limit,
+        m.organizer_name,
+        m.created_at,
+        m.expires_at,
+        m.participant_count,
+        (m.student_limit IS NOT NULL AND m.participant_count >= m.student_limit) AS is_full,
+        m.version,
+        m.match_rank
+    FROM matches m
+    -- A cursor with only a rank continues from the start of that rank, as the page RPC
+    -- treats a missing start_time/id, instead of comparing against NULL and dropping it
+    WHERE p_after_rank IS NULL
+       OR m.match_rank < p_after_rank
+       OR (m.match_rank = p_after_rank AND (m.start_time, m.id) > (
+            COALESCE(p_after_start_time, '-infinity'::TIMESTAMPTZ),
+            COALESCE(p_after_id, '00000000-0000-0000-0000-000000000000'::UUID)
+          ))
+    ORDER BY m.match_rank DESC, m.start_time ASC, m.id ASC
+    LIMIT LEAST(GREATEST(COALESCE(p_limit, 20), 1), 100);
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+GRANT EXECUTE ON FUNCTION get_study_groups_page(INTEGER, TIMESTAMPTZ, UUID) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION search_study_groups(TEXT, INTEGER, REAL, TIMESTAMPTZ, UUID) TO anon, authenticated;
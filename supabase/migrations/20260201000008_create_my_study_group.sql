@@ -0,0 +1,92 @@
+-- ABOUTME: Transactional RPC for dashboard group creation
+-- ABOUTME: Inserts the group and the organizer's participant row together and returns the list row
+
+-- Runs as the caller (SECURITY INVOKER) so the existing insert policies still apply.
+-- The organizer email always comes from the JWT, never from the client.
+-- The row is read after the organizer's participant insert, so participant_count and
+-- version already include that bump; clients store the version like any list row's.
+CREATE OR REPLACE FUNCTION create_my_study_group(
+    p_subject TEXT,
+    p_location TEXT,
+    p_start_time TIMESTAMPTZ,
+    p_end_time TIMESTAMPTZ,
+    p_description TEXT DEFAULT NULL,
+    p_professor_name TEXT DEFAULT NULL,
+    p_student_limit INTEGER DEFAULT NULL,
+    p_organizer_name TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    subject TEXT,
+    description TEXT,
+    professor_name TEXT,
+    location TEXT,
+    start_time TIMESTAMPTZ,
+    end_time TIMESTAMPTZ,
+    student_limit INTEGER,
+    organizer_name TEXT,
+    created_at TIMESTAMPTZ,
+    expires_at TIMESTAMPTZ,
+    participant_count INTEGER,
+    is_full BOOLEAN,
+    version BIGINT
+) AS $$
+DECLARE
+    v_email TEXT := LOWER(auth.jwt() ->> 'email');
+    v_group_id UUID;
+BEGIN
+    IF v_email IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    INSERT INTO study_groups (
+        subject,
+        description,
+        professor_name,
+        location,
+        start_time,
+        end_time,
+        student_limit,
+        organizer_name,
+        organizer_email
+    )
+    VALUES (
+        p_subject,
+        p_description,
+        p_professor_name,
+        p_location,
+        p_start_time,
+        p_end_time,
+        p_student_limit,
+        p_organizer_name,
+        v_email
+    )
+    RETURNING study_groups.id INTO v_group_id;
+
+    -- Both inserts share one transaction: if this fails, the group is rolled back too
+    INSERT INTO participants (study_group_id, name, email)
+    VALUES (v_group_id, COALESCE(NULLIF(BTRIM(p_organizer_name), ''), 'Organizer'), v_email);
+
+    RETURN QUERY
+    SELECT
+        sg.id,
+        sg.subject,
+        sg.description,
+        sg.professor_name,
+        sg.location,
+        sg.start_time,
+        sg.end_time,
+        sg.student_limit,
+        sg.organizer_name,
+        sg.created_at,
+        sg.expires_at,
+        sg.participant_count,
+        (sg.student_limit IS NOT NULL AND sg.participant_count >= sg.student_limit) AS is_full,
+        sg.version
+    FROM study_groups sg
+    WHERE sg.id = v_group_id;
+END;
+$$ LANGUAGE plpgsql SECURITY INVOKER;
+
+REVOKE EXECUTE ON FUNCTION create_my_study_group(TEXT, TEXT, TIMESTAMPTZ, TIMESTAMPTZ, TEXT, TEXT, INTEGER, TEXT) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION create_my_study_group(TEXT, TEXT, TIMESTAMPTZ, TIMESTAMPTZ, TEXT, TEXT, INTEGER, TEXT) TO authenticated;
@@ -0,0 +1,214 @@
+-- ABOUTME: Stores organizer and participant emails lowercased, enforced on write
+-- ABOUTME: Membership checks, RLS policies and dashboard queries become plain index lookups
+
+-- Trigger functions to normalize emails before they are stored
+CREATE OR REPLACE FUNCTION normalize_organizer_email()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.organizer_email := LOWER(BTRIM(NEW.organizer_email));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION normalize_participant_email()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.email := LOWER(BTRIM(NEW.email));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_normalize_organizer_email
+    BEFORE INSERT OR UPDATE OF organizer_email ON study_groups
+    FOR EACH ROW
+    EXECUTE FUNCTION normalize_organizer_email();
+
+CREATE TRIGGER trigger_normalize_participant_email
+    BEFORE INSERT OR UPDATE OF email ON participants
+    FOR EACH ROW
+    EXECUTE FUNCTION normalize_participant_email();
+
+-- Backfill: drop joins that only differ by case (keep the earliest), then lowercase
+DELETE FROM participants p
+USING participants earlier
+WHERE earlier.study_group_id = p.study_group_id
+  AND LOWER(BTRIM(earlier.email)) = LOWER(BTRIM(p.email))
+  AND (earlier.joined_at, earlier.id) < (p.joined_at, p.id);
+
+UPDATE participants
+SET email = LOWER(BTRIM(email))
+WHERE email <> LOWER(BTRIM(email));
+
+UPDATE study_groups
+SET organizer_email = LOWER(BTRIM(organizer_email))
+WHERE organizer_email <> LOWER(BTRIM(organizer_email));
+
+-- The triggers guarantee these; the constraints document and protect the invariant
+ALTER TABLE study_groups
+ADD CONSTRAINT study_groups_organizer_email_lowercase
+    CHECK (organizer_email = LOWER(organizer_email));
+
+ALTER TABLE participants
+ADD CONSTRAINT participants_email_lowercase
+    CHECK (email = LOWER(email));
+
+-- Membership check: each branch is a single index probe
+-- (primary key for the organizer, unique (study_group_id, email) for participants)
+CREATE OR REPLACE FUNCTION is_group_member(p_study_group_id UUID, p_email TEXT)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_email TEXT := LOWER(BTRIM(p_email));
+BEGIN
+    RETURN EXISTS(
+        SELECT 1 FROM study_groups
+        WHERE id = p_study_group_id
+        AND organizer_email = v_email
+    ) OR EXISTS(
+        SELECT 1 FROM participants
+        WHERE study_group_id = p_study_group_id
+        AND email = v_email
+    );
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;
+
+-- Organizer policies compare against the lowercased JWT email
+DROP POLICY IF EXISTS "study_groups_insert_authenticated" ON study_groups;
+CREATE POLICY "study_groups_insert_authenticated"
+    ON study_groups
+    FOR INSERT
+    TO authenticated
+    WITH CHECK (
+        -- Checked after the normalize trigger has lowercased organizer_email
+        organizer_email = LOWER(auth.jwt() ->> 'email')
+    );
+
+DROP POLICY IF EXISTS "study_groups_delete_organizer" ON study_groups;
+CREATE POLICY "study_groups_delete_organizer"
+    ON study_groups
+    FOR DELETE
+    TO authenticated
+    USING (organizer_email = LOWER(auth.jwt() ->> 'email'));
+
+DROP POLICY IF EXISTS "study_groups_update_organizer" ON study_groups;
+CREATE POLICY "study_groups_update_organizer"
+    ON study_groups
+    FOR UPDATE
+    TO authenticated
+    USING (organizer_email = LOWER(auth.jwt() ->> 'email'))
+    WITH CHECK (organizer_email = LOWER(auth.jwt() ->> 'email'));
+
+-- Organizer RPCs: same comparison, so mixed-case JWT emails still match
+CREATE OR REPLACE FUNCTION get_my_study_groups()
+RETURNS TABLE (
+    id UUID,
+    subject TEXT,
+    professor_name TEXT,
+    location TEXT,
+    start_time TIMESTAMPTZ,
+    end_time TIMESTAMPTZ,
+    student_limit INTEGER,
+    organizer_name TEXT,
+    organizer_email TEXT,
+    created_at TIMESTAMPTZ,
+    expires_at TIMESTAMPTZ,
+    participant_count INTEGER,
+    is_full BOOLEAN
+) AS $$
+BEGIN
+    -- Only return groups for the authenticated user
+    IF auth.jwt() IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    RETURN QUERY
+    SELECT
+        sg.id,
+        sg.subject,
+        sg.professor_name,
+        sg.location,
+        sg.start_time,
+        sg.end_time,
+        sg.student_limit,
+        sg.organizer_name,
+        sg.organizer_email,
+        sg.created_at,
+        sg.expires_at,
+        sg.participant_count,
+        (sg.student_limit IS NOT NULL AND sg.participant_count >= sg.student_limit) AS is_full
+    FROM study_groups sg
+    WHERE sg.organizer_email = LOWER(auth.jwt() ->> 'email')
+    ORDER BY sg.created_at DESC;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION get_my_group_participants(p_study_group_id UUID)
+RETURNS TABLE (
+    id UUID,
+    name TEXT,
+    email TEXT,
+    joined_at TIMESTAMPTZ
+) AS $$
+DECLARE
+    v_organizer_email TEXT;
+BEGIN
+    -- Only allow if authenticated
+    IF auth.jwt() IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    -- Verify the user owns this group
+    SELECT sg.organizer_email INTO v_organizer_email
+    FROM study_groups sg
+    WHERE sg.id = p_study_group_id;
+
+    IF v_organizer_email IS NULL THEN
+        RAISE EXCEPTION 'Study group not found';
+    END IF;
+
+    IF v_organizer_email IS DISTINCT FROM LOWER(auth.jwt() ->> 'email') THEN
+        RAISE EXCEPTION 'Not authorized to view participants for this group';
+    END IF;
+
+    RETURN QUERY
+    SELECT
+        p.id,
+        p.name,
+        p.email,
+        p.joined_at
+    FROM participants p
+    WHERE p.study_group_id = p_study_group_id
+    ORDER BY p.joined_at ASC;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION delete_my_study_group(p_study_group_id UUID)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_organizer_email TEXT;
+    v_deleted_count INTEGER;
+BEGIN
+    -- Only allow if authenticated
+    IF auth.jwt() IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    -- Verify the user owns this group
+    SELECT sg.organizer_email INTO v_organizer_email
+    FROM study_groups sg
+    WHERE sg.id = p_study_group_id;
+
+    IF v_organizer_email IS NULL THEN
+        RAISE EXCEPTION 'Study group not found';
+    END IF;
+
+    IF v_organizer_email IS DISTINCT FROM LOWER(auth.jwt() ->> 'email') THEN
+        RAISE EXCEPTION 'Not authorized to delete this group';
+    END IF;
+
+    -- Delete the group (participants cascade automatically)
+    DELETE FROM study_groups WHERE id = p_study_group_id;
+    GET DIAGNOSTICS v_deleted_count = ROW_COUNT;
+
+    RETURN v_deleted_count > 0;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
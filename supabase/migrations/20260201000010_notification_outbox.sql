@@ -0,0 +1,235 @@
+-- ABOUTME: Transactional outbox for join notification emails
+-- ABOUTME: A participants trigger enqueues messages; a worker claims, sends, retries and prunes them
+
+-- Enable pg_net for the scheduled worker call (already available on Supabase)
+CREATE EXTENSION IF NOT EXISTS pg_net;
+
+CREATE TABLE notification_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL CHECK (kind IN ('join_confirmation', 'organizer_join')),
+    -- Deleting a group (organizer delete or hourly cleanup) only detaches its messages: the
+    -- payload already holds every group field the email shows, so queued emails still go out
+    study_group_id UUID REFERENCES study_groups(id) ON DELETE SET NULL,
+    recipient TEXT NOT NULL,
+    -- Snapshot of everything the email needs, taken at join time
+    payload JSONB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_at TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    sent_at TIMESTAMPTZ
+);
+
+COMMENT ON TABLE notification_outbox IS 'Join emails waiting to be delivered by the process-notification-outbox worker. Never written by clients.';
+COMMENT ON COLUMN notification_outbox.study_group_id IS 'NULL once the group is deleted; the payload keeps what the email needs';
+
+-- Workers only scan messages that are ready (or whose lease expired)
+CREATE INDEX idx_notification_outbox_ready
+    ON notification_outbox (available_at, id)
+    WHERE status IN ('pending', 'sending');
+
+CREATE INDEX idx_notification_outbox_study_group_id ON notification_outbox (study_group_id);
+
+-- Service role only: no policies for anon/authenticated
+ALTER TABLE notification_outbox ENABLE ROW LEVEL SECURITY;
+
+-- Trigger function to enqueue the participant confirmation and the organizer notice
+-- SECURITY DEFINER because anonymous joins cannot write to the outbox
+CREATE OR REPLACE FUNCTION enqueue_join_notifications()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_group study_groups%ROWTYPE;
+    v_payload JSONB;
+BEGIN
+    -- participant_count already includes this join (trigger_check_capacity fires first)
+    SELECT * INTO v_group FROM study_groups WHERE id = NEW.study_group_id;
+
+    -- Organizers adding themselves (dashboard creation) need neither email
+    IF NEW.email = v_group.organizer_email THEN
+        RETURN NEW;
+    END IF;
+
+    v_payload := jsonb_build_object(
+        'participant_id', NEW.id,
+        'participant_name', NEW.name,
+        'participant_email', NEW.email,
+        'subject', v_group.subject,
+        'professor_name', v_group.professor_name,
+        'location', v_group.location,
+        'start_time', v_group.start_time,
+        'end_time', v_group.end_time,
+        'student_limit', v_group.student_limit,
+        'organizer_name', v_group.organizer_name,
+        'participant_count', v_group.participant_count
+    );
+
+    INSERT INTO notification_outbox (kind, study_group_id, recipient, payload)
+    VALUES
+        ('join_confirmation', NEW.study_group_id, NEW.email, v_payload),
+        ('organizer_join', NEW.study_group_id, v_group.organizer_email, v_payload);
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Set app.notifications_enabled = 'off' (database or session) to queue nothing: the local
+-- test harness does, and so should benchmark targets, whose seeded joins would otherwise
+-- queue real emails. Unset means on.
+CREATE TRIGGER trigger_enqueue_join_notifications
+    AFTER INSERT ON participants
+    FOR EACH ROW
+    WHEN (current_setting('app.notifications_enabled', true) IS DISTINCT FROM 'off')
+    EXECUTE FUNCTION enqueue_join_notifications();
+
+-- Function to claim a batch of ready messages for delivery
+-- Messages stuck in 'sending' longer than the lease (crashed worker) are claimed again
+CREATE OR REPLACE FUNCTION claim_notification_batch(
+    p_limit INTEGER DEFAULT 100,
+    p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS SETOF notification_outbox AS $$
+BEGIN
+    RETURN QUERY
+    WITH ready AS (
+        SELECT o.id
+        FROM notification_outbox o
+        WHERE o.status IN ('pending', 'sending')
+          AND o.available_at <= NOW()
+          AND (o.status = 'pending' OR o.locked_at < NOW() - make_interval(secs => p_lease_seconds))
+        ORDER BY o.available_at, o.id
+        LIMIT GREATEST(p_limit, 1)
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE notification_outbox o
+    SET status = 'sending',
+        locked_at = NOW(),
+        attempts = o.attempts + 1
+    FROM ready
+    WHERE o.id = ready.id
+    RETURNING o.*;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function to mark delivered messages
+CREATE OR REPLACE FUNCTION complete_notifications(p_ids BIGINT[])
+RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    UPDATE notification_outbox
+    SET status = 'sent',
+        sent_at = NOW(),
+        locked_at = NULL,
+        last_error = NULL
+    WHERE id = ANY(p_ids)
+      AND status = 'sending';
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function to reschedule failed messages with exponential backoff (30s, 60s, 120s, ... capped at 1h)
+-- Messages that used up p_max_attempts are parked as 'failed'
+CREATE OR REPLACE FUNCTION fail_notifications(
+    p_ids BIGINT[],
+    p_error TEXT,
+    p_max_attempts INTEGER DEFAULT 5
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    UPDATE notification_outbox
+    SET status = CASE WHEN attempts >= p_max_attempts THEN 'failed' ELSE 'pending' END,
+        available_at = NOW() + LEAST(INTERVAL '30 seconds' * POWER(2, attempts - 1), INTERVAL '1 hour'),
+        locked_at = NULL,
+        last_error = p_error
+    WHERE id = ANY(p_ids)
+      AND status = 'sending';
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION claim_notification_batch(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION complete_notifications(BIGINT[]) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION fail_notifications(BIGINT[], TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_notification_batch(INTEGER, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION complete_notifications(BIGINT[]) TO service_role;
+GRANT EXECUTE ON FUNCTION fail_notifications(BIGINT[], TEXT, INTEGER) TO service_role;
+
+-- Function to wake the worker when messages are ready
+-- Configure with:
+--   ALTER DATABASE postgres SET app.notification_worker_url = 'https://<ref>.supabase.co/functions/v1/process-notification-outbox';
+--   SELECT vault.create_secret('<service role key>', 'notification_worker_key');
+-- The key lives in Vault, encrypted at rest, rather than in a database setting that any
+-- role can read with current_setting(). Does nothing until both exist, or when the queue
+-- is empty.
+CREATE OR REPLACE FUNCTION dispatch_notification_worker()
+RETURNS BIGINT AS $$
+DECLARE
+    v_url TEXT := NULLIF(current_setting('app.notification_worker_url', true), '');
+    v_key TEXT;
+BEGIN
+    SELECT NULLIF(s.decrypted_secret, '') INTO v_key
+    FROM vault.decrypted_secrets s
+    WHERE s.name = 'notification_worker_key';
+
+    IF v_url IS NULL OR v_key IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM notification_outbox
+        WHERE status IN ('pending', 'sending') AND available_at <= NOW()
+    ) THEN
+        RETURN NULL;
+    END IF;
+
+    RETURN net.http_post(
+        url := v_url,
+        headers := jsonb_build_object(
+            'Authorization', 'Bearer ' || v_key,
+            'Content-Type', 'application/json'
+        ),
+        body := '{}'::JSONB
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION dispatch_notification_worker() FROM PUBLIC, anon, authenticated;
+
+-- Drain the outbox every minute
+SELECT cron.schedule(
+    'process-notification-outbox',
+    '* * * * *',
+    $$SELECT dispatch_notification_worker()$$
+);
+
+-- Delete sent messages after a week and parked failures after a month, so someone
+-- can still read last_error before they go. Pending and sending rows are never touched.
+CREATE OR REPLACE FUNCTION prune_notification_outbox()
+RETURNS INTEGER AS $$
+DECLARE
+    v_pruned INTEGER;
+BEGIN
+    DELETE FROM notification_outbox
+    WHERE (status = 'sent' AND sent_at < NOW() - INTERVAL '7 days')
+       OR (status = 'failed' AND created_at < NOW() - INTERVAL '30 days');
+    GET DIAGNOSTICS v_pruned = ROW_COUNT;
+
+    RETURN v_pruned;
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION prune_notification_outbox() FROM PUBLIC, anon, authenticated;
+
+SELECT cron.schedule(
+    'prune-notification-outbox',
+    '45 3 * * *',
+    $$SELECT prune_notification_outbox()$$
+);
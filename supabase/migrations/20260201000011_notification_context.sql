@@ -0,0 +1,49 @@
+-- ABOUTME: Single-statement lookup of everything a join email needs
+-- ABOUTME: Replaces select("*") plus a separate get_participant_count call in the email functions
+
+-- Returns no row when the group does not exist.
+-- Participant columns are NULL when p_participant_id is omitted or belongs to another group.
+CREATE OR REPLACE FUNCTION get_notification_context(
+    p_study_group_id UUID,
+    p_participant_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    subject TEXT,
+    professor_name TEXT,
+    location TEXT,
+    start_time TIMESTAMPTZ,
+    end_time TIMESTAMPTZ,
+    student_limit INTEGER,
+    organizer_name TEXT,
+    organizer_email TEXT,
+    participant_count INTEGER,
+    remaining_seats INTEGER,
+    participant_name TEXT,
+    participant_email TEXT
+) AS $$
+    SELECT
+        sg.subject,
+        sg.professor_name,
+        sg.location,
+        sg.start_time,
+        sg.end_time,
+        sg.student_limit,
+        sg.organizer_name,
+        sg.organizer_email,
+        sg.participant_count,
+        CASE
+            WHEN sg.student_limit IS NULL THEN NULL
+            ELSE GREATEST(sg.student_limit - sg.participant_count, 0)
+        END AS remaining_seats,
+        p.name AS participant_name,
+        p.email AS participant_email
+    FROM study_groups sg
+    LEFT JOIN participants p
+        ON p.id = p_participant_id
+       AND p.study_group_id = sg.id
+    WHERE sg.id = p_study_group_id;
+$$ LANGUAGE sql STABLE;
+
+-- Exposes organizer and participant emails: edge functions (service role) only
+REVOKE EXECUTE ON FUNCTION get_notification_context(UUID, UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_notification_context(UUID, UUID) TO service_role;
@@ -0,0 +1,244 @@
+-- ABOUTME: Opt-in, sampled timing for the hot RPCs, the capacity trigger and batched cleanup
+-- ABOUTME: Samples land in an unlogged ring buffer read by `python main.py report`
+
+-- Kept out of the API-exposed public schema so clients cannot write fake samples
+CREATE SCHEMA IF NOT EXISTS instrumentation;
+
+-- Ring buffer: each sample overwrites slot (n mod ring size), so the table never grows.
+-- UNLOGGED skips WAL; samples are diagnostics and may be lost on a crash.
+CREATE UNLOGGED TABLE instrumentation.rpc_timing_samples (
+    slot INTEGER PRIMARY KEY,
+    rpc TEXT NOT NULL,
+    duration_ms DOUBLE PRECISION NOT NULL,
+    recorded_at TIMESTAMPTZ NOT NULL,
+    -- The rate can change per call (ALTER DATABASE, ALTER ROLE, SET LOCAL), so the report
+    -- scales each sample by its own rate rather than the reporting session's setting
+    sample_rate DOUBLE PRECISION NOT NULL CHECK (sample_rate > 0 AND sample_rate <= 1)
+);
+
+CREATE SEQUENCE instrumentation.rpc_timing_slot;
+
+COMMENT ON TABLE instrumentation.rpc_timing_samples IS 'Sampled RPC durations; enable with app.rpc_timing_sample_rate';
+COMMENT ON COLUMN instrumentation.rpc_timing_samples.sample_rate IS 'app.rpc_timing_sample_rate when the sample was taken; each sample stands for 1 / sample_rate calls';
+
+-- Record one call if sampling is on. Configure with:
+--   ALTER DATABASE postgres SET app.rpc_timing_sample_rate = '0.1';  -- fraction of calls, 0 = off
+--   ALTER DATABASE postgres SET app.rpc_timing_ring_size = '10000';  -- samples kept (default 10000)
+-- Reading a setting is all a call pays while sampling is off (the default).
+CREATE OR REPLACE FUNCTION instrumentation.record_rpc_timing(p_rpc TEXT, p_started_at TIMESTAMPTZ)
+RETURNS VOID AS $$
+DECLARE
+    v_rate DOUBLE PRECISION := LEAST(COALESCE(
+        NULLIF(current_setting('app.rpc_timing_sample_rate', true), '')::DOUBLE PRECISION, 0
+    ), 1);
+    v_ring_size INTEGER;
+BEGIN
+    IF v_rate <= 0 OR random() >= v_rate THEN
+        RETURN;
+    END IF;
+
+    v_ring_size := COALESCE(NULLIF(current_setting('app.rpc_timing_ring_size', true), '')::INTEGER, 10000);
+
+    INSERT INTO instrumentation.rpc_timing_samples (slot, rpc, duration_ms, recorded_at, sample_rate)
+    VALUES (
+        nextval('instrumentation.rpc_timing_slot') % v_ring_size,
+        p_rpc,
+        EXTRACT(EPOCH FROM clock_timestamp() - p_started_at) * 1000,
+        NOW(),
+        v_rate
+    )
+    ON CONFLICT (slot) DO UPDATE
+        SET rpc = EXCLUDED.rpc,
+            duration_ms = EXCLUDED.duration_ms,
+            recorded_at = EXCLUDED.recorded_at,
+            sample_rate = EXCLUDED.sample_rate;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Only SECURITY DEFINER functions (which run as their owner) and the service role record
+-- samples; API clients calling it directly could write fake report data
+GRANT USAGE ON SCHEMA instrumentation TO service_role;
+REVOKE EXECUTE ON FUNCTION instrumentation.record_rpc_timing(TEXT, TIMESTAMPTZ) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION instrumentation.record_rpc_timing(TEXT, TIMESTAMPTZ) TO service_role;
+
+-- Instrumented definitions below are unchanged apart from the timing lines.
+--
+-- get_study_groups_with_counts() is left out: it runs as the caller and must stay STABLE so
+-- PostgREST can serve it over GET in a read-only transaction, where a sample insert fails.
+-- Its cost shows up in the report's pg_stat_statements section instead.
+
+CREATE OR REPLACE FUNCTION get_my_group_participants(p_study_group_id UUID)
+RETURNS TABLE (
+    id UUID,
+    name TEXT,
+    email TEXT,
+    joined_at TIMESTAMPTZ
+) AS $$
+DECLARE
+    v_started_at TIMESTAMPTZ := clock_timestamp();
+    v_organizer_email TEXT;
+BEGIN
+    -- Only allow if authenticated
+    IF auth.jwt() IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    -- Verify the user owns this group
+    SELECT sg.organizer_email INTO v_organizer_email
+    FROM study_groups sg
+    WHERE sg.id = p_study_group_id;
+
+    IF v_organizer_email IS NULL THEN
+        RAISE EXCEPTION 'Study group not found';
+    END IF;
+
+    IF v_organizer_email IS DISTINCT FROM LOWER(auth.jwt() ->> 'email') THEN
+        RAISE EXCEPTION 'Not authorized to view participants for this group';
+    END IF;
+
+    RETURN QUERY
+    SELECT
+        p.id,
+        p.name,
+        p.email,
+        p.joined_at
+    FROM participants p
+    WHERE p.study_group_id = p_study_group_id
+    ORDER BY p.joined_at ASC;
+
+    PERFORM instrumentation.record_rpc_timing('get_my_group_participants', v_started_at);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION get_group_participants_if_member(
+    p_study_group_id UUID,
+    p_requester_email TEXT
+)
+RETURNS TABLE (
+    id UUID,
+    name TEXT,
+    email TEXT,
+    joined_at TIMESTAMPTZ
+) AS $$
+DECLARE
+    v_started_at TIMESTAMPTZ := clock_timestamp();
+BEGIN
+    -- Only return participant details if requester is a member
+    IF NOT is_group_member(p_study_group_id, p_requester_email) THEN
+        -- Return empty result for non-members
+        PERFORM instrumentation.record_rpc_timing('get_group_participants_if_member', v_started_at);
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT
+        p.id,
+        p.name,
+        p.email,
+        p.joined_at
+    FROM participants p
+    WHERE p.study_group_id = p_study_group_id
+    ORDER BY p.joined_at ASC;
+
+    PERFORM instrumentation.record_rpc_timing('get_group_participants_if_member', v_started_at);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Timed from trigger entry, so lock waits on a busy group show up in the samples
+CREATE OR REPLACE FUNCTION check_study_group_capacity()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_started_at TIMESTAMPTZ := clock_timestamp();
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF NEW.study_group_id IS NOT DISTINCT FROM OLD.study_group_id THEN
+            RETURN NULL;
+        END IF;
+
+        UPDATE study_groups
+        SET participant_count = participant_count - 1
+        WHERE id = OLD.study_group_id;
+    END IF;
+
+    UPDATE study_groups
+    SET participant_count = participant_count + 1
+    WHERE id = NEW.study_group_id
+      AND (student_limit IS NULL OR participant_count < student_limit);
+
+    IF NOT FOUND THEN
+        IF EXISTS (SELECT 1 FROM study_groups WHERE id = NEW.study_group_id) THEN
+            RAISE EXCEPTION 'Study group is full'
+                USING ERRCODE = 'check_violation';
+        END IF;
+        -- Unknown group: the foreign key constraint reports the error
+    END IF;
+
+    PERFORM instrumentation.record_rpc_timing('check_study_group_capacity', v_started_at);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- The hourly job, the cleanup Edge Function and cleanup_expired_groups() all run through here
+CREATE OR REPLACE FUNCTION cleanup_expired_groups_batch(p_batch_size INTEGER DEFAULT 500)
+RETURNS TABLE (
+    deleted_groups INTEGER,
+    deleted_participants INTEGER,
+    has_more BOOLEAN
+) AS $$
+DECLARE
+    v_started_at TIMESTAMPTZ := clock_timestamp();
+    v_now TIMESTAMPTZ := NOW();
+    v_deleted_groups INTEGER;
+    v_deleted_participants INTEGER;
+BEGIN
+    IF p_batch_size IS NULL OR p_batch_size < 1 THEN
+        RAISE EXCEPTION 'Batch size must be a positive integer';
+    END IF;
+
+    WITH ended AS (
+        -- Past end time, regardless of participants
+        SELECT sg.id
+        FROM study_groups sg
+        WHERE sg.end_time < v_now
+        ORDER BY sg.end_time
+        LIMIT p_batch_size
+        FOR UPDATE SKIP LOCKED
+    ),
+    abandoned AS (
+        -- Expired with no participants
+        SELECT sg.id
+        FROM study_groups sg
+        WHERE sg.expires_at < v_now
+          AND sg.participant_count = 0
+        ORDER BY sg.expires_at
+        LIMIT p_batch_size
+        FOR UPDATE SKIP LOCKED
+    ),
+    batch AS (
+        SELECT ended.id FROM ended
+        UNION
+        SELECT abandoned.id FROM abandoned
+        LIMIT p_batch_size
+    ),
+    deleted AS (
+        DELETE FROM study_groups sg
+        USING batch
+        WHERE sg.id = batch.id
+        RETURNING sg.participant_count
+    )
+    SELECT COUNT(*)::INTEGER, COALESCE(SUM(deleted.participant_count), 0)::INTEGER
+    INTO v_deleted_groups, v_deleted_participants
+    FROM deleted;
+
+    deleted_groups := v_deleted_groups;
+    deleted_participants := v_deleted_participants;
+    has_more := EXISTS (
+        SELECT 1 FROM study_groups sg WHERE sg.end_time < v_now
+    ) OR EXISTS (
+        SELECT 1 FROM study_groups sg WHERE sg.expires_at < v_now AND sg.participant_count = 0
+    );
+
+    PERFORM instrumentation.record_rpc_timing('cleanup_expired_groups_batch', v_started_at);
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
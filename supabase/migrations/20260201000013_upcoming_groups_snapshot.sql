@@ -0,0 +1,181 @@
+-- ABOUTME: Precomputed "upcoming groups" snapshot for the anonymous home page, kept current by triggers
+-- ABOUTME: get_upcoming_groups_snapshot() returns keyset pages of payloads with an ETag, or "not modified"
+
+-- One row per study group holding the card JSON (counts and is_full included), so a read
+-- aggregates stored payloads instead of recomputing every row. Deleted groups stay behind as
+-- tombstones (deleted = TRUE) until pruned, so a client's ETag can tell that a row went away.
+CREATE TABLE upcoming_groups_snapshot (
+    id UUID PRIMARY KEY,
+    start_time TIMESTAMPTZ NOT NULL,
+    end_time TIMESTAMPTZ NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL,
+    payload JSONB,
+    deleted BOOLEAN NOT NULL DEFAULT FALSE,
+    -- Transaction that last wrote the row; compared against ETags (see below)
+    changed_xid XID8 NOT NULL,
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE upcoming_groups_snapshot IS 'Card payloads for get_upcoming_groups_snapshot(); maintained by trigger_sync_upcoming_groups_snapshot';
+
+-- "Changed since this ETag?" probe
+CREATE INDEX idx_upcoming_groups_snapshot_changed_xid ON upcoming_groups_snapshot (changed_xid);
+
+-- A group leaves the listing at whichever of end_time/expires_at comes first
+CREATE INDEX idx_upcoming_groups_snapshot_visible_until
+    ON upcoming_groups_snapshot (LEAST(end_time, expires_at))
+    WHERE NOT deleted;
+
+-- Pages are read in (start_time, id) order straight from this index; ended rows are
+-- filtered as they go past, and tombstones are not in it at all
+CREATE INDEX idx_upcoming_groups_snapshot_start_time_id
+    ON upcoming_groups_snapshot (start_time, id)
+    WHERE NOT deleted;
+
+-- Only reachable through the RPC
+ALTER TABLE upcoming_groups_snapshot ENABLE ROW LEVEL SECURITY;
+REVOKE ALL ON upcoming_groups_snapshot FROM anon, authenticated;
+
+-- Same fields as get_study_groups_page(), as one JSON object
+CREATE OR REPLACE FUNCTION upcoming_group_payload(sg study_groups)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'id', sg.id,
+        'subject', sg.subject,
+        'description', sg.description,
+        'professor_name', sg.professor_name,
+        'location', sg.location,
+        'start_time', sg.start_time,
+        'end_time', sg.end_time,
+        'student_limit', sg.student_limit,
+        'organizer_name', sg.organizer_name,
+        'created_at', sg.created_at,
+        'expires_at', sg.expires_at,
+        'participant_count', sg.participant_count,
+        'is_full', (sg.student_limit IS NOT NULL AND sg.participant_count >= sg.student_limit),
+        'version', sg.version
+    );
+$$ LANGUAGE sql IMMUTABLE;
+
+-- PostgREST would otherwise expose it as a computed column on study_groups
+REVOKE EXECUTE ON FUNCTION upcoming_group_payload(study_groups) FROM PUBLIC, anon, authenticated;
+
+-- Incremental refresh. Joins and leaves reach this through the participant_count update
+-- the participants triggers make on study_groups, so no trigger on participants is needed.
+CREATE OR REPLACE FUNCTION sync_upcoming_groups_snapshot()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE upcoming_groups_snapshot
+        SET deleted = TRUE,
+            payload = NULL,
+            changed_xid = pg_current_xact_id(),
+            changed_at = NOW()
+        WHERE id = OLD.id;
+        RETURN OLD;
+    END IF;
+
+    INSERT INTO upcoming_groups_snapshot (id, start_time, end_time, expires_at, payload, changed_xid)
+    VALUES (NEW.id, NEW.start_time, NEW.end_time, NEW.expires_at, upcoming_group_payload(NEW), pg_current_xact_id())
+    ON CONFLICT (id) DO UPDATE
+        SET start_time = EXCLUDED.start_time,
+            end_time = EXCLUDED.end_time,
+            expires_at = EXCLUDED.expires_at,
+            payload = EXCLUDED.payload,
+            deleted = FALSE,
+            changed_xid = EXCLUDED.changed_xid,
+            changed_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE TRIGGER trigger_sync_upcoming_groups_snapshot
+    AFTER INSERT OR UPDATE OR DELETE ON study_groups
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_upcoming_groups_snapshot();
+
+INSERT INTO upcoming_groups_snapshot (id, start_time, end_time, expires_at, payload, changed_xid)
+SELECT sg.id, sg.start_time, sg.end_time, sg.expires_at, upcoming_group_payload(sg), pg_current_xact_id()
+FROM study_groups sg;
+
+-- One page of upcoming groups as {"etag", "not_modified", "groups"}, continuing after
+-- (p_after_start_time, p_after_id) like get_study_groups_page(); "groups" is omitted when
+-- not modified. Listed means the same as everywhere else: end_time and expires_at both ahead.
+--
+-- The ETag is "<xmin>:<read time in ms>", where xmin is the oldest transaction still running
+-- when the snapshot was read. Every transaction that committed after that read has an id >= xmin,
+-- so "nothing changed" is: no snapshot row (or tombstone) written by such a transaction, and no
+-- listed group whose end_time/expires_at has passed since the read time. Both are index probes,
+-- and no shared counter row is bumped on writes. ETags older than 12 hours always get the full
+-- page, since tombstones are pruned after a day.
+--
+-- The ETag covers the whole catalogue, not just the page it came with: "not modified" means no
+-- page has changed, so a client can revalidate each page it kept with that page's ETag.
+--
+-- STABLE so PostgREST serves it on GET (cacheable) and pg_current_snapshot() is the query's snapshot.
+CREATE OR REPLACE FUNCTION get_upcoming_groups_snapshot(
+    p_etag TEXT DEFAULT NULL,
+    p_limit INTEGER DEFAULT 24,
+    p_after_start_time TIMESTAMPTZ DEFAULT NULL,
+    p_after_id UUID DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_etag TEXT := pg_snapshot_xmin(pg_current_snapshot())::TEXT
+        || ':' || FLOOR(EXTRACT(EPOCH FROM NOW()) * 1000)::BIGINT;
+    v_since_xid XID8;
+    v_since_at TIMESTAMPTZ;
+BEGIN
+    IF p_etag ~ '^[0-9]+:[0-9]+$' THEN
+        v_since_xid := split_part(p_etag, ':', 1)::XID8;
+        v_since_at := to_timestamp(split_part(p_etag, ':', 2)::BIGINT / 1000.0);
+    END IF;
+
+    -- Nested so page requests without an ETag never plan or run the change probes
+    IF v_since_xid IS NOT NULL AND v_since_at > NOW() - INTERVAL '12 hours' THEN
+        IF NOT EXISTS (
+               SELECT 1 FROM upcoming_groups_snapshot s WHERE s.changed_xid >= v_since_xid
+           )
+           AND NOT EXISTS (
+               SELECT 1 FROM upcoming_groups_snapshot s
+               WHERE NOT s.deleted
+                 AND LEAST(s.end_time, s.expires_at) > v_since_at
+                 AND LEAST(s.end_time, s.expires_at) <= NOW()
+           )
+        THEN
+            RETURN jsonb_build_object('etag', v_etag, 'not_modified', TRUE);
+        END IF;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'etag', v_etag,
+        'not_modified', FALSE,
+        'groups', COALESCE((
+            SELECT jsonb_agg(page.payload ORDER BY page.start_time, page.id)
+            FROM (
+                SELECT s.payload, s.start_time, s.id
+                FROM upcoming_groups_snapshot s
+                -- A missing cursor becomes the lowest possible key, keeping one indexable predicate
+                WHERE (s.start_time, s.id) > (
+                        COALESCE(p_after_start_time, '-infinity'::TIMESTAMPTZ),
+                        COALESCE(p_after_id, '00000000-0000-0000-0000-000000000000'::UUID)
+                      )
+                  AND NOT s.deleted
+                  AND s.end_time > NOW()
+                  AND s.expires_at > NOW()
+                ORDER BY s.start_time, s.id
+                LIMIT LEAST(GREATEST(COALESCE(p_limit, 24), 1), 100)
+            ) page
+        ), '[]'::JSONB)
+    );
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER SET search_path = public;
+
+GRANT EXECUTE ON FUNCTION get_upcoming_groups_snapshot(TEXT, INTEGER, TIMESTAMPTZ, UUID) TO anon, authenticated;
+
+-- Tombstones only matter to ETags younger than 12 hours; drop them after a day
+SELECT cron.schedule(
+    'prune-upcoming-groups-snapshot',
+    '30 * * * *',
+    $$DELETE FROM upcoming_groups_snapshot WHERE deleted AND changed_at < NOW() - INTERVAL '1 day'$$
+);
@@ -0,0 +1,155 @@
+-- ABOUTME: Catalogue version and delta RPC over upcoming_groups_snapshot
+-- ABOUTME: get_study_groups_since(version) returns "not modified", or only changed rows and tombstones
+
+-- The organizer dashboard syncs its own groups through the same deltas
+ALTER TABLE upcoming_groups_snapshot
+ADD COLUMN organizer_email TEXT;
+
+UPDATE upcoming_groups_snapshot s
+SET organizer_email = sg.organizer_email
+FROM study_groups sg
+WHERE sg.id = s.id;
+
+CREATE INDEX idx_upcoming_groups_snapshot_organizer_changed
+    ON upcoming_groups_snapshot (organizer_email, changed_xid);
+
+-- Unchanged apart from organizer_email; tombstones keep it so organizers see their deletes
+CREATE OR REPLACE FUNCTION sync_upcoming_groups_snapshot()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE upcoming_groups_snapshot
+        SET deleted = TRUE,
+            payload = NULL,
+            changed_xid = pg_current_xact_id(),
+            changed_at = NOW()
+        WHERE id = OLD.id;
+        RETURN OLD;
+    END IF;
+
+    INSERT INTO upcoming_groups_snapshot (
+        id, start_time, end_time, expires_at, organizer_email, payload, changed_xid
+    )
+    VALUES (
+        NEW.id, NEW.start_time, NEW.end_time, NEW.expires_at, NEW.organizer_email,
+        upcoming_group_payload(NEW), pg_current_xact_id()
+    )
+    ON CONFLICT (id) DO UPDATE
+        SET start_time = EXCLUDED.start_time,
+            end_time = EXCLUDED.end_time,
+            expires_at = EXCLUDED.expires_at,
+            organizer_email = EXCLUDED.organizer_email,
+            payload = EXCLUDED.payload,
+            deleted = FALSE,
+            changed_xid = EXCLUDED.changed_xid,
+            changed_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Newest transaction whose tombstones have been pruned. Versions at or below it may have
+-- missed a delete, so get_study_groups_since() sends those clients back to a full load.
+CREATE TABLE upcoming_groups_snapshot_horizon (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    pruned_xid XID8 NOT NULL DEFAULT '0'
+);
+
+INSERT INTO upcoming_groups_snapshot_horizon DEFAULT VALUES;
+
+ALTER TABLE upcoming_groups_snapshot_horizon ENABLE ROW LEVEL SECURITY;
+REVOKE ALL ON upcoming_groups_snapshot_horizon FROM anon, authenticated;
+
+-- Drop tombstones older than a day and advance the horizon past them
+CREATE OR REPLACE FUNCTION prune_upcoming_groups_snapshot()
+RETURNS INTEGER AS $$
+DECLARE
+    v_pruned INTEGER;
+    v_max_xid XID8;
+BEGIN
+    WITH pruned AS (
+        DELETE FROM upcoming_groups_snapshot
+        WHERE deleted AND changed_at < NOW() - INTERVAL '1 day'
+        RETURNING changed_xid
+    )
+    SELECT COUNT(*)::INTEGER, MAX(changed_xid) INTO v_pruned, v_max_xid FROM pruned;
+
+    IF v_max_xid IS NOT NULL THEN
+        UPDATE upcoming_groups_snapshot_horizon
+        SET pruned_xid = GREATEST(pruned_xid, v_max_xid);
+    END IF;
+
+    RETURN v_pruned;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION prune_upcoming_groups_snapshot() FROM PUBLIC, anon, authenticated;
+
+-- Replaces the bare DELETE scheduled with the snapshot
+SELECT cron.schedule(
+    'prune-upcoming-groups-snapshot',
+    '30 * * * *',
+    $$SELECT prune_upcoming_groups_snapshot()$$
+);
+
+-- Catalogue changes since p_version, as JSON:
+--   {"version": v, "resync": true}         no usable version: load the list, then sync from v
+--   {"version": v, "not_modified": true}    nothing changed
+--   {"version": v, "changed": [...], "deleted": [...]}
+--
+-- The version is the snapshot xmin, as in get_upcoming_groups_snapshot(): it only moves
+-- forward, and every change committed after it was issued carries a transaction id >= it.
+-- A sequence bumped by the triggers would not do: numbers are taken before commit, so a
+-- client could record 11 while the change numbered 10 is still uncommitted and never see it.
+-- Rows that change more than once may be sent twice; row versions make reapplying harmless.
+--
+-- p_mine limits the delta to the caller's own groups (organizer dashboard).
+CREATE OR REPLACE FUNCTION get_study_groups_since(
+    p_version BIGINT DEFAULT NULL,
+    p_mine BOOLEAN DEFAULT FALSE
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_version BIGINT := pg_snapshot_xmin(pg_current_snapshot())::TEXT::BIGINT;
+    v_since XID8;
+    v_email TEXT;
+    v_changed JSONB;
+    v_deleted JSONB;
+BEGIN
+    IF p_mine THEN
+        v_email := LOWER(auth.jwt() ->> 'email');
+        IF v_email IS NULL THEN
+            RAISE EXCEPTION 'Not authenticated';
+        END IF;
+    END IF;
+
+    IF p_version IS NULL OR p_version < 0 THEN
+        RETURN jsonb_build_object('version', v_version, 'resync', TRUE);
+    END IF;
+
+    v_since := p_version::TEXT::XID8;
+
+    IF v_since <= (SELECT h.pruned_xid FROM upcoming_groups_snapshot_horizon h) THEN
+        RETURN jsonb_build_object('version', v_version, 'resync', TRUE);
+    END IF;
+
+    SELECT
+        jsonb_agg(s.payload ORDER BY s.start_time, s.id) FILTER (WHERE NOT s.deleted),
+        jsonb_agg(s.id) FILTER (WHERE s.deleted)
+    INTO v_changed, v_deleted
+    FROM upcoming_groups_snapshot s
+    WHERE s.changed_xid >= v_since
+      AND (v_email IS NULL OR s.organizer_email = v_email);
+
+    IF v_changed IS NULL AND v_deleted IS NULL THEN
+        RETURN jsonb_build_object('version', v_version, 'not_modified', TRUE);
+    END IF;
+
+    RETURN jsonb_build_object(
+        'version', v_version,
+        'changed', COALESCE(v_changed, '[]'::JSONB),
+        'deleted', COALESCE(v_deleted, '[]'::JSONB)
+    );
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER SET search_path = public;
+
+GRANT EXECUTE ON FUNCTION get_study_groups_since(BIGINT, BOOLEAN) TO anon, authenticated;
@@ -0,0 +1,174 @@
+-- ABOUTME: Batched, idempotent study group ingestion for the Google Form webhook
+-- ABOUTME: ingest_study_groups() dedupes on client keys, checks similarity set-wise and reports per-row outcomes
+
+-- One row per idempotency key ever accepted, so replays return the original group
+CREATE TABLE ingestion_keys (
+    idempotency_key TEXT PRIMARY KEY,
+    study_group_id UUID REFERENCES study_groups(id) ON DELETE SET NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Serves ON DELETE SET NULL when cleanup removes groups
+CREATE INDEX idx_ingestion_keys_study_group_id ON ingestion_keys (study_group_id);
+
+COMMENT ON TABLE ingestion_keys IS 'Idempotency keys seen by ingest_study_groups(); pruned after 30 days';
+
+ALTER TABLE ingestion_keys ENABLE ROW LEVEL SECURITY;
+REVOKE ALL ON ingestion_keys FROM anon, authenticated;
+
+-- Create study groups from a JSON array of objects with the study_groups insert fields plus
+-- "idempotency_key". Returns one outcome per input element, in input order:
+--   created    new group; "similar" lists overlapping groups (same rules as
+--              find_similar_study_groups), including earlier rows of this batch
+--   duplicate  key seen before (in an earlier call or earlier in this batch); the original id
+--   invalid    missing key or a row the table rejects; "error" says why
+-- Each row is inserted in its own subtransaction, so one bad row never blocks the rest.
+CREATE OR REPLACE FUNCTION ingest_study_groups(p_rows JSONB)
+RETURNS TABLE (
+    idempotency_key TEXT,
+    status TEXT,
+    study_group_id UUID,
+    error TEXT,
+    similar JSONB
+) AS $$
+DECLARE
+    v_row RECORD;
+    v_key TEXT;
+    v_id UUID;
+    v_status TEXT;
+    v_error TEXT;
+    v_ords INTEGER[] := '{}';
+    v_keys TEXT[] := '{}';
+    v_statuses TEXT[] := '{}';
+    v_ids UUID[] := '{}';
+    v_errors TEXT[] := '{}';
+BEGIN
+    IF jsonb_typeof(p_rows) IS DISTINCT FROM 'array' THEN
+        RAISE EXCEPTION 'p_rows must be a JSON array';
+    END IF;
+
+    -- The webhook flushes larger backlogs in several calls
+    IF jsonb_array_length(p_rows) > 500 THEN
+        RAISE EXCEPTION 'At most 500 rows per call';
+    END IF;
+
+    FOR v_row IN
+        SELECT r.value AS data, r.ordinality::INTEGER AS ord
+        FROM jsonb_array_elements(p_rows) WITH ORDINALITY AS r(value, ordinality)
+    LOOP
+        v_key := NULLIF(BTRIM(v_row.data ->> 'idempotency_key'), '');
+        v_id := NULL;
+        v_error := NULL;
+
+        IF v_key IS NULL THEN
+            v_status := 'invalid';
+            v_error := 'Missing idempotency_key';
+        ELSE
+            BEGIN
+                -- Claiming the key first makes a concurrent replay wait here, then see it taken
+                INSERT INTO ingestion_keys (idempotency_key)
+                VALUES (v_key)
+                ON CONFLICT ON CONSTRAINT ingestion_keys_pkey DO NOTHING;
+
+                IF NOT FOUND THEN
+                    SELECT k.study_group_id INTO v_id
+                    FROM ingestion_keys k
+                    WHERE k.idempotency_key = v_key;
+
+                    v_status := 'duplicate';
+                ELSE
+                    INSERT INTO study_groups (
+                        subject, description, professor_name, location, start_time, end_time,
+                        student_limit, organizer_name, organizer_email
+                    )
+                    VALUES (
+                        v_row.data ->> 'subject',
+                        v_row.data ->> 'description',
+                        v_row.data ->> 'professor_name',
+                        v_row.data ->> 'location',
+                        (v_row.data ->> 'start_time')::TIMESTAMPTZ,
+                        (v_row.data ->> 'end_time')::TIMESTAMPTZ,
+                        (v_row.data ->> 'student_limit')::INTEGER,
+                        v_row.data ->> 'organizer_name',
+                        v_row.data ->> 'organizer_email'
+                    )
+                    RETURNING id INTO v_id;
+
+                    UPDATE ingestion_keys k
+                    SET study_group_id = v_id
+                    WHERE k.idempotency_key = v_key;
+
+                    v_status := 'created';
+                END IF;
+            EXCEPTION
+                -- Bad values and constraint failures; the key claim is rolled back with the row
+                WHEN data_exception OR integrity_constraint_violation THEN
+                    v_id := NULL;
+                    v_status := 'invalid';
+                    v_error := SQLERRM;
+            END;
+        END IF;
+
+        v_ords := v_ords || v_row.ord;
+        v_keys := v_keys || v_key;
+        v_statuses := v_statuses || v_status;
+        v_ids := v_ids || v_id;
+        v_errors := v_errors || v_error;
+    END LOOP;
+
+    -- One similarity query for the whole batch, through the subject/time_range GiST index
+    RETURN QUERY
+    WITH outcome AS (
+        SELECT *
+        FROM unnest(v_ords, v_keys, v_statuses, v_ids, v_errors)
+            AS o(ord, key, status, group_id, error)
+    )
+    SELECT
+        o.key,
+        o.status,
+        o.group_id,
+        o.error,
+        CASE WHEN o.status = 'created' THEN COALESCE((
+            SELECT jsonb_agg(
+                jsonb_build_object(
+                    'id', other.id,
+                    'subject', other.subject,
+                    'professor_name', other.professor_name,
+                    'start_time', other.start_time,
+                    'end_time', other.end_time,
+                    'organizer_email', other.organizer_email
+                )
+                ORDER BY UPPER(other.time_range * sg.time_range) - LOWER(other.time_range * sg.time_range) DESC,
+                         other.start_time ASC
+            )
+            FROM study_groups other
+            WHERE LOWER(other.subject) = LOWER(sg.subject)
+              AND other.time_range && sg.time_range
+              AND other.id <> sg.id
+              AND other.expires_at > NOW()
+              AND other.end_time > NOW()
+              AND (sg.professor_name IS NULL OR LOWER(other.professor_name) = LOWER(sg.professor_name))
+              -- A submission is only warned about groups that existed before it
+              AND NOT EXISTS (
+                  SELECT 1 FROM outcome later
+                  WHERE later.group_id = other.id
+                    AND later.status = 'created'
+                    AND later.ord > o.ord
+              )
+        ), '[]'::JSONB) END
+    FROM outcome o
+    LEFT JOIN study_groups sg ON sg.id = o.group_id AND o.status = 'created'
+    ORDER BY o.ord;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- The webhook calls this with the service role key only
+REVOKE EXECUTE ON FUNCTION ingest_study_groups(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION ingest_study_groups(JSONB) TO service_role;
+
+-- Replays come within hours of the original submission; keep keys for a month
+SELECT cron.schedule(
+    'prune-ingestion-keys',
+    '15 3 * * *',
+    $$DELETE FROM ingestion_keys WHERE created_at < NOW() - INTERVAL '30 days'$$
+);
@@ -0,0 +1,56 @@
+-- ABOUTME: One-round-trip RPC for GroupPage: group, live count, requester role and visible participants
+-- ABOUTME: Replaces the study_groups select plus one or two get_group_participants_if_member calls
+
+-- Returns NULL for an unknown group, otherwise:
+--   {"group": {...card fields, participant_count, is_full, version},
+--    "role": "organizer" | "participant" | "visitor",
+--    "participants": [...]}   -- empty for visitors
+-- The participant rows are read once and double as the membership check, so there is no
+-- separate is_group_member() probe. Like get_group_participants_if_member, the requester
+-- email is supplied by the client.
+CREATE OR REPLACE FUNCTION get_group_page(
+    p_study_group_id UUID,
+    p_requester_email TEXT DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_started_at TIMESTAMPTZ := clock_timestamp();
+    v_result JSONB;
+BEGIN
+    WITH requester AS (
+        SELECT LOWER(BTRIM(p_requester_email)) AS email
+    ),
+    people AS (
+        SELECT p.id, p.name, p.email, p.joined_at
+        FROM participants p
+        WHERE p.study_group_id = p_study_group_id
+    )
+    SELECT jsonb_build_object(
+        'group', upcoming_group_payload(sg),
+        'role', r.role,
+        'participants', CASE WHEN r.role = 'visitor' THEN '[]'::JSONB ELSE COALESCE((
+            SELECT jsonb_agg(
+                jsonb_build_object('id', people.id, 'name', people.name, 'email', people.email, 'joined_at', people.joined_at)
+                ORDER BY people.joined_at ASC
+            )
+            FROM people
+        ), '[]'::JSONB) END
+    )
+    INTO v_result
+    FROM study_groups sg
+    CROSS JOIN requester
+    CROSS JOIN LATERAL (
+        SELECT CASE
+            WHEN sg.organizer_email = requester.email THEN 'organizer'
+            WHEN EXISTS (SELECT 1 FROM people WHERE people.email = requester.email) THEN 'participant'
+            ELSE 'visitor'
+        END AS role
+    ) r
+    WHERE sg.id = p_study_group_id;
+
+    PERFORM instrumentation.record_rpc_timing('get_group_page', v_started_at);
+    RETURN v_result;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+GRANT EXECUTE ON FUNCTION get_group_page(UUID, TEXT) TO anon, authenticated;
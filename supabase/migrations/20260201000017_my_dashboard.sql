@@ -0,0 +1,52 @@
+-- ABOUTME: One-query organizer dashboard: the caller's groups with counts and a participant preview
+-- ABOUTME: get_my_dashboard() checks ownership once through auth.jwt() instead of once per group
+
+-- Returns:
+--   {"version": v,
+--    "groups": [{...card fields, participant_count, is_full, version,
+--                "participants": [...first p_preview_limit by joined_at]}, ...]}
+-- ordered by start time. A group's preview is complete when its length equals
+-- participant_count. The version is the get_study_groups_since() version, so the
+-- dashboard syncs from it with p_mine without another round trip.
+CREATE OR REPLACE FUNCTION get_my_dashboard(p_preview_limit INTEGER DEFAULT 25)
+RETURNS JSONB AS $$
+DECLARE
+    v_started_at TIMESTAMPTZ := clock_timestamp();
+    v_version BIGINT := pg_snapshot_xmin(pg_current_snapshot())::TEXT::BIGINT;
+    v_email TEXT := LOWER(auth.jwt() ->> 'email');
+    v_limit INTEGER := LEAST(GREATEST(COALESCE(p_preview_limit, 25), 0), 100);
+    v_groups JSONB;
+BEGIN
+    IF v_email IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    SELECT jsonb_agg(
+        upcoming_group_payload(sg) || jsonb_build_object('participants', preview.participants)
+        ORDER BY sg.start_time, sg.id
+    )
+    INTO v_groups
+    FROM study_groups sg
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(jsonb_agg(
+            jsonb_build_object('id', p.id, 'name', p.name, 'email', p.email, 'joined_at', p.joined_at)
+            ORDER BY p.joined_at, p.id
+        ), '[]'::JSONB) AS participants
+        FROM (
+            SELECT p.id, p.name, p.email, p.joined_at
+            FROM participants p
+            WHERE p.study_group_id = sg.id
+            ORDER BY p.joined_at, p.id
+            LIMIT v_limit
+        ) p
+    ) preview
+    WHERE sg.organizer_email = v_email;
+
+    PERFORM instrumentation.record_rpc_timing('get_my_dashboard', v_started_at);
+
+    RETURN jsonb_build_object('version', v_version, 'groups', COALESCE(v_groups, '[]'::JSONB));
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION get_my_dashboard(INTEGER) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION get_my_dashboard(INTEGER) TO authenticated;
@@ -0,0 +1,136 @@
+-- ABOUTME: Archive tables for ended study groups and their participants
+-- ABOUTME: Cleanup batches now copy groups and participants to the archive before deleting them
+
+-- A live/archive split rather than partitioning study_groups on end_time: a partitioned
+-- table's primary key must include end_time, so participants, notification_outbox and
+-- ingestion_keys could no longer reference study_groups(id), and every id lookup would
+-- probe each partition. The live table and its indexes stay exactly as they are, and no
+-- live RPC reads the archive.
+
+-- Card fields as they were at cleanup; generated search/range columns and the row
+-- version are dropped since nothing queries the archive through them
+CREATE TABLE study_groups_archive (
+    id UUID PRIMARY KEY,
+    subject TEXT NOT NULL,
+    description TEXT,
+    professor_name TEXT,
+    location TEXT NOT NULL,
+    start_time TIMESTAMPTZ NOT NULL,
+    end_time TIMESTAMPTZ NOT NULL,
+    student_limit INTEGER,
+    organizer_name TEXT,
+    organizer_email TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL,
+    participant_count INTEGER NOT NULL,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE participants_archive (
+    id UUID PRIMARY KEY,
+    study_group_id UUID NOT NULL REFERENCES study_groups_archive(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    joined_at TIMESTAMPTZ NOT NULL
+);
+
+-- Rows arrive roughly in end_time order, so a BRIN index serves date-range analytics
+-- at a fraction of a btree's size and insert cost
+CREATE INDEX idx_study_groups_archive_end_time ON study_groups_archive USING BRIN (end_time);
+CREATE INDEX idx_participants_archive_study_group_id ON participants_archive (study_group_id);
+
+COMMENT ON TABLE study_groups_archive IS 'Study groups removed by cleanup, kept for analytics';
+COMMENT ON TABLE participants_archive IS 'Participants of archived study groups';
+
+-- Analytics run with the service role; clients never see history
+ALTER TABLE study_groups_archive ENABLE ROW LEVEL SECURITY;
+ALTER TABLE participants_archive ENABLE ROW LEVEL SECURITY;
+REVOKE ALL ON study_groups_archive FROM anon, authenticated;
+REVOKE ALL ON participants_archive FROM anon, authenticated;
+
+-- Same batch selection and result as before; the batch is archived before it is deleted.
+-- The rows stay locked FOR UPDATE throughout, so a join racing the move waits on the
+-- capacity trigger's update and then fails the foreign key instead of being lost.
+CREATE OR REPLACE FUNCTION cleanup_expired_groups_batch(p_batch_size INTEGER DEFAULT 500)
+RETURNS TABLE (
+    deleted_groups INTEGER,
+    deleted_participants INTEGER,
+    has_more BOOLEAN
+) AS $$
+DECLARE
+    v_started_at TIMESTAMPTZ := clock_timestamp();
+    v_now TIMESTAMPTZ := NOW();
+    v_ids UUID[];
+    v_deleted_groups INTEGER;
+    v_deleted_participants INTEGER;
+BEGIN
+    IF p_batch_size IS NULL OR p_batch_size < 1 THEN
+        RAISE EXCEPTION 'Batch size must be a positive integer';
+    END IF;
+
+    WITH ended AS (
+        -- Past end time, regardless of participants
+        SELECT sg.id
+        FROM study_groups sg
+        WHERE sg.end_time < v_now
+        ORDER BY sg.end_time
+        LIMIT p_batch_size
+        FOR UPDATE SKIP LOCKED
+    ),
+    abandoned AS (
+        -- Expired with no participants
+        SELECT sg.id
+        FROM study_groups sg
+        WHERE sg.expires_at < v_now
+          AND sg.participant_count = 0
+        ORDER BY sg.expires_at
+        LIMIT p_batch_size
+        FOR UPDATE SKIP LOCKED
+    ),
+    batch AS (
+        SELECT ended.id FROM ended
+        UNION
+        SELECT abandoned.id FROM abandoned
+        LIMIT p_batch_size
+    )
+    SELECT array_agg(batch.id) INTO v_ids FROM batch;
+
+    INSERT INTO study_groups_archive (
+        id, subject, description, professor_name, location, start_time, end_time,
+        student_limit, organizer_name, organizer_email, created_at, expires_at, participant_count
+    )
+    SELECT
+        sg.id, sg.subject, sg.description, sg.professor_name, sg.location, sg.start_time, sg.end_time,
+        sg.student_limit, sg.organizer_name, sg.organizer_email, sg.created_at, sg.expires_at,
+        sg.participant_count
+    FROM study_groups sg
+    WHERE sg.id = ANY(v_ids)
+    ON CONFLICT (id) DO NOTHING;
+
+    INSERT INTO participants_archive (id, study_group_id, name, email, joined_at)
+    SELECT p.id, p.study_group_id, p.name, p.email, p.joined_at
+    FROM participants p
+    WHERE p.study_group_id = ANY(v_ids)
+    ON CONFLICT (id) DO NOTHING;
+
+    WITH deleted AS (
+        DELETE FROM study_groups sg
+        WHERE sg.id = ANY(v_ids)
+        RETURNING sg.participant_count
+    )
+    SELECT COUNT(*)::INTEGER, COALESCE(SUM(deleted.participant_count), 0)::INTEGER
+    INTO v_deleted_groups, v_deleted_participants
+    FROM deleted;
+
+    deleted_groups := v_deleted_groups;
+    deleted_participants := v_deleted_participants;
+    has_more := EXISTS (
+        SELECT 1 FROM study_groups sg WHERE sg.end_time < v_now
+    ) OR EXISTS (
+        SELECT 1 FROM study_groups sg WHERE sg.expires_at < v_now AND sg.participant_count = 0
+    );
+
+    PERFORM instrumentation.record_rpc_timing('cleanup_expired_groups_batch', v_started_at);
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,38 @@
+-- ABOUTME: Publishes study_groups to Realtime with only the columns clients read
+-- ABOUTME: Keeps the generated search_vector, search_text and time_range out of every change payload
+
+-- Every join rewrites its group's row, so each UPDATE payload carried the whole tsvector,
+-- the lowercase search text and the range, none of which the feed or dashboard use.
+-- organizer_email stays: the dashboard channel filters on it. A column list is fixed, so a
+-- column added to study_groups later must be added here too before clients see it.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime') THEN
+        RETURN;
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM pg_publication_tables
+        WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'study_groups'
+    ) THEN
+        ALTER PUBLICATION supabase_realtime DROP TABLE study_groups;
+    END IF;
+
+    ALTER PUBLICATION supabase_realtime ADD TABLE study_groups (
+        id,
+        subject,
+        description,
+        professor_name,
+        location,
+        start_time,
+        end_time,
+        student_limit,
+        organizer_name,
+        organizer_email,
+        created_at,
+        expires_at,
+        participant_count,
+        version
+    );
+END
+$$;
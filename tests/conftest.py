@@ -1,29 +1,135 @@
 # ABOUTME: Pytest configuration and fixtures for CU Study Groups tests
-# ABOUTME: Provides Supabase client fixture with service role access
+# ABOUTME: Uses a hosted project when SUPABASE_URL is set, otherwise a throwaway local Postgres
 
 import os
+import uuid
+
 import pytest
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from tests.factories import TestDataFactory
+from tests.local_postgres import LocalPostgres, LocalPostgresUnavailable
+
 load_dotenv()
 
+# Unique per process: pytest-xdist workers (gw0, gw1, ...) each get their own prefix,
+# so parallel runs and concurrent CI jobs never clean up each other's rows.
+RUN_ID = f"{os.environ.get('PYTEST_XDIST_WORKER', 'main')}-{uuid.uuid4().hex[:6]}"
 
-@pytest.fixture(scope="session")
-def supabase_client() -> Client:
-    """Create a Supabase client with service role access for testing."""
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-plan-snapshots",
+        action="store_true",
+        help="rewrite tests/plan_snapshots from the current plans instead of comparing",
+    )
+
+
+def pytest_configure(config):
+    # Registered here so the marker works with or without pytest-xdist installed
+    config.addinivalue_line(
+        "markers", "xdist_group(name): run tests with the same group on one xdist worker"
+    )
+    # -n alone schedules with --dist load, which ignores xdist_group; only xdist sets dist
+    if getattr(config.option, "dist", "no") == "load":
+        config.option.dist = "loadgroup"
+
+
+def _hosted_credentials() -> tuple[str, str] | None:
     url = os.environ.get("SUPABASE_URL")
     key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    return (url, key) if url and key else None
+
+
+@pytest.fixture(scope="session")
+def local_postgres():
+    """Throwaway Postgres with every migration applied (PostgREST too, if installed).
+
+    Skips when psycopg or the Postgres server binaries (or TEST_DATABASE_URL) are missing.
+    """
+    pytest.importorskip("psycopg")
+    try:
+        db = LocalPostgres.start()
+    except LocalPostgresUnavailable as e:
+        pytest.skip(str(e))
+    yield db
+    db.stop()
+
+
+@pytest.fixture(scope="session")
+def pg_conn(local_postgres: LocalPostgres):
+    """Direct superuser connection to the local database, for SQL-level and query-plan tests."""
+    conn = local_postgres.connect()
+    yield conn
+    conn.close()
+
+
+def _local_postgrest(request) -> LocalPostgres:
+    local = request.getfixturevalue("local_postgres")
+    if not local.postgrest_url:
+        pytest.skip("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY, or a local postgrest binary, required")
+    return local
 
-    if not url or not key:
-        pytest.skip("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY required")
 
-    return create_client(url, key)
+@pytest.fixture(scope="session")
+def supabase_client(request) -> Client:
+    """Create a Supabase client with service role access for testing.
+
+    Without hosted credentials this is a postgrest-py client (same .table()/.rpc() API)
+    against the local harness.
+    """
+    if hosted := _hosted_credentials():
+        return create_client(*hosted)
+    return _local_postgrest(request).rest_client()
+
+
+@pytest.fixture(scope="session")
+def supabase_rest(request) -> tuple[str, dict[str, str]]:
+    """PostgREST base URL and service role headers for raw (e.g. concurrent) HTTP calls."""
+    if not (hosted := _hosted_credentials()):
+        local = _local_postgrest(request)
+        return local.postgrest_url, {**local.rest_headers(), "Prefer": "return=representation"}
+
+    url, key = hosted
+    headers = {
+        "apikey": key,
+        "Authorization": f"Bearer {key}",
+        "Content-Type": "application/json",
+        "Prefer": "return=representation",
+    }
+    return f"{url}/rest/v1", headers
+
+
+@pytest.fixture(scope="session")
+def run_prefix() -> str:
+    """Subject prefix for every row this test process creates."""
+    return f"test-{RUN_ID}-"
+
+
+@pytest.fixture(scope="session")
+def shared_factory(supabase_client: Client, run_prefix: str):
+    """Factory for read-only data shared across tests; removed once at the end of the session.
+
+    The final prefix delete also sweeps rows created outside a factory (e.g. through RPCs).
+    """
+    factory = TestDataFactory(supabase_client, run_prefix)
+    yield factory
+    factory.cleanup()
+    supabase_client.table("study_groups").delete().like("subject", f"{run_prefix}%").execute()
+
+
+@pytest.fixture
+def factory(supabase_client: Client, shared_factory: TestDataFactory):
+    """Per-test factory; deletes the groups it created (by id) after the test."""
+    factory = TestDataFactory(supabase_client, shared_factory.prefix)
+    yield factory
+    factory.cleanup()
 
 
 @pytest.fixture
-def clean_test_data(supabase_client: Client):
-    """Fixture to clean up test data after each test."""
+def clean_test_data(supabase_client: Client, run_prefix: str):
+    """Fixture to clean up rows created outside a factory, e.g. through RPCs."""
     yield
-    # Clean up any test study groups (those with test- prefix in subject)
-    supabase_client.table("study_groups").delete().like("subject", "test-%").execute()
+    # Only this process's rows: other xdist workers share the database
+    supabase_client.table("study_groups").delete().like("subject", f"{run_prefix}%").execute()
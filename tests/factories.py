@@ -0,0 +1,84 @@
+# ABOUTME: Test data factory that batch-inserts study groups and participants
+# ABOUTME: Tags rows with a per-run subject prefix and deletes exactly what it created
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from supabase import Client
+
+
+class TestDataFactory:
+    """Creates test rows in array inserts and cleans them up by primary key.
+
+    Every subject starts with `prefix`, which is unique per pytest(-xdist) worker,
+    so parallel workers never see or delete each other's rows.
+    """
+
+    __test__ = False  # not a test class, despite the name
+
+    def __init__(self, client: Client, prefix: str):
+        self.client = client
+        self.prefix = prefix
+        self.group_ids: list[str] = []
+
+    def subject(self, name: str) -> str:
+        """Return the stored subject for a test-local name."""
+        return f"{self.prefix}{name}"
+
+    def group_row(self, name: str = "Study Group", **fields: Any) -> dict[str, Any]:
+        """Build (but do not insert) a valid upcoming group row."""
+        now = datetime.now(timezone.utc)
+        row: dict[str, Any] = {
+            "subject": self.subject(name),
+            "location": "Butler Library",
+            "start_time": (now + timedelta(hours=1)).isoformat(),
+            "end_time": (now + timedelta(hours=3)).isoformat(),
+            "organizer_email": "organizer@columbia.edu",
+        }
+        row.update(fields)
+        return row
+
+    def groups(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Insert rows built with group_row() in one request, in order."""
+        if not rows:
+            return []
+        created = self.client.table("study_groups").insert(rows).execute().data
+        self.group_ids.extend(group["id"] for group in created)
+        return created
+
+    def group(self, name: str = "Study Group", **fields: Any) -> dict[str, Any]:
+        """Insert a single group and return the stored row."""
+        return self.groups([self.group_row(name, **fields)])[0]
+
+    def participants(
+        self, group_id: str, people: list[tuple[str, str]] | int
+    ) -> list[dict[str, Any]]:
+        """Insert participants into a group in one request.
+
+        `people` is a list of (name, email) pairs, or a count of generated participants.
+        """
+        if isinstance(people, int):
+            people = [(f"Participant {i}", f"p{i}@columbia.edu") for i in range(1, people + 1)]
+        if not people:
+            return []
+        return self.client.table("participants").insert([
+            {"study_group_id": group_id, "name": name, "email": email}
+            for name, email in people
+        ]).execute().data
+
+    def group_with_participants(
+        self, name: str = "Study Group", participants: list[tuple[str, str]] | int = 2, **fields: Any
+    ) -> dict[str, Any]:
+        """Insert a group plus its participants (two requests, whatever the count)."""
+        group = self.group(name, **fields)
+        self.participants(group["id"], participants)
+        return group
+
+    def cleanup(self) -> None:
+        """Delete every group this factory created, live or archived, with its queued emails (participants cascade)."""
+        if self.group_ids:
+            # Queued emails outlive their group (ON DELETE SET NULL), so remove them first
+            self.client.table("notification_outbox").delete().in_("study_group_id", self.group_ids).execute()
+            self.client.table("study_groups").delete().in_("id", self.group_ids).execute()
+            self.client.table("study_groups_archive").delete().in_("id", self.group_ids).execute()
+            self.group_ids.clear()
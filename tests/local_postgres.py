@@ -0,0 +1,297 @@
+# ABOUTME: Throwaway local Postgres (plus optional PostgREST) with supabase/migrations applied
+# ABOUTME: Lets the backend tests run offline; stubs roles, auth.jwt(), pg_cron and pg_net
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+MIGRATIONS_DIR = ROOT / "supabase" / "migrations"
+STUBS_SQL = Path(__file__).with_name("supabase_stubs.sql")
+
+# Provided by supabase_stubs.sql instead of the real (preload-only) extensions
+STUBBED_EXTENSIONS = ("pg_cron", "pg_net")
+
+# Shared by PostgREST and sign_jwt(); only ever used against the throwaway instance
+JWT_SECRET = "local-test-jwt-secret-at-least-32-characters"
+
+
+class LocalPostgresUnavailable(RuntimeError):
+    """No Postgres binaries on this machine and no TEST_DATABASE_URL to fall back on."""
+
+
+def migration_files() -> list[Path]:
+    """Migrations in the order `supabase db push` applies them (timestamp prefix)."""
+    return sorted(MIGRATIONS_DIR.glob("*.sql"))
+
+
+def strip_stubbed_extensions(sql: str) -> str:
+    """Drop CREATE/COMMENT ON EXTENSION statements for extensions the stubs replace."""
+    names = "|".join(STUBBED_EXTENSIONS)
+    sql = re.sub(rf"CREATE EXTENSION IF NOT EXISTS ({names})\b[^;]*;", "", sql, flags=re.IGNORECASE)
+    return re.sub(rf"COMMENT ON EXTENSION ({names})\b[^;]*;", "", sql, flags=re.IGNORECASE)
+
+
+def sign_jwt(claims: dict[str, Any], secret: str = JWT_SECRET) -> str:
+    """HS256 token PostgREST accepts, e.g. {"role": "authenticated", "email": ...}."""
+    def encode(part: bytes) -> str:
+        return base64.urlsafe_b64encode(part).rstrip(b"=").decode()
+
+    header = encode(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    payload = encode(json.dumps({"exp": int(time.time()) + 3600, **claims}).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{encode(signature)}"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _find_pg_bin(name: str) -> str | None:
+    """Locate a server binary via PG_BIN, PATH, or the Debian/Ubuntu layout."""
+    if pg_bin := os.environ.get("PG_BIN"):
+        candidate = Path(pg_bin) / name
+        return str(candidate) if candidate.exists() else None
+    if found := shutil.which(name):
+        return found
+    versions = sorted(Path("/usr/lib/postgresql").glob(f"*/bin/{name}"), key=lambda p: int(p.parts[-3]))
+    return str(versions[-1]) if versions else None
+
+
+class LocalPostgres:
+    """A freshly migrated database, plus PostgREST in front of it when the binary is installed.
+
+    Uses TEST_DATABASE_URL (creating and later dropping a scratch database on that server)
+    when set, otherwise initdb's a temporary cluster.
+    """
+
+    def __init__(self):
+        self.dsn = ""
+        self.postgrest_url: str | None = None
+        self._admin_dsn: str | None = None
+        self._database: str | None = None
+        self._data_dir: str | None = None
+        self._pg_ctl: str | None = None
+        self._postgrest: subprocess.Popen | None = None
+
+    @classmethod
+    def start(cls) -> "LocalPostgres":
+        db = cls()
+        try:
+            if admin_dsn := os.environ.get("TEST_DATABASE_URL"):
+                db._create_scratch_database(admin_dsn)
+            else:
+                db._init_cluster()
+            db.apply_migrations()
+            db._start_postgrest()
+        except BaseException:
+            db.stop()
+            raise
+        return db
+
+    def _init_cluster(self) -> None:
+        initdb, pg_ctl = _find_pg_bin("initdb"), _find_pg_bin("pg_ctl")
+        if not initdb or not pg_ctl:
+            raise LocalPostgresUnavailable("initdb/pg_ctl not found; set PG_BIN or TEST_DATABASE_URL")
+
+        self._data_dir = tempfile.mkdtemp(prefix="cu-study-groups-pg-")
+        self._pg_ctl = pg_ctl
+        port = _free_port()
+        subprocess.run(
+            [initdb, "-D", self._data_dir, "-U", "postgres", "-A", "trust", "--no-sync"],
+            check=True, capture_output=True,
+        )
+        subprocess.run(
+            [pg_ctl, "-D", self._data_dir, "-w", "-l", f"{self._data_dir}/server.log", "start",
+             "-o", f"-p {port} -k {self._data_dir} -c listen_addresses=127.0.0.1 -c fsync=off"],
+            check=True, capture_output=True,
+        )
+        self.dsn = f"postgresql://postgres@127.0.0.1:{port}/postgres"
+
+    def _create_scratch_database(self, admin_dsn: str) -> None:
+        import psycopg
+
+        self._admin_dsn = admin_dsn
+        self._database = f"cu_study_groups_test_{uuid.uuid4().hex[:8]}"
+        with psycopg.connect(admin_dsn, autocommit=True) as conn:
+            conn.execute(f'CREATE DATABASE "{self._database}"')
+        self.dsn = psycopg.conninfo.make_conninfo(admin_dsn, dbname=self._database)
+
+    def apply_migrations(self) -> None:
+        """Run the stubs, then every migration in its own transaction.
+
+        Joins made by later sessions queue no emails; outbox tests turn that back on locally.
+        """
+        import psycopg
+        from psycopg import sql
+
+        with psycopg.connect(self.dsn, autocommit=True) as conn:
+            with conn.transaction():
+                conn.execute(STUBS_SQL.read_text())
+            for path in migration_files():
+                try:
+                    with conn.transaction():
+                        conn.execute(strip_stubbed_extensions(path.read_text()))
+                except psycopg.Error as e:
+                    raise RuntimeError(f"Migration {path.name} failed: {e}") from e
+            conn.execute(
+                sql.SQL("ALTER DATABASE {} SET app.notifications_enabled = 'off'").format(
+                    sql.Identifier(conn.info.dbname)
+                )
+            )
+
+    def _start_postgrest(self) -> None:
+        postgrest = os.environ.get("POSTGREST_BIN") or shutil.which("postgrest")
+        if not postgrest:
+            return
+
+        port = _free_port()
+        env = {
+            **os.environ,
+            "PGRST_DB_URI": self.dsn,
+            "PGRST_DB_SCHEMAS": "public",
+            "PGRST_DB_ANON_ROLE": "anon",
+            "PGRST_JWT_SECRET": JWT_SECRET,
+            "PGRST_SERVER_HOST": "127.0.0.1",
+            "PGRST_SERVER_PORT": str(port),
+        }
+        self._postgrest = subprocess.Popen(
+            [postgrest], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        url = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(f"{url}/", timeout=1.0).status_code < 500:
+                    self.postgrest_url = url
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(0.1)
+        raise RuntimeError("PostgREST did not become ready within 15s")
+
+    def connect(self):
+        """Autocommit psycopg connection as the superuser (RLS bypassed; use as_role to apply it)."""
+        import psycopg
+        from psycopg.rows import dict_row
+
+        return psycopg.connect(self.dsn, autocommit=True, row_factory=dict_row)
+
+    def rest_headers(self, **claims: Any) -> dict[str, str]:
+        """PostgREST headers for a token with the given claims (defaults to service_role)."""
+        token = sign_jwt({"role": "service_role", **claims})
+        return {
+            "apikey": token,
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        }
+
+    def rest_client(self, **claims: Any):
+        """postgrest-py client exposing the same .table()/.rpc() API as supabase.Client."""
+        from postgrest import SyncPostgrestClient
+
+        if not self.postgrest_url:
+            raise LocalPostgresUnavailable("postgrest not found; set POSTGREST_BIN")
+        return SyncPostgrestClient(self.postgrest_url, headers=self.rest_headers(**claims))
+
+    def stop(self) -> None:
+        if self._postgrest:
+            self._postgrest.terminate()
+            self._postgrest.wait(timeout=10)
+            self._postgrest = None
+        if self._data_dir:
+            if self._pg_ctl and self.dsn:
+                subprocess.run(
+                    [self._pg_ctl, "-D", self._data_dir, "-m", "immediate", "stop"], capture_output=True
+                )
+            shutil.rmtree(self._data_dir, ignore_errors=True)
+            self._data_dir = None
+        if self._admin_dsn and self._database:
+            import psycopg
+
+            with psycopg.connect(self._admin_dsn, autocommit=True) as conn:
+                conn.execute(f'DROP DATABASE IF EXISTS "{self._database}" WITH (FORCE)')
+            self._database = None
+
+
+@contextmanager
+def as_role(conn, role: str, **claims: Any) -> Iterator[None]:
+    """Run statements as an API role with JWT claims, the way PostgREST does, then roll back."""
+    with conn.transaction(force_rollback=True):
+        conn.execute(
+            "SELECT set_config('request.jwt.claims', %s, true)",
+            [json.dumps({"role": role, **claims})],
+        )
+        conn.execute(f"SET LOCAL ROLE {role}")
+        yield
+
+
+def explain_json(conn, sql: str, params: list[Any] | None = None, analyze: bool = False) -> dict[str, Any]:
+    """Top plan node of EXPLAIN (FORMAT JSON) for a statement."""
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    row = conn.execute(f"EXPLAIN ({options}) {sql}", params).fetchone()
+    plan = next(iter(row.values())) if isinstance(row, dict) else row[0]
+    return plan[0]["Plan"]
+
+
+# Session settings for auto_explain; LOG level reaches the client as notices
+AUTO_EXPLAIN_SETTINGS = {
+    "auto_explain.log_min_duration": "0",
+    "auto_explain.log_analyze": "on",
+    "auto_explain.log_buffers": "on",
+    "auto_explain.log_timing": "off",
+    "auto_explain.log_format": "json",
+    "auto_explain.log_nested_statements": "on",
+    "client_min_messages": "log",
+}
+
+
+def auto_explain(conn, sql: str, params: list[Any] | None = None) -> list[dict[str, Any]]:
+    """EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) of every statement a call runs, then roll back.
+
+    Unlike explain_json this sees inside PL/pgSQL functions: each nested query, foreign key
+    action and finally the outer statement, in completion order.
+    """
+    messages: list[str] = []
+
+    def collect(diagnostic) -> None:
+        text = diagnostic.message_primary or ""
+        if "plan:" in text:
+            messages.append(text.split("plan:", 1)[1])
+
+    conn.add_notice_handler(collect)
+    try:
+        with conn.transaction(force_rollback=True):
+            conn.execute("LOAD 'auto_explain'")
+            for name, value in AUTO_EXPLAIN_SETTINGS.items():
+                conn.execute(f"SET LOCAL {name} = {value}")
+            cursor = conn.execute(sql, params)
+            if cursor.description:
+                cursor.fetchall()
+    finally:
+        conn.remove_notice_handler(collect)
+    return [json.loads(message) for message in messages]
+
+
+def plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Every node in a JSON plan tree, depth first."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
@@ -0,0 +1,128 @@
+-- ABOUTME: Minimal stand-ins for the Supabase platform objects our migrations depend on
+-- ABOUTME: Roles, auth.jwt(), table-backed pg_cron / pg_net / Vault schemas and the Realtime publication
+
+-- API roles, as PostgREST switches to them per request (cluster-wide, so only create once)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+        CREATE ROLE anon NOLOGIN NOINHERIT;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+        CREATE ROLE authenticated NOLOGIN NOINHERIT;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        CREATE ROLE service_role NOLOGIN NOINHERIT BYPASSRLS;
+    END IF;
+END
+$$;
+
+GRANT anon, authenticated, service_role TO CURRENT_USER;
+
+-- Supabase grants the API roles access to everything created in public; RLS does the filtering
+GRANT USAGE ON SCHEMA public TO anon, authenticated, service_role;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO anon, authenticated, service_role;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON SEQUENCES TO anon, authenticated, service_role;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT EXECUTE ON FUNCTIONS TO anon, authenticated, service_role;
+
+-- auth.jwt() reads the claims PostgREST puts in request.jwt.claims (or a test's set_config)
+CREATE SCHEMA IF NOT EXISTS auth;
+GRANT USAGE ON SCHEMA auth TO anon, authenticated, service_role;
+
+CREATE OR REPLACE FUNCTION auth.jwt()
+RETURNS JSONB AS $$
+    SELECT COALESCE(
+        NULLIF(current_setting('request.jwt.claim', true), ''),
+        NULLIF(current_setting('request.jwt.claims', true), '')
+    )::JSONB
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION auth.uid()
+RETURNS UUID AS $$
+    SELECT NULLIF(auth.jwt() ->> 'sub', '')::UUID
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION auth.role()
+RETURNS TEXT AS $$
+    SELECT auth.jwt() ->> 'role'
+$$ LANGUAGE sql STABLE;
+
+-- pg_cron: record schedules so tests can assert on them; nothing runs
+CREATE SCHEMA IF NOT EXISTS cron;
+
+CREATE TABLE IF NOT EXISTS cron.job (
+    jobid BIGSERIAL PRIMARY KEY,
+    jobname TEXT UNIQUE,
+    schedule TEXT NOT NULL,
+    command TEXT NOT NULL,
+    active BOOLEAN NOT NULL DEFAULT TRUE
+);
+
+CREATE OR REPLACE FUNCTION cron.schedule(job_name TEXT, schedule TEXT, command TEXT)
+RETURNS BIGINT AS $$
+    INSERT INTO cron.job (jobname, schedule, command)
+    VALUES (job_name, schedule, command)
+    ON CONFLICT (jobname) DO UPDATE
+        SET schedule = EXCLUDED.schedule, command = EXCLUDED.command
+    RETURNING jobid
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION cron.unschedule(job_name TEXT)
+RETURNS BOOLEAN AS $$
+    WITH deleted AS (DELETE FROM cron.job WHERE jobname = job_name RETURNING 1)
+    SELECT EXISTS (SELECT 1 FROM deleted)
+$$ LANGUAGE sql;
+
+-- pg_net: queue requests in a table instead of sending them
+CREATE SCHEMA IF NOT EXISTS net;
+
+CREATE TABLE IF NOT EXISTS net.http_request_queue (
+    id BIGSERIAL PRIMARY KEY,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    headers JSONB,
+    body JSONB,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION net.http_post(
+    url TEXT,
+    body JSONB DEFAULT '{}'::JSONB,
+    params JSONB DEFAULT '{}'::JSONB,
+    headers JSONB DEFAULT '{"Content-Type": "application/json"}'::JSONB,
+    timeout_milliseconds INTEGER DEFAULT 5000
+)
+RETURNS BIGINT AS $$
+    INSERT INTO net.http_request_queue (method, url, headers, body)
+    VALUES ('POST', url, headers, body)
+    RETURNING id
+$$ LANGUAGE sql;
+
+-- Vault: plain-text secrets behind the same view and create_secret() the platform provides
+CREATE SCHEMA IF NOT EXISTS vault;
+
+CREATE TABLE IF NOT EXISTS vault.secrets (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name TEXT UNIQUE,
+    description TEXT NOT NULL DEFAULT '',
+    secret TEXT NOT NULL
+);
+
+CREATE OR REPLACE VIEW vault.decrypted_secrets AS
+SELECT id, name, description, secret, secret AS decrypted_secret
+FROM vault.secrets;
+
+CREATE OR REPLACE FUNCTION vault.create_secret(new_secret TEXT, new_name TEXT DEFAULT NULL, new_description TEXT DEFAULT '')
+RETURNS UUID AS $$
+    INSERT INTO vault.secrets (name, description, secret)
+    VALUES (new_name, new_description, new_secret)
+    RETURNING id
+$$ LANGUAGE sql;
+
+-- Realtime streams the tables in this publication (empty until a migration adds one)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime') THEN
+        CREATE PUBLICATION supabase_realtime;
+    END IF;
+END
+$$;
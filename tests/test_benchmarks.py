@@ -0,0 +1,110 @@
+# ABOUTME: Offline tests for the benchmark suite's statistics and mix parsing
+# ABOUTME: No database needed; guards the numbers the load-test gate relies on
+
+import pytest
+
+from benchmarks.scenarios import DEFAULT_MIX, OPERATIONS, parse_mix
+from benchmarks.stats import OperationStats, budget_failures, merge, percentile
+
+
+class TestPercentile:
+    """Tests for percentile interpolation."""
+
+    def test_interpolates_between_ranks(self):
+        """Test that percentiles fall between neighbouring samples."""
+        values = [10.0, 20.0, 30.0, 40.0]
+
+        assert percentile(values, 50) == 25.0
+        assert percentile(values, 0) == 10.0
+        assert percentile(values, 100) == 40.0
+
+    def test_unsorted_and_empty_input(self):
+        """Test that input order does not matter and empty input yields zero."""
+        assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+        assert percentile([], 99) == 0.0
+
+
+class TestOperationStats:
+    """Tests for per-operation summaries."""
+
+    def test_summary_excludes_errors_from_latency(self):
+        """Test that failed calls are counted but do not skew latencies."""
+        stats = OperationStats()
+        for ms in range(1, 101):
+            stats.record(float(ms), ok=True)
+        stats.record(5000.0, ok=False)
+
+        summary = stats.summary(duration_s=10)
+
+        assert summary["count"] == 100
+        assert summary["errors"] == 1
+        assert summary["error_rate"] == 0.0099
+        assert summary["p50_ms"] == 50.5
+        assert summary["p99_ms"] == 99.01
+        assert summary["max_ms"] == 100.0
+        assert summary["throughput_rps"] == 10.0
+
+    def test_merge_combines_operations(self):
+        """Test that the overall stats include every operation's samples."""
+        read, join = OperationStats(), OperationStats()
+        read.record(1.0, ok=True)
+        join.record(3.0, ok=True)
+        join.record(0.0, ok=False)
+
+        overall = merge({"read": read, "join": join})
+
+        assert sorted(overall.latencies_ms) == [1.0, 3.0]
+        assert overall.errors == 1
+
+
+class TestBudgetFailures:
+    """Tests for the pre-deploy gate."""
+
+    def _overall(self, ok: int, errors: int) -> dict[str, float | int]:
+        stats = OperationStats()
+        for ms in range(ok):
+            stats.record(float(ms), ok=True)
+        for _ in range(errors):
+            stats.record(1.0, ok=False)
+        return stats.summary(duration_s=1)
+
+    def test_clean_run_passes(self):
+        """Test that a run without errors inside the p95 budget passes."""
+        assert budget_failures(self._overall(ok=100, errors=0), max_p95_ms=200, max_error_rate=0) == []
+
+    def test_all_error_run_fails(self):
+        """Test that a run where every call failed cannot pass on its zero p95."""
+        failures = budget_failures(self._overall(ok=0, errors=50), max_p95_ms=200, max_error_rate=0)
+
+        assert any("50 errors" in failure for failure in failures)
+        assert "no successful calls" in failures
+
+    def test_errors_within_rate_pass(self):
+        """Test that --max-error-rate tolerates occasional failures."""
+        overall = self._overall(ok=99, errors=1)
+
+        assert budget_failures(overall, max_p95_ms=None, max_error_rate=0.05) == []
+        assert budget_failures(overall, max_p95_ms=None, max_error_rate=0) != []
+
+    def test_p95_failure_reports_errors(self):
+        """Test that the p95 message says how many calls it excludes."""
+        failures = budget_failures(self._overall(ok=100, errors=2), max_p95_ms=10, max_error_rate=1)
+
+        assert failures == ["p95 94.05ms over 100 successes (2 errors) exceeds budget 10ms"]
+
+
+class TestParseMix:
+    """Tests for the --mix option."""
+
+    def test_parses_weights_and_drops_zero(self):
+        """Test that weights are parsed and zero-weight operations are omitted."""
+        assert parse_mix("read=60, join=10,search=0") == {"read": 60, "join": 10}
+
+    def test_rejects_unknown_operation(self):
+        """Test that typos in the mix are reported."""
+        with pytest.raises(ValueError, match="Unknown operation"):
+            parse_mix("reads=10")
+
+    def test_default_mix_covers_every_operation(self):
+        """Test that the default run exercises every benchmarked RPC."""
+        assert set(parse_mix(DEFAULT_MIX)) == set(OPERATIONS)
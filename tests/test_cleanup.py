@@ -5,28 +5,34 @@ import pytest
 from datetime import datetime, timedelta, timezone
 from supabase import Client
 
+from tests.factories import TestDataFactory
+
+# The cleanup functions delete expired groups database-wide, so keep these tests on one
+# xdist worker (--dist loadgroup) where batch-size assertions can't race each other.
+pytestmark = pytest.mark.xdist_group("cleanup")
+
 
 class TestCleanupExpiredGroups:
     """Tests for the cleanup_expired_groups database function."""
 
     def test_cleanup_deletes_expired_groups_with_no_participants(
-        self, supabase_client: Client, clean_test_data
+        self, supabase_client: Client, factory: TestDataFactory
     ):
         """Test that expired groups with no participants are deleted."""
         # Create an expired group (end_time in the past)
         past_time = datetime.now(timezone.utc) - timedelta(hours=2)
         past_end = datetime.now(timezone.utc) - timedelta(hours=1)
 
-        result = supabase_client.table("study_groups").insert({
-            "subject": "test-Expired Group",
-            "location": "Library",
-            "start_time": past_time.isoformat(),
-            "end_time": past_end.isoformat(),
-            "organizer_email": "expired@columbia.edu",
-            "expires_at": past_end.isoformat(),  # Already expired
-        }).execute()
+        group = factory.group(
+            "Expired Group",
+            location="Library",
+            start_time=past_time.isoformat(),
+            end_time=past_end.isoformat(),
+            organizer_email="expired@columbia.edu",
+            expires_at=past_end.isoformat(),  # Already expired
+        )
 
-        group_id = result.data[0]["id"]
+        group_id = group["id"]
 
         # Run cleanup
         cleanup_result = supabase_client.rpc("cleanup_expired_groups").execute()
@@ -38,22 +44,13 @@ class TestCleanupExpiredGroups:
         assert deleted_count >= 1
 
     def test_cleanup_keeps_active_groups(
-        self, supabase_client: Client, clean_test_data
+        self, supabase_client: Client, factory: TestDataFactory
     ):
         """Test that active (non-expired) groups are kept."""
         # Create an active group (end_time in the future)
-        future_start = datetime.now(timezone.utc) + timedelta(hours=1)
-        future_end = datetime.now(timezone.utc) + timedelta(hours=3)
-
-        result = supabase_client.table("study_groups").insert({
-            "subject": "test-Active Group",
-            "location": "Library",
-            "start_time": future_start.isoformat(),
-            "end_time": future_end.isoformat(),
-            "organizer_email": "active@columbia.edu",
-        }).execute()
+        group = factory.group("Active Group", location="Library", organizer_email="active@columbia.edu")
 
-        group_id = result.data[0]["id"]
+        group_id = group["id"]
 
         # Run cleanup
         supabase_client.rpc("cleanup_expired_groups").execute()
@@ -63,30 +60,24 @@ class TestCleanupExpiredGroups:
         assert len(check.data) == 1
 
     def test_cleanup_deletes_past_end_time_groups(
-        self, supabase_client: Client, clean_test_data
+        self, supabase_client: Client, factory: TestDataFactory
     ):
         """Test that groups past their end_time are deleted regardless of participants."""
         # Create a group that has ended
         past_start = datetime.now(timezone.utc) - timedelta(hours=3)
         past_end = datetime.now(timezone.utc) - timedelta(hours=1)
 
-        result = supabase_client.table("study_groups").insert({
-            "subject": "test-Past End Time",
-            "location": "Library",
-            "start_time": past_start.isoformat(),
-            "end_time": past_end.isoformat(),
-            "organizer_email": "past@columbia.edu",
-            "expires_at": (datetime.now(timezone.utc) + timedelta(hours=20)).isoformat(),
-        }).execute()
+        group = factory.group_with_participants(
+            "Past End Time",
+            participants=[("Late Joiner", "late@columbia.edu")],
+            location="Library",
+            start_time=past_start.isoformat(),
+            end_time=past_end.isoformat(),
+            organizer_email="past@columbia.edu",
+            expires_at=(datetime.now(timezone.utc) + timedelta(hours=20)).isoformat(),
+        )
 
-        group_id = result.data[0]["id"]
-
-        # Add a participant
-        supabase_client.table("participants").insert({
-            "study_group_id": group_id,
-            "name": "Late Joiner",
-            "email": "late@columbia.edu",
-        }).execute()
+        group_id = group["id"]
 
         # Run cleanup - should still delete because end_time has passed
         supabase_client.rpc("cleanup_expired_groups").execute()
@@ -95,24 +86,118 @@ class TestCleanupExpiredGroups:
         check = supabase_client.table("study_groups").select("*").eq("id", group_id).execute()
         assert len(check.data) == 0
 
-    def test_cleanup_returns_count(self, supabase_client: Client, clean_test_data):
+    def test_cleanup_archives_groups_and_participants(
+        self, supabase_client: Client, factory: TestDataFactory
+    ):
+        """Test that cleaned-up groups and their participants are moved to the archive tables."""
+        past_start = datetime.now(timezone.utc) - timedelta(hours=3)
+        past_end = datetime.now(timezone.utc) - timedelta(hours=1)
+
+        group = factory.group_with_participants(
+            "Archived",
+            participants=[("Archived Joiner", "archived@columbia.edu")],
+            location="Library",
+            start_time=past_start.isoformat(),
+            end_time=past_end.isoformat(),
+            organizer_email="archive@columbia.edu",
+        )
+
+        supabase_client.rpc("cleanup_expired_groups").execute()
+
+        archived = supabase_client.table("study_groups_archive").select("*").eq("id", group["id"]).execute()
+        assert len(archived.data) == 1
+        assert archived.data[0]["subject"] == group["subject"]
+        assert archived.data[0]["participant_count"] == 1
+
+        people = supabase_client.table("participants_archive").select("email").eq(
+            "study_group_id", group["id"]
+        ).execute()
+        assert [p["email"] for p in people.data] == ["archived@columbia.edu"]
+
+    def test_cleanup_returns_count(self, supabase_client: Client, factory: TestDataFactory):
         """Test that cleanup returns the number of deleted groups."""
         # Create multiple expired groups
         past_time = datetime.now(timezone.utc) - timedelta(hours=2)
         past_end = datetime.now(timezone.utc) - timedelta(hours=1)
 
-        for i in range(3):
-            supabase_client.table("study_groups").insert({
-                "subject": f"test-Expired {i}",
-                "location": "Library",
-                "start_time": past_time.isoformat(),
-                "end_time": past_end.isoformat(),
-                "organizer_email": f"expired{i}@columbia.edu",
-                "expires_at": past_end.isoformat(),
-            }).execute()
+        factory.groups([
+            factory.group_row(
+                f"Expired {i}",
+                location="Library",
+                start_time=past_time.isoformat(),
+                end_time=past_end.isoformat(),
+                organizer_email=f"expired{i}@columbia.edu",
+                expires_at=past_end.isoformat(),
+            )
+            for i in range(3)
+        ])
 
         # Run cleanup
         result = supabase_client.rpc("cleanup_expired_groups").execute()
 
         # Should have deleted at least 3 groups
         assert result.data >= 3
+
+
+class TestBatchedCleanup:
+    """Tests for the cleanup_expired_groups_batch database function."""
+
+    def test_batch_respects_batch_size(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that a single batch never deletes more than the requested number of groups."""
+        past_start = datetime.now(timezone.utc) - timedelta(hours=3)
+        past_end = datetime.now(timezone.utc) - timedelta(hours=1)
+
+        factory.groups([
+            factory.group_row(
+                f"Batch Expired {i}",
+                location="Library",
+                start_time=past_start.isoformat(),
+                end_time=past_end.isoformat(),
+                organizer_email=f"batch{i}@columbia.edu",
+            )
+            for i in range(3)
+        ])
+
+        result = supabase_client.rpc("cleanup_expired_groups_batch", {"p_batch_size": 2}).execute()
+        stats = result.data[0]
+
+        assert stats["deleted_groups"] == 2
+        assert stats["has_more"] is True
+
+    def test_repeated_batches_drain_everything(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that calling the batch function until has_more is false removes all expired groups."""
+        past_start = datetime.now(timezone.utc) - timedelta(hours=3)
+        past_end = datetime.now(timezone.utc) - timedelta(hours=1)
+
+        inserted = factory.groups([
+            factory.group_row(
+                f"Drain {i}",
+                location="Library",
+                start_time=past_start.isoformat(),
+                end_time=past_end.isoformat(),
+                organizer_email=f"drain{i}@columbia.edu",
+            )
+            for i in range(5)
+        ])
+        group_ids = [g["id"] for g in inserted]
+
+        factory.participants(group_ids[0], [("Late Joiner", "drain-late@columbia.edu")])
+
+        total_groups = 0
+        total_participants = 0
+        for _ in range(50):
+            stats = supabase_client.rpc("cleanup_expired_groups_batch", {"p_batch_size": 2}).execute().data[0]
+            total_groups += stats["deleted_groups"]
+            total_participants += stats["deleted_participants"]
+            if not stats["has_more"]:
+                break
+
+        remaining = supabase_client.table("study_groups").select("id").in_("id", group_ids).execute()
+        assert len(remaining.data) == 0
+        assert total_groups >= 5
+        assert total_participants >= 1
+
+    def test_batch_rejects_non_positive_size(self, supabase_client: Client):
+        """Test that a zero batch size is rejected."""
+        with pytest.raises(Exception):
+            supabase_client.rpc("cleanup_expired_groups_batch", {"p_batch_size": 0}).execute()
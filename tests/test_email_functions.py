@@ -4,39 +4,35 @@
 import os
 import pytest
 import httpx
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from supabase import Client
 
+from tests.factories import TestDataFactory
+
 
 class TestOnParticipantJoinedFunction:
     """Tests for the on-participant-joined Edge Function."""
 
     @pytest.fixture
     def edge_function_url(self) -> str:
-        """Get the Edge Function URL."""
-        supabase_url = os.environ.get("SUPABASE_URL", "")
+        """Get the Edge Function URL (hosted project only; the local harness has no functions)."""
+        supabase_url = os.environ.get("SUPABASE_URL")
+        if not supabase_url:
+            pytest.skip("SUPABASE_URL required for Edge Function tests")
         # Edge functions are at /functions/v1/<function-name>
         return f"{supabase_url}/functions/v1/on-participant-joined"
 
     @pytest.fixture
-    def test_study_group(self, supabase_client: Client, clean_test_data):
+    def test_study_group(self, factory: TestDataFactory):
         """Create a test study group for email tests."""
-        now = datetime.now(timezone.utc)
-        start_time = now + timedelta(hours=1)
-        end_time = now + timedelta(hours=3)
-
-        result = supabase_client.table("study_groups").insert({
-            "subject": "test-Email Function Test",
-            "professor_name": "Dr. Test",
-            "location": "Butler Library Room 301",
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "student_limit": 10,
-            "organizer_name": "Test Organizer",
-            "organizer_email": "organizer@columbia.edu",
-        }).execute()
-
-        return result.data[0]
+        return factory.group(
+            "Email Function Test",
+            professor_name="Dr. Test",
+            location="Butler Library Room 301",
+            student_limit=10,
+            organizer_name="Test Organizer",
+            organizer_email="organizer@columbia.edu",
+        )
 
     def test_function_rejects_missing_fields(self, edge_function_url: str):
         """Test that the function rejects requests with missing fields."""
@@ -122,26 +118,19 @@ class TestOnParticipantJoinedFunction:
 class TestEmailIntegration:
     """Integration tests for the email flow."""
 
-    def test_join_and_notify_flow(self, supabase_client: Client, clean_test_data):
+    def test_join_and_notify_flow(self, supabase_client: Client, factory: TestDataFactory):
         """Test the complete flow: join group → trigger notifications.
 
         This documents how the frontend should call the Edge Function
         after a participant successfully joins.
         """
-        now = datetime.now(timezone.utc)
-        start_time = now + timedelta(hours=1)
-        end_time = now + timedelta(hours=3)
-
         # 1. Create study group
-        group_result = supabase_client.table("study_groups").insert({
-            "subject": "test-Integration Test",
-            "professor_name": "Dr. Integration",
-            "location": "Mudd Building",
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "organizer_email": "integration@columbia.edu",
-        }).execute()
-        group = group_result.data[0]
+        group = factory.group(
+            "Integration Test",
+            professor_name="Dr. Integration",
+            location="Mudd Building",
+            organizer_email="integration@columbia.edu",
+        )
 
         # 2. Add participant
         participant_result = supabase_client.table("participants").insert({
@@ -171,3 +160,70 @@ class TestEmailIntegration:
             {"p_study_group_id": group["id"]}
         ).execute()
         assert count.data == 1
+
+
+class TestNotificationOutbox:
+    """Tests for the notification_outbox queue filled by participant joins."""
+
+    @pytest.fixture
+    def joined_group(self, factory: TestDataFactory):
+        """Create a study group with one joined participant."""
+        return factory.group_with_participants(
+            "Outbox Test",
+            participants=[("Outbox Student", "outbox-student@columbia.edu")],
+            student_limit=5,
+            organizer_email="outbox-organizer@columbia.edu",
+        )
+
+    def _messages(self, supabase_client: Client, group_id: str) -> list[dict]:
+        return supabase_client.table("notification_outbox").select("*").eq(
+            "study_group_id", group_id
+        ).order("id").execute().data
+
+    def test_join_enqueues_confirmation_and_organizer_notice(
+        self, supabase_client: Client, joined_group
+    ):
+        """Test that one join queues a message for the participant and for the organizer."""
+        messages = self._messages(supabase_client, joined_group["id"])
+
+        assert [(m["kind"], m["recipient"]) for m in messages] == [
+            ("join_confirmation", "outbox-student@columbia.edu"),
+            ("organizer_join", "outbox-organizer@columbia.edu"),
+        ]
+        assert all(m["status"] == "pending" for m in messages)
+        assert messages[0]["payload"]["participant_count"] == 1
+        assert messages[0]["payload"]["subject"] == joined_group["subject"]
+
+    def test_organizer_joining_own_group_queues_nothing(
+        self, supabase_client: Client, joined_group
+    ):
+        """Test that the organizer's own participant row queues no email at all."""
+        before = len(self._messages(supabase_client, joined_group["id"]))
+        supabase_client.table("participants").insert({
+            "study_group_id": joined_group["id"],
+            "name": "Organizer",
+            "email": "outbox-organizer@columbia.edu",
+        }).execute()
+
+        assert len(self._messages(supabase_client, joined_group["id"])) == before
+
+    def test_failed_delivery_is_retried_later(self, supabase_client: Client, joined_group):
+        """Test that a failed batch goes back to pending with a future available_at."""
+        ids = [m["id"] for m in self._messages(supabase_client, joined_group["id"])]
+        supabase_client.table("notification_outbox").update({
+            "status": "sending",
+            "attempts": 1,
+        }).in_("id", ids).execute()
+
+        supabase_client.rpc("fail_notifications", {
+            "p_ids": ids,
+            "p_error": "provider unavailable",
+        }).execute()
+
+        messages = self._messages(supabase_client, joined_group["id"])
+        assert all(m["status"] == "pending" for m in messages)
+        assert all(m["last_error"] == "provider unavailable" for m in messages)
+        assert all(
+            datetime.fromisoformat(m["available_at"]) > datetime.now(timezone.utc)
+            for m in messages
+        )
@@ -0,0 +1,687 @@
+# ABOUTME: SQL-level tests against the local Postgres harness (no hosted project needed)
+# ABOUTME: Covers migration stubs, RLS under API roles, capacity checks, and query plans
+
+import time
+from datetime import timedelta
+
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+from tests.local_postgres import as_role, explain_json, plan_nodes, strip_stubbed_extensions
+
+
+@pytest.fixture
+def db(pg_conn):
+    """The local connection inside a transaction that is rolled back after the test."""
+    with pg_conn.transaction(force_rollback=True):
+        yield pg_conn
+
+
+def insert_group(db, organizer_email: str, subject: str = "test-local", student_limit: int | None = None) -> str:
+    return db.execute(
+        """
+        INSERT INTO study_groups (subject, location, start_time, end_time, student_limit, organizer_email)
+        VALUES (%s, 'Butler Library', NOW() + INTERVAL '1 hour', NOW() + INTERVAL '3 hours', %s, %s)
+        RETURNING id
+        """,
+        [subject, student_limit, organizer_email],
+    ).fetchone()["id"]
+
+
+def wait_for_xmin_past_commits(conn) -> None:
+    """Wait until no transaction older than the connection's commits so far is still running.
+
+    Versions and ETags are the cluster-wide xmin, so a transaction open on another xdist
+    worker's database can hold them below a test's own commits, which then read as changed.
+    """
+    xid = conn.execute("SELECT pg_current_xact_id()::TEXT AS xid").fetchone()["xid"]
+    for _ in range(100):
+        if conn.execute("SELECT pg_snapshot_xmin(pg_current_snapshot()) > %s::XID8 AS past", [xid]).fetchone()["past"]:
+            return
+        time.sleep(0.05)
+    pytest.fail("a transaction older than this test's commits never finished")
+
+
+class TestHarness:
+    """Tests for the migration stubs."""
+
+    def test_stubbed_extensions_are_stripped(self):
+        """Test that pg_cron/pg_net statements are removed while real extensions are kept."""
+        sql = (
+            "CREATE EXTENSION IF NOT EXISTS pg_cron;\n"
+            "CREATE EXTENSION IF NOT EXISTS btree_gist;\n"
+            "COMMENT ON EXTENSION pg_cron IS 'hourly cleanup';\n"
+        )
+
+        stripped = strip_stubbed_extensions(sql)
+
+        assert "pg_cron" not in stripped
+        assert "CREATE EXTENSION IF NOT EXISTS btree_gist;" in stripped
+
+    def test_migrations_create_tables(self, db):
+        """Test that every migration applied, up to the notification outbox."""
+        for table in ("study_groups", "participants", "notification_outbox"):
+            assert db.execute("SELECT to_regclass(%s) AS t", [table]).fetchone()["t"] is not None
+
+    def test_cron_jobs_are_recorded(self, db):
+        """Test that cron.schedule calls land in the stub job table, later calls replacing earlier ones."""
+        jobs = {row["jobname"]: row["command"] for row in db.execute("SELECT jobname, command FROM cron.job")}
+
+        assert jobs["cleanup-expired-study-groups"] == "CALL run_expired_groups_cleanup()"
+        assert "process-notification-outbox" in jobs
+        assert jobs["prune-notification-outbox"] == "SELECT prune_notification_outbox()"
+
+    def test_realtime_publishes_study_groups_without_generated_columns(self, db):
+        """Test that study_groups change payloads leave out the search and range columns."""
+        row = db.execute(
+            "SELECT attnames FROM pg_publication_tables WHERE pubname = 'supabase_realtime' AND tablename = 'study_groups'"
+        ).fetchone()
+
+        assert row is not None
+        assert {"id", "organizer_email", "participant_count", "version"} <= set(row["attnames"])
+        assert not {"search_vector", "search_text", "time_range"} & set(row["attnames"])
+
+
+class TestRowLevelSecurity:
+    """Tests for policies and grants, evaluated as the PostgREST roles."""
+
+    def test_organizer_deletes_only_own_groups(self, db):
+        """Test that the delete policy matches the JWT email, case-insensitively."""
+        mine = insert_group(db, "owner@columbia.edu")
+        theirs = insert_group(db, "other@columbia.edu")
+
+        with as_role(db, "authenticated", email="Owner@Columbia.edu"):
+            assert db.execute("DELETE FROM study_groups WHERE id = %s", [theirs]).rowcount == 0
+            assert db.execute("DELETE FROM study_groups WHERE id = %s", [mine]).rowcount == 1
+
+    def test_create_my_study_group_uses_jwt_email(self, db):
+        """Test that the RPC stores the caller's email and joins them to the group."""
+        with as_role(db, "authenticated", email="Creator@Columbia.edu"):
+            row = db.execute(
+                """
+                SELECT * FROM create_my_study_group(
+                    p_subject := 'test-local create',
+                    p_location := 'Butler Library',
+                    p_start_time := NOW() + INTERVAL '1 hour',
+                    p_end_time := NOW() + INTERVAL '3 hours'
+                )
+                """
+            ).fetchone()
+            organizer = db.execute(
+                "SELECT organizer_email, version FROM study_groups WHERE id = %s", [row["id"]]
+            ).fetchone()
+
+        assert row["participant_count"] == 1
+        assert organizer["organizer_email"] == "creator@columbia.edu"
+        assert row["version"] == organizer["version"]
+
+    def test_anon_cannot_claim_notifications(self, db):
+        """Test that the outbox worker functions are not executable by anon."""
+        with pytest.raises(psycopg.errors.InsufficientPrivilege):
+            with as_role(db, "anon"):
+                db.execute("SELECT * FROM claim_notification_batch()")
+
+    def test_anon_cannot_ingest(self, db):
+        """Test that the webhook's ingestion RPC is limited to the service role."""
+        with pytest.raises(psycopg.errors.InsufficientPrivilege):
+            with as_role(db, "anon"):
+                db.execute("SELECT * FROM ingest_study_groups('[]'::JSONB)")
+
+    def test_clients_cannot_read_archive(self, db):
+        """Test that archived groups and participants are hidden from the API roles."""
+        for role in ("anon", "authenticated"):
+            with pytest.raises(psycopg.errors.InsufficientPrivilege):
+                with as_role(db, role, email="reader@columbia.edu"):
+                    db.execute("SELECT * FROM participants_archive")
+
+
+class TestCapacity:
+    """Tests for the capacity trigger."""
+
+    def test_join_beyond_limit_is_rejected(self, db):
+        """Test that the join after the last seat raises 'Study group is full'."""
+        group_id = insert_group(db, "capacity@columbia.edu", student_limit=1)
+        db.execute(
+            "INSERT INTO participants (study_group_id, name, email) VALUES (%s, 'First', 'first@columbia.edu')",
+            [group_id],
+        )
+
+        with pytest.raises(psycopg.errors.CheckViolation, match="full"):
+            with db.transaction():
+                db.execute(
+                    "INSERT INTO participants (study_group_id, name, email) VALUES (%s, 'Second', 'second@columbia.edu')",
+                    [group_id],
+                )
+
+    def test_ignored_duplicate_join_claims_no_seat(self, db):
+        """Test that an ON CONFLICT DO NOTHING duplicate join leaves participant_count unchanged."""
+        group_id = insert_group(db, "duplicate@columbia.edu", student_limit=2)
+        join = (
+            "INSERT INTO participants (study_group_id, name, email) VALUES (%s, 'Twice', 'twice@columbia.edu') "
+            "ON CONFLICT (study_group_id, email) DO NOTHING"
+        )
+        db.execute(join, [group_id])
+        db.execute(join, [group_id])
+
+        count = db.execute(
+            "SELECT participant_count FROM study_groups WHERE id = %s", [group_id]
+        ).fetchone()["participant_count"]
+        assert count == 1
+
+    def test_moving_a_participant_moves_the_seat(self, db):
+        """Test that changing a participant's group frees the old seat and claims a new one."""
+        old_group = insert_group(db, "move-from@columbia.edu")
+        new_group = insert_group(db, "move-to@columbia.edu", student_limit=1)
+        participant_id = db.execute(
+            "INSERT INTO participants (study_group_id, name, email) VALUES (%s, 'Mover', 'mover@columbia.edu') RETURNING id",
+            [old_group],
+        ).fetchone()["id"]
+
+        db.execute("UPDATE participants SET study_group_id = %s WHERE id = %s", [new_group, participant_id])
+
+        rows = db.execute(
+            "SELECT id, participant_count FROM study_groups WHERE id IN (%s, %s)", [old_group, new_group]
+        ).fetchall()
+        assert {row["id"]: row["participant_count"] for row in rows} == {old_group: 0, new_group: 1}
+
+    def test_organizer_cannot_reset_count(self, db):
+        """Test that the organizer update policy does not let a client rewrite participant_count."""
+        group_id = insert_group(db, "counter@columbia.edu", student_limit=1)
+        db.execute(
+            "INSERT INTO participants (study_group_id, name, email) VALUES (%s, 'Seated', 'seated@columbia.edu')",
+            [group_id],
+        )
+
+        with pytest.raises(psycopg.errors.InsufficientPrivilege, match="participant_count"):
+            with as_role(db, "authenticated", email="counter@columbia.edu"):
+                db.execute("UPDATE study_groups SET participant_count = 0 WHERE id = %s", [group_id])
+
+    def test_clients_cannot_repair_counts(self, db):
+        """Test that the full-table repair function is limited to the service role."""
+        for role in ("anon", "authenticated"):
+            with pytest.raises(psycopg.errors.InsufficientPrivilege):
+                with as_role(db, role, email="repair@columbia.edu"):
+                    db.execute("SELECT repair_participant_counts()")
+
+
+class TestNotificationOutbox:
+    """Tests for what joins queue, outbox retention and waking the worker."""
+
+    @pytest.fixture(autouse=True)
+    def notifications_on(self, db):
+        # The harness turns enqueueing off for every other test
+        db.execute("SET LOCAL app.notifications_enabled = 'on'")
+
+    def _join(self, db, group_id, email: str = "outbox@columbia.edu") -> None:
+        db.execute(
+            "INSERT INTO participants (study_group_id, name, email) VALUES (%s, 'Outbox', %s)",
+            [group_id, email],
+        )
+
+    def _recipients(self, db, group_id) -> list[tuple[str, str]]:
+        rows = db.execute(
+            "SELECT kind, recipient FROM notification_outbox WHERE study_group_id = %s ORDER BY id",
+            [group_id],
+        ).fetchall()
+        return [(row["kind"], row["recipient"]) for row in rows]
+
+    def test_join_queues_both_emails(self, db):
+        """Test that a student's join queues their confirmation and the organizer's notice."""
+        group_id = insert_group(db, "queue-organizer@columbia.edu")
+        self._join(db, group_id, "queue-student@columbia.edu")
+
+        assert self._recipients(db, group_id) == [
+            ("join_confirmation", "queue-student@columbia.edu"),
+            ("organizer_join", "queue-organizer@columbia.edu"),
+        ]
+
+    def test_organizer_joining_own_group_queues_nothing(self, db):
+        """Test that the organizer's own participant row sends them no email at all."""
+        group_id = insert_group(db, "self-organizer@columbia.edu")
+        self._join(db, group_id, "self-organizer@columbia.edu")
+
+        assert self._recipients(db, group_id) == []
+
+    def test_setting_off_queues_nothing(self, db):
+        """Test that app.notifications_enabled = 'off' skips the trigger."""
+        db.execute("SET LOCAL app.notifications_enabled = 'off'")
+        group_id = insert_group(db, "quiet-organizer@columbia.edu")
+        self._join(db, group_id, "quiet-student@columbia.edu")
+
+        assert self._recipients(db, group_id) == []
+
+    def test_dispatch_uses_worker_key_from_vault(self, db):
+        """Test that the worker is called with the Vault secret, and not at all without one."""
+        db.execute("SET LOCAL app.notification_worker_url = 'https://worker.test/process'")
+        self._join(db, insert_group(db, "dispatch-organizer@columbia.edu"))
+
+        assert db.execute("SELECT dispatch_notification_worker() AS r").fetchone()["r"] is None
+
+        db.execute("SELECT vault.create_secret('vault-key', 'notification_worker_key')")
+        request_id = db.execute("SELECT dispatch_notification_worker() AS r").fetchone()["r"]
+
+        request = db.execute("SELECT url, headers FROM net.http_request_queue WHERE id = %s", [request_id]).fetchone()
+        assert request["url"] == "https://worker.test/process"
+        assert request["headers"]["Authorization"] == "Bearer vault-key"
+
+    def test_deleting_group_keeps_queued_emails(self, db):
+        """Test that a group delete detaches its pending messages instead of dropping them."""
+        group_id = insert_group(db, "outbox-organizer@columbia.edu", subject="test-local outbox")
+        self._join(db, group_id)
+
+        db.execute("DELETE FROM study_groups WHERE id = %s", [group_id])
+
+        messages = db.execute(
+            "SELECT study_group_id, status, payload FROM notification_outbox WHERE recipient IN (%s, %s)",
+            ["outbox@columbia.edu", "outbox-organizer@columbia.edu"],
+        ).fetchall()
+        assert len(messages) == 2
+        assert all(m["study_group_id"] is None and m["status"] == "pending" for m in messages)
+        assert all(m["payload"]["subject"] == "test-local outbox" for m in messages)
+
+    def test_prune_removes_only_old_settled_messages(self, db):
+        """Test that old sent and failed rows are pruned while recent and pending rows stay."""
+        group_id = insert_group(db, "prune-organizer@columbia.edu")
+        for n in range(4):
+            self._join(db, group_id, f"prune{n}@columbia.edu")
+        ids = [
+            row["id"] for row in db.execute(
+                "SELECT id FROM notification_outbox WHERE study_group_id = %s AND kind = 'join_confirmation' ORDER BY id",
+                [group_id],
+            )
+        ]
+        old_sent, recent_sent, old_failed, pending = ids
+        db.execute(
+            "UPDATE notification_outbox SET status = 'sent', sent_at = NOW() - INTERVAL '8 days' WHERE id = %s",
+            [old_sent],
+        )
+        db.execute("UPDATE notification_outbox SET status = 'sent', sent_at = NOW() WHERE id = %s", [recent_sent])
+        db.execute(
+            "UPDATE notification_outbox SET status = 'failed', created_at = NOW() - INTERVAL '31 days' WHERE id = %s",
+            [old_failed],
+        )
+
+        assert db.execute("SELECT prune_notification_outbox() AS n").fetchone()["n"] == 2
+        left = {row["id"] for row in db.execute("SELECT id FROM notification_outbox WHERE id = ANY(%s)", [ids])}
+        assert left == {recent_sent, pending}
+
+
+class TestQueryPlans:
+    """Plan assertions that need a real planner and realistic row counts."""
+
+    @pytest.fixture
+    def many_groups(self, db):
+        db.execute(
+            """
+            INSERT INTO study_groups (subject, location, start_time, end_time, organizer_email)
+            SELECT 'test-plan ' || i, 'Butler Library',
+                   NOW() + i * INTERVAL '1 minute', NOW() + i * INTERVAL '1 minute' + INTERVAL '2 hours',
+                   'plan' || i || '@columbia.edu'
+            FROM generate_series(1, 5000) AS i
+            """
+        )
+        db.execute("ANALYZE study_groups")
+        return db
+
+    def test_keyset_page_uses_live_listing_index(self, many_groups):
+        """Test that a keyset page is an ordered index scan, not a sort of the table."""
+        plan = explain_json(
+            many_groups,
+            """
+            SELECT id FROM study_groups
+            WHERE (start_time, id) > (NOW(), '00000000-0000-0000-0000-000000000000'::UUID)
+            ORDER BY start_time, id
+            LIMIT 24
+            """,
+        )
+
+        nodes = list(plan_nodes(plan))
+        assert any(node.get("Index Name") == "idx_study_groups_live_listing" for node in nodes)
+        assert not any(node["Node Type"] == "Sort" for node in nodes)
+
+    def test_organizer_groups_use_organizer_index(self, many_groups):
+        """Test that an organizer's groups are found through the organizer_email index."""
+        plan = explain_json(
+            many_groups,
+            "SELECT id FROM study_groups WHERE organizer_email = 'plan7@columbia.edu' ORDER BY start_time, id",
+        )
+
+        nodes = list(plan_nodes(plan))
+        assert any(node.get("Index Name") == "idx_study_groups_organizer_email" for node in nodes)
+
+
+class TestRpcTiming:
+    """Tests for the opt-in RPC timing samples."""
+
+    def _samples(self, db) -> list[dict]:
+        return db.execute("SELECT rpc FROM instrumentation.rpc_timing_samples").fetchall()
+
+    def test_no_samples_while_disabled(self, db):
+        """Test that calls record nothing until a sample rate is set."""
+        before = len(self._samples(db))
+        group_id = insert_group(db, "untimed@columbia.edu")
+        db.execute("SELECT get_group_page(%s, NULL)", [group_id])
+
+        assert len(self._samples(db)) == before
+
+    def test_sampled_calls_feed_the_report(self, db):
+        """Test that a sampled call is recorded and ranked by the CLI report."""
+        from main import fetch_report
+
+        db.execute("SET LOCAL app.rpc_timing_sample_rate = '1'")
+        group_id = insert_group(db, "timing@columbia.edu")
+        db.execute(
+            "INSERT INTO participants (study_group_id, name, email) VALUES (%s, 'Timed', 'timed@columbia.edu')",
+            [group_id],
+        )
+        db.execute("SELECT get_group_page(%s, NULL)", [group_id])
+
+        report = fetch_report(db, since_minutes=5, statement_limit=5)
+
+        rpcs = {row["rpc"] for row in report["hot_paths"]}
+        assert {"get_group_page", "check_study_group_capacity"} <= rpcs
+        assert report["sample_rates"] == [1.0, 1.0]
+
+    def test_samples_scale_by_their_own_rate(self, db):
+        """Test that the report scales each sample by the rate it was taken at, not the current one."""
+        from main import fetch_report
+
+        db.execute("SET LOCAL app.rpc_timing_sample_rate = '1'")
+        db.execute("SELECT instrumentation.record_rpc_timing('rated', clock_timestamp())")
+        db.execute("UPDATE instrumentation.rpc_timing_samples SET sample_rate = 0.25 WHERE rpc = 'rated'")
+        db.execute("SET LOCAL app.rpc_timing_sample_rate = '0'")
+
+        report = fetch_report(db, since_minutes=5, statement_limit=5)
+
+        rated = next(row for row in report["hot_paths"] if row["rpc"] == "rated")
+        assert rated["estimated_calls"] == 4
+
+    def test_clients_cannot_record_samples(self, db):
+        """Test that API roles cannot write samples directly, while their joins are still timed."""
+        db.execute("SET LOCAL app.rpc_timing_sample_rate = '1'")
+        group_id = insert_group(db, "timed-anon@columbia.edu")
+        with as_role(db, "anon"):
+            db.execute(
+                "INSERT INTO participants (study_group_id, name, email) VALUES (%s, 'Anon', 'anon-timed@columbia.edu')",
+                [group_id],
+            )
+            db.execute("RESET ROLE")
+            assert "check_study_group_capacity" in {row["rpc"] for row in self._samples(db)}
+
+        for role in ("anon", "authenticated"):
+            with pytest.raises(psycopg.errors.InsufficientPrivilege):
+                with as_role(db, role, email="faker@columbia.edu"):
+                    db.execute("SELECT instrumentation.record_rpc_timing('fake', clock_timestamp())")
+
+    def test_listing_stays_stable(self, db):
+        """Test that the public listing RPC can still run in a read-only transaction (GET)."""
+        volatility = db.execute(
+            "SELECT provolatile FROM pg_proc WHERE proname = 'get_study_groups_with_counts'"
+        ).fetchone()["provolatile"]
+
+        assert volatility == "s"
+
+    def test_ring_buffer_overwrites_oldest_slot(self, db):
+        """Test that the table never holds more rows than the ring size."""
+        db.execute("SET LOCAL app.rpc_timing_sample_rate = '1'")
+        db.execute("SET LOCAL app.rpc_timing_ring_size = '3'")
+        for _ in range(5):
+            db.execute("SELECT instrumentation.record_rpc_timing('ring', clock_timestamp())")
+
+        slots = db.execute(
+            "SELECT slot FROM instrumentation.rpc_timing_samples WHERE rpc = 'ring'"
+        ).fetchall()
+        assert len(slots) <= 3
+
+
+class TestUpcomingGroupsSnapshot:
+    """Tests for the ETag logic of get_upcoming_groups_snapshot (needs committed transactions)."""
+
+    @pytest.fixture
+    def committed_group(self, pg_conn):
+        group_id = insert_group(pg_conn, "snapshot@columbia.edu", subject="test-local snapshot")
+        yield str(group_id)
+        pg_conn.execute("DELETE FROM study_groups WHERE id = %s", [group_id])
+
+    def _snapshot(self, conn, etag: str | None = None, at_group: str | None = None) -> dict:
+        # The page starting at at_group's start time, so other upcoming rows can't push it off
+        start_time = None
+        if at_group:
+            start_time = conn.execute(
+                "SELECT start_time FROM upcoming_groups_snapshot WHERE id = %s", [at_group]
+            ).fetchone()["start_time"]
+        return conn.execute(
+            "SELECT get_upcoming_groups_snapshot(%s, 24, %s) AS s", [etag, start_time]
+        ).fetchone()["s"]
+
+    def test_unchanged_etag_is_not_modified(self, pg_conn, committed_group):
+        """Test that repeating the call with its own ETag skips the payload."""
+        wait_for_xmin_past_commits(pg_conn)
+        first = self._snapshot(pg_conn, at_group=committed_group)
+        second = self._snapshot(pg_conn, first["etag"], at_group=committed_group)
+
+        assert committed_group in {g["id"] for g in first["groups"]}
+        assert second["not_modified"] is True
+        assert "groups" not in second
+
+    def test_join_after_etag_is_modified(self, pg_conn, committed_group):
+        """Test that a committed join invalidates earlier ETags."""
+        etag = self._snapshot(pg_conn)["etag"]
+        pg_conn.execute(
+            "INSERT INTO participants (study_group_id, name, email) VALUES (%s, 'Late', 'late@columbia.edu')",
+            [committed_group],
+        )
+
+        snapshot = self._snapshot(pg_conn, etag, at_group=committed_group)
+
+        row = next(g for g in snapshot["groups"] if g["id"] == committed_group)
+        assert row["participant_count"] == 1
+
+    def test_delete_leaves_tombstone(self, pg_conn):
+        """Test that a deleted group is dropped from the payload and invalidates earlier ETags."""
+        group_id = str(insert_group(pg_conn, "tombstone@columbia.edu"))
+        etag = self._snapshot(pg_conn)["etag"]
+        pg_conn.execute("DELETE FROM study_groups WHERE id = %s", [group_id])
+
+        snapshot = self._snapshot(pg_conn, etag, at_group=group_id)
+
+        assert snapshot["not_modified"] is False
+        assert group_id not in {g["id"] for g in snapshot["groups"]}
+        assert pg_conn.execute(
+            "SELECT deleted FROM upcoming_groups_snapshot WHERE id = %s", [group_id]
+        ).fetchone()["deleted"] is True
+
+    def test_pages_continue_after_cursor(self, pg_conn):
+        """Test that a keyset page starts right after the row passed as its cursor."""
+        group_ids = [insert_group(pg_conn, "pages@columbia.edu") for _ in range(3)]
+        try:
+            first = self._snapshot(pg_conn, at_group=str(group_ids[0]))["groups"]
+            following = pg_conn.execute(
+                "SELECT get_upcoming_groups_snapshot(NULL, 1, %s, %s) AS s",
+                [first[0]["start_time"], first[0]["id"]],
+            ).fetchone()["s"]["groups"]
+
+            assert [g["id"] for g in following] == [first[1]["id"]]
+        finally:
+            pg_conn.execute("DELETE FROM study_groups WHERE id = ANY(%s)", [group_ids])
+
+    def test_malformed_etag_gets_full_payload(self, pg_conn):
+        """Test that an unparseable ETag is treated as no ETag."""
+        assert self._snapshot(pg_conn, "not-an-etag")["not_modified"] is False
+
+    def test_table_is_only_reachable_through_rpc(self, db):
+        """Test that anon can call the RPC but not select the snapshot table."""
+        with as_role(db, "anon"):
+            assert "etag" in self._snapshot(db)
+
+        with pytest.raises(psycopg.errors.InsufficientPrivilege):
+            with as_role(db, "anon"):
+                db.execute("SELECT * FROM upcoming_groups_snapshot")
+
+
+class TestListingVisibility:
+    """Tests that every listing RPC agrees on which groups are listed."""
+
+    def test_lapsed_group_is_in_no_listing(self, db):
+        """Test that a group past its 24h listing window but not yet ended is hidden everywhere."""
+        listed = insert_group(db, "listed@columbia.edu", subject="test-local lapsing")
+        lapsed = db.execute(
+            """
+            INSERT INTO study_groups (subject, location, start_time, end_time, organizer_email, created_at)
+            VALUES ('test-local lapsing', 'Butler Library', NOW() + INTERVAL '1 hour', NOW() + INTERVAL '3 hours',
+                    'lapsed@columbia.edu', NOW() - INTERVAL '2 days')
+            RETURNING id
+            """
+        ).fetchone()["id"]
+        start_time = db.execute("SELECT MIN(start_time) AS t FROM study_groups WHERE id IN (%s, %s)",
+                                [listed, lapsed]).fetchone()["t"] - timedelta(microseconds=1)
+
+        listings = {
+            "with_counts": db.execute("SELECT id FROM get_study_groups_with_counts()").fetchall(),
+            "page": db.execute("SELECT id FROM get_study_groups_page(100, %s)", [start_time]).fetchall(),
+            "search": db.execute("SELECT id FROM search_study_groups('lapsing', 100)").fetchall(),
+            "snapshot": db.execute(
+                "SELECT jsonb_array_elements(get_upcoming_groups_snapshot(NULL, 100, %s)->'groups')->>'id' AS id",
+                [start_time],
+            ).fetchall(),
+        }
+
+        for name, rows in listings.items():
+            ids = {str(row["id"]) for row in rows}
+            assert str(listed) in ids, name
+            assert str(lapsed) not in ids, name
+
+
+class TestSearchStudyGroups:
+    """Tests for the keyset cursor of search_study_groups."""
+
+    def test_rank_only_cursor_keeps_rows_of_that_rank(self, db):
+        """Test that a cursor without start_time/id continues from the start of its rank."""
+        ids = {str(insert_group(db, f"cursor{i}@columbia.edu", subject="test-local cursorrank")) for i in range(2)}
+        first = db.execute("SELECT id, rank FROM search_study_groups('cursorrank', 100)").fetchall()
+        assert {str(row["id"]) for row in first} == ids
+
+        rank_only = db.execute(
+            "SELECT id FROM search_study_groups('cursorrank', 100, %s::REAL)", [first[0]["rank"]]
+        ).fetchall()
+
+        assert {str(row["id"]) for row in rank_only} == ids
+
+
+class TestStudyGroupsSince:
+    """Tests for the catalogue deltas of get_study_groups_since (needs committed transactions)."""
+
+    def _since(self, conn, version: int | None, mine: bool = False) -> dict:
+        return conn.execute(
+            "SELECT get_study_groups_since(%s, %s) AS d", [version, mine]
+        ).fetchone()["d"]
+
+    def test_no_version_asks_for_resync(self, pg_conn):
+        """Test that a client without a version is told to load the list."""
+        delta = self._since(pg_conn, None)
+
+        assert delta["resync"] is True
+        assert isinstance(delta["version"], int)
+
+    def test_delta_has_changed_rows_and_tombstones(self, pg_conn):
+        """Test that only rows written after the version come back, plus deleted ids."""
+        untouched = str(insert_group(pg_conn, "since-a@columbia.edu"))
+        doomed = str(insert_group(pg_conn, "since-b@columbia.edu"))
+        try:
+            wait_for_xmin_past_commits(pg_conn)
+            version = self._since(pg_conn, None)["version"]
+            assert self._since(pg_conn, version)["not_modified"] is True
+
+            joined = str(insert_group(pg_conn, "since-c@columbia.edu"))
+            pg_conn.execute("DELETE FROM study_groups WHERE id = %s", [doomed])
+            delta = self._since(pg_conn, version)
+        finally:
+            pg_conn.execute(
+                "DELETE FROM study_groups WHERE organizer_email LIKE 'since-%%@columbia.edu'"
+            )
+
+        assert {g["id"] for g in delta["changed"]} == {joined}
+        assert delta["deleted"] == [doomed]
+        assert untouched not in {g["id"] for g in delta["changed"]}
+        assert delta["version"] >= version
+
+    def test_mine_filters_to_callers_groups(self, db):
+        """Test that p_mine returns only groups organized by the JWT email."""
+        version = self._since(db, None)["version"]
+        mine = str(insert_group(db, "mine@columbia.edu"))
+        insert_group(db, "someone-else@columbia.edu")
+
+        with as_role(db, "authenticated", email="Mine@Columbia.edu"):
+            delta = self._since(db, version, mine=True)
+
+        assert [g["id"] for g in delta["changed"]] == [mine]
+
+    def test_pruned_tombstones_force_resync(self, db):
+        """Test that versions older than pruned tombstones are sent back to a full load."""
+        version = self._since(db, None)["version"]
+        group_id = insert_group(db, "pruned@columbia.edu")
+        db.execute("DELETE FROM study_groups WHERE id = %s", [group_id])
+        db.execute(
+            "UPDATE upcoming_groups_snapshot SET changed_at = NOW() - INTERVAL '2 days' WHERE id = %s",
+            [group_id],
+        )
+
+        assert db.execute("SELECT prune_upcoming_groups_snapshot() AS n").fetchone()["n"] >= 1
+        assert self._since(db, version)["resync"] is True
+
+
+class TestMyDashboard:
+    """Tests for the get_my_dashboard organizer RPC."""
+
+    def _dashboard(self, db, preview_limit: int = 25) -> dict:
+        return db.execute("SELECT get_my_dashboard(%s) AS d", [preview_limit]).fetchone()["d"]
+
+    def test_returns_only_callers_groups_with_participants(self, db):
+        """Test that ownership comes from the JWT email and participants arrive in join order."""
+        mine = str(insert_group(db, "dash@columbia.edu"))
+        insert_group(db, "not-dash@columbia.edu")
+        db.execute(
+            """
+            INSERT INTO participants (study_group_id, name, email, joined_at)
+            VALUES (%s, 'Second', 'second@columbia.edu', NOW()),
+                   (%s, 'First', 'first@columbia.edu', NOW() - INTERVAL '1 minute')
+            """,
+            [mine, mine],
+        )
+
+        with as_role(db, "authenticated", email="Dash@Columbia.edu"):
+            dashboard = self._dashboard(db)
+
+        assert [g["id"] for g in dashboard["groups"]] == [mine]
+        group = dashboard["groups"][0]
+        assert group["participant_count"] == 2
+        assert [p["name"] for p in group["participants"]] == ["First", "Second"]
+        assert isinstance(dashboard["version"], int)
+
+    def test_preview_is_bounded(self, db):
+        """Test that at most p_preview_limit participants are sent per group."""
+        group_id = insert_group(db, "dash-preview@columbia.edu")
+        db.execute(
+            """
+            INSERT INTO participants (study_group_id, name, email)
+            SELECT %s, 'P' || i, 'dash-p' || i || '@columbia.edu' FROM generate_series(1, 3) AS i
+            """,
+            [group_id],
+        )
+
+        with as_role(db, "authenticated", email="dash-preview@columbia.edu"):
+            group = self._dashboard(db, 2)["groups"][0]
+
+        assert group["participant_count"] == 3
+        assert len(group["participants"]) == 2
+
+    def test_requires_authentication(self, db):
+        """Test that anon cannot call the RPC and a JWT without email is rejected."""
+        with pytest.raises(psycopg.errors.InsufficientPrivilege):
+            with as_role(db, "anon"):
+                self._dashboard(db)
+
+        with pytest.raises(psycopg.errors.RaiseException, match="Not authenticated"):
+            with as_role(db, "authenticated"):
+                self._dashboard(db)
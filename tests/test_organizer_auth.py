@@ -5,6 +5,8 @@ import pytest
 from datetime import datetime, timedelta, timezone
 from supabase import Client
 
+from tests.factories import TestDataFactory
+
 
 class TestOrganizerFunctions:
     """Tests for organizer-specific database functions.
@@ -15,38 +17,15 @@ class TestOrganizerFunctions:
     """
 
     @pytest.fixture
-    def organizer_study_group(self, supabase_client: Client, clean_test_data):
-        """Create a test study group with a specific organizer email."""
-        now = datetime.now(timezone.utc)
-        start_time = now + timedelta(hours=1)
-        end_time = now + timedelta(hours=3)
-
-        result = supabase_client.table("study_groups").insert({
-            "subject": "test-Organizer Auth Test",
-            "location": "Butler Library",
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "student_limit": 5,
-            "organizer_name": "Test Organizer",
-            "organizer_email": "organizer@columbia.edu",
-        }).execute()
-
-        group = result.data[0]
-
-        # Add some participants
-        supabase_client.table("participants").insert({
-            "study_group_id": group["id"],
-            "name": "Participant 1",
-            "email": "p1@columbia.edu",
-        }).execute()
-
-        supabase_client.table("participants").insert({
-            "study_group_id": group["id"],
-            "name": "Participant 2",
-            "email": "p2@columbia.edu",
-        }).execute()
-
-        return group
+    def organizer_study_group(self, factory: TestDataFactory):
+        """Create a test study group with a specific organizer email and two participants."""
+        return factory.group_with_participants(
+            "Organizer Auth Test",
+            participants=2,
+            student_limit=5,
+            organizer_name="Test Organizer",
+            organizer_email="organizer@columbia.edu",
+        )
 
     def test_get_participant_count_for_organizer_group(
         self, supabase_client: Client, organizer_study_group
@@ -78,29 +57,16 @@ class TestOrganizerFunctions:
         assert "organizer_email" not in test_group
 
     def test_delete_study_group_cascades_participants(
-        self, supabase_client: Client, clean_test_data
+        self, supabase_client: Client, factory: TestDataFactory
     ):
         """Test that deleting a study group removes all participants."""
-        now = datetime.now(timezone.utc)
-        start_time = now + timedelta(hours=1)
-        end_time = now + timedelta(hours=3)
-
-        # Create group
-        group_result = supabase_client.table("study_groups").insert({
-            "subject": "test-Delete Cascade Test",
-            "location": "Mudd Building",
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "organizer_email": "delete-test@columbia.edu",
-        }).execute()
-        group_id = group_result.data[0]["id"]
-
-        # Add participants
-        supabase_client.table("participants").insert({
-            "study_group_id": group_id,
-            "name": "To Be Deleted",
-            "email": "tobedeleted@columbia.edu",
-        }).execute()
+        # Create group with one participant
+        group_id = factory.group_with_participants(
+            "Delete Cascade Test",
+            participants=[("To Be Deleted", "tobedeleted@columbia.edu")],
+            location="Mudd Building",
+            organizer_email="delete-test@columbia.edu",
+        )["id"]
 
         # Verify participant exists
         participants_before = supabase_client.table("participants").select("*").eq(
@@ -117,6 +83,28 @@ class TestOrganizerFunctions:
         ).execute()
         assert len(participants_after.data) == 0
 
+    def test_create_my_study_group_requires_email_claim(
+        self, supabase_client: Client, factory: TestDataFactory, clean_test_data
+    ):
+        """Test that create_my_study_group refuses callers without an email in their JWT.
+
+        The service role token carries no email claim, so no group may be created.
+        """
+        now = datetime.now(timezone.utc)
+
+        with pytest.raises(Exception, match="Not authenticated"):
+            supabase_client.rpc("create_my_study_group", {
+                "p_subject": factory.subject("Create RPC"),
+                "p_location": "Butler Library",
+                "p_start_time": (now + timedelta(hours=1)).isoformat(),
+                "p_end_time": (now + timedelta(hours=3)).isoformat(),
+            }).execute()
+
+        groups = supabase_client.table("study_groups").select("id").eq(
+            "subject", factory.subject("Create RPC")
+        ).execute()
+        assert groups.data == []
+
 
 class TestRLSPolicies:
     """Tests for Row Level Security policies.
@@ -125,49 +113,27 @@ class TestRLSPolicies:
     Full end-to-end auth testing requires a browser-based test.
     """
 
-    def test_anon_can_read_study_groups(self, supabase_client: Client, clean_test_data):
+    def test_anon_can_read_study_groups(self, supabase_client: Client, factory: TestDataFactory):
         """Test that anonymous users can read study groups."""
-        now = datetime.now(timezone.utc)
-        start_time = now + timedelta(hours=1)
-        end_time = now + timedelta(hours=3)
-
         # Create a group using service role
-        supabase_client.table("study_groups").insert({
-            "subject": "test-Anon Read Test",
-            "location": "Library",
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "organizer_email": "anon-test@columbia.edu",
-        }).execute()
+        factory.group("Anon Read Test", location="Library", organizer_email="anon-test@columbia.edu")
 
         # Read using service role (simulating anon read - RLS allows it)
         result = supabase_client.table("study_groups").select("*").like(
-            "subject", "test-Anon Read Test"
+            "subject", factory.subject("Anon Read Test")
         ).execute()
 
         assert len(result.data) == 1
 
-    def test_anon_can_read_participant_names(self, supabase_client: Client, clean_test_data):
+    def test_anon_can_read_participant_names(self, supabase_client: Client, factory: TestDataFactory):
         """Test that anonymous users can read participant names."""
-        now = datetime.now(timezone.utc)
-        start_time = now + timedelta(hours=1)
-        end_time = now + timedelta(hours=3)
-
         # Create group and participant
-        group_result = supabase_client.table("study_groups").insert({
-            "subject": "test-Participant Names Test",
-            "location": "Library",
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "organizer_email": "names-test@columbia.edu",
-        }).execute()
-        group_id = group_result.data[0]["id"]
-
-        supabase_client.table("participants").insert({
-            "study_group_id": group_id,
-            "name": "Visible Name",
-            "email": "hidden@columbia.edu",
-        }).execute()
+        group_id = factory.group_with_participants(
+            "Participant Names Test",
+            participants=[("Visible Name", "hidden@columbia.edu")],
+            location="Library",
+            organizer_email="names-test@columbia.edu",
+        )["id"]
 
         # Query only names (what frontend should do)
         result = supabase_client.table("participants").select("name").eq(
@@ -211,7 +177,7 @@ class TestMagicLinkAuthFlow:
         assert "signInWithOtp" in flow
         assert "get_my_study_groups" in flow
 
-    def test_rls_policy_for_organizer_delete(self, supabase_client: Client, clean_test_data):
+    def test_rls_policy_for_organizer_delete(self, supabase_client: Client):
         """Test that the delete policy exists and is correctly defined."""
         # Query the RLS policies from the system catalog
         result = supabase_client.rpc(
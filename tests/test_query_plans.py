@@ -0,0 +1,363 @@
+# ABOUTME: Query-plan regression tests for the hot RPCs, run against the local Postgres harness
+# ABOUTME: Asserts index use, row estimates and buffer budgets, and diffs plan shapes against snapshots
+
+import difflib
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("psycopg")
+
+from tests.local_postgres import auto_explain, plan_nodes
+
+SNAPSHOT_DIR = Path(__file__).with_name("plan_snapshots")
+
+# Seeded volume: roughly a busy semester's worth of live groups plus a cleanup backlog
+ACTIVE_GROUPS = 4000
+ENDED_GROUPS = 200
+SUBJECTS = 40
+PARTICIPANTS_PER_GROUP = 4
+PREFIX = "plan-"
+
+# Live groups at which the listing outgrows a sequential scan and sort
+CATALOGUE_GROUPS = 30_000
+
+# A node's estimate may be off by this factor before the planner is considered misinformed
+ROW_ESTIMATE_FACTOR = 10
+
+
+@dataclass(frozen=True)
+class HotPath:
+    """One RPC call and the plan properties it must keep."""
+
+    name: str
+    sql: str
+    # Keys of the seeded fixture passed as the statement's parameters
+    params: tuple[str, ...] = ()
+    # Indexes that must appear somewhere in the call's plans
+    indexes: tuple[str, ...] = ()
+    # Tables that must never be read with a sequential scan
+    no_seq_scan: tuple[str, ...] = ("study_groups", "participants")
+    # Upper bound on shared buffers (hit + read) touched by the whole call
+    max_buffers: int = 100
+    # Off for calls that delete the rows their later statements' statistics still count
+    check_estimates: bool = True
+
+
+HOT_PATHS = [
+    # At this volume the full listing is cheapest as a sequential scan and an in-memory sort;
+    # the covering index takes over at catalogue scale (TestCoveringIndex)
+    HotPath(
+        name="get_study_groups_with_counts",
+        sql="SELECT * FROM get_study_groups_with_counts()",
+        no_seq_scan=("participants",),
+        max_buffers=10000,
+    ),
+    # A home feed page from the precomputed payloads, in index order
+    HotPath(
+        name="upcoming_groups_snapshot_page",
+        sql="SELECT get_upcoming_groups_snapshot(NULL, 24, %s, %s)",
+        params=("start_time", "group_id"),
+        indexes=("idx_upcoming_groups_snapshot_start_time_id",),
+        no_seq_scan=("upcoming_groups_snapshot",),
+        max_buffers=100,
+    ),
+    HotPath(
+        name="find_similar_study_groups",
+        sql="SELECT * FROM find_similar_study_groups(%s, NULL, %s, %s)",
+        params=("subject", "start_time", "end_time"),
+        indexes=("idx_study_groups_subject_time_range",),
+        max_buffers=50,
+    ),
+    HotPath(
+        name="is_group_member",
+        sql="SELECT is_group_member(%s, %s)",
+        params=("group_id", "member_email"),
+        # The organizer probe may use the primary key or the organizer index; either is a lookup
+        indexes=("unique_participant_per_group",),
+        max_buffers=20,
+    ),
+    # GroupPage's single round trip: the group by primary key and its participants once
+    HotPath(
+        name="get_group_page",
+        sql="SELECT get_group_page(%s, %s)",
+        params=("group_id", "member_email"),
+        indexes=("study_groups_pkey", "idx_participants_study_group_id"),
+        max_buffers=30,
+    ),
+    # Organizer dashboard order: a handful of rows from the organizer index, sorted in memory
+    HotPath(
+        name="organizer_groups",
+        sql="SELECT id FROM study_groups WHERE organizer_email = %s ORDER BY start_time, id",
+        params=("organizer_email",),
+        indexes=("idx_study_groups_organizer_email",),
+        max_buffers=10,
+    ),
+    # Participant lists in join order: a few rows from the group's index, sorted in memory
+    HotPath(
+        name="group_participants",
+        sql="SELECT id, name, email, joined_at FROM participants WHERE study_group_id = %s ORDER BY joined_at, id",
+        params=("group_id",),
+        indexes=("idx_participants_study_group_id",),
+        max_buffers=10,
+    ),
+    # Deletes the whole ended backlog; participants cascade and outbox rows detach through their FK indexes
+    HotPath(
+        name="cleanup_expired_groups",
+        sql="SELECT cleanup_expired_groups()",
+        indexes=(
+            "idx_study_groups_end_time",
+            "idx_participants_study_group_id",
+            "idx_notification_outbox_study_group_id",
+        ),
+        max_buffers=60000,
+        check_estimates=False,
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def seeded(pg_conn) -> dict[str, Any]:
+    """Commit realistic volumes (removed after the module) and refresh planner statistics."""
+    # Start from compact tables: otherwise the seeded rows fill whatever space earlier modules on
+    # this worker freed, and the physical order the planner's correlation estimates see varies
+    pg_conn.execute("VACUUM FULL study_groups, participants")
+    # Production queues join emails; the harness default of off would leave the outbox empty
+    pg_conn.execute("SET app.notifications_enabled = 'on'")
+    pg_conn.execute(
+        """
+        INSERT INTO study_groups (subject, professor_name, location, start_time, end_time, organizer_email)
+        SELECT %(prefix)s || 'Subject ' || (i %% %(subjects)s), 'Professor ' || (i %% 97), 'Butler Library',
+               NOW() + (i %% 2000) * INTERVAL '10 minutes',
+               NOW() + (i %% 2000) * INTERVAL '10 minutes' + INTERVAL '2 hours',
+               'plan-org' || i || '@columbia.edu'
+        FROM generate_series(1, %(active)s) AS i
+        """,
+        {"prefix": PREFIX, "subjects": SUBJECTS, "active": ACTIVE_GROUPS},
+    )
+    pg_conn.execute(
+        """
+        INSERT INTO study_groups (subject, location, start_time, end_time, organizer_email)
+        SELECT %(prefix)s || 'Ended ' || i, 'Butler Library',
+               NOW() - INTERVAL '3 hours', NOW() - INTERVAL '1 hour' - i * INTERVAL '1 second',
+               'plan-ended' || i || '@columbia.edu'
+        FROM generate_series(1, %(ended)s) AS i
+        """,
+        {"prefix": PREFIX, "ended": ENDED_GROUPS},
+    )
+    pg_conn.execute(
+        """
+        INSERT INTO participants (study_group_id, name, email)
+        SELECT sg.id, 'Student ' || p, 'plan-s' || p || '-' || LEFT(sg.id::TEXT, 8) || '@columbia.edu'
+        FROM study_groups sg, generate_series(1, %(per_group)s) AS p
+        WHERE sg.subject LIKE %(pattern)s
+        """,
+        {"per_group": PARTICIPANTS_PER_GROUP, "pattern": f"{PREFIX}%"},
+    )
+    # Every join rewrote its group's row; clear the dead versions as autovacuum would
+    pg_conn.execute("VACUUM ANALYZE study_groups, participants, notification_outbox, upcoming_groups_snapshot")
+
+    sample = pg_conn.execute(
+        """
+        SELECT sg.id, sg.subject, sg.start_time, sg.end_time, sg.organizer_email, p.email
+        FROM study_groups sg JOIN participants p ON p.study_group_id = sg.id
+        WHERE sg.subject = %s
+        LIMIT 1
+        """,
+        [f"{PREFIX}Subject 7"],
+    ).fetchone()
+
+    yield {
+        "group_id": sample["id"],
+        "member_email": sample["email"],
+        "subject": sample["subject"],
+        "start_time": sample["start_time"],
+        "end_time": sample["end_time"],
+        "organizer_email": sample["organizer_email"],
+    }
+
+    pg_conn.execute("RESET app.notifications_enabled")
+    pg_conn.execute("DELETE FROM study_groups WHERE subject LIKE %s", [f"{PREFIX}%"])
+    # Deleting a group only detaches its queued emails
+    pg_conn.execute("DELETE FROM notification_outbox WHERE recipient LIKE 'plan-%%'")
+    pg_conn.execute("ANALYZE study_groups, participants, notification_outbox")
+
+
+@pytest.fixture(scope="module")
+def catalogue(pg_conn) -> Iterator[None]:
+    """Commit a catalogue-sized listing (removed after the module), bypassing the row triggers."""
+    pg_conn.execute("SET session_replication_role = replica")
+    pg_conn.execute(
+        """
+        INSERT INTO study_groups (subject, location, start_time, end_time, organizer_email,
+                                  expires_at, participant_count)
+        SELECT %(prefix)s || 'Catalogue ' || (i %% %(subjects)s), 'Butler Library',
+               NOW() + (i %% 5000) * INTERVAL '10 minutes',
+               NOW() + (i %% 5000) * INTERVAL '10 minutes' + INTERVAL '2 hours',
+               'plan-cat' || (i %% 1000) || '@columbia.edu', NOW() + INTERVAL '1 day', i %% 5
+        FROM generate_series(1, %(groups)s) AS i
+        """,
+        {"prefix": PREFIX, "subjects": SUBJECTS, "groups": CATALOGUE_GROUPS},
+    )
+    pg_conn.execute("SET session_replication_role = DEFAULT")
+    pg_conn.execute("VACUUM ANALYZE study_groups")
+
+    yield
+
+    pg_conn.execute("SET session_replication_role = replica")
+    pg_conn.execute("DELETE FROM study_groups WHERE subject LIKE %s", [f"{PREFIX}Catalogue%"])
+    pg_conn.execute("SET session_replication_role = DEFAULT")
+    # Hand back the table at its old size for any module seeded after this one
+    pg_conn.execute("VACUUM ANALYZE study_groups")
+
+
+def plan_shape(plans: list[dict[str, Any]]) -> str:
+    """Stable text form of a call's plans: node types, relations, indexes. No costs or timings.
+
+    Statements run once per row (foreign key actions, row triggers) are listed once, in order
+    of first appearance, with their count.
+    """
+    shapes: dict[str, list[str]] = {}
+    counts: Counter[str] = Counter()
+    for statement in plans:
+        query = " ".join(statement.get("Query Text", "").split())[:120]
+        lines: list[str] = []
+        _shape(statement["Plan"], 0, lines)
+        key = "\n".join([query, *lines])
+        shapes.setdefault(key, lines)
+        counts[key] += 1
+
+    out = []
+    for key, lines in shapes.items():
+        query = key.split("\n", 1)[0]
+        out.append(f"-- {query}" + (f" (x{counts[key]})" if counts[key] > 1 else ""))
+        out.extend(lines)
+    return "\n".join(out) + "\n"
+
+
+def _shape(node: dict[str, Any], depth: int, lines: list[str]) -> None:
+    parts = [node["Node Type"]]
+    if join := node.get("Join Type"):
+        parts.append(f"({join})")
+    if relation := node.get("Relation Name"):
+        parts.append(f"on {relation}")
+    if index := node.get("Index Name"):
+        parts.append(f"using {index}")
+    if cte := node.get("CTE Name"):
+        parts.append(f"[{cte}]")
+    if subplan := node.get("Subplan Name"):
+        parts.append(f"[{subplan}]")
+    lines.append("  " * depth + " ".join(parts))
+    for child in node.get("Plans", []):
+        _shape(child, depth + 1, lines)
+
+
+def _buffers(node: dict[str, Any]) -> int:
+    return node.get("Shared Hit Blocks", 0) + node.get("Shared Read Blocks", 0)
+
+
+def _unlimited_nodes(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Nodes that run to completion: a Limit stops its subtree early, below the estimate."""
+    yield node
+    if node["Node Type"] != "Limit":
+        for child in node.get("Plans", []):
+            yield from _unlimited_nodes(child)
+
+
+@pytest.mark.parametrize("path", HOT_PATHS, ids=lambda path: path.name)
+class TestHotPathPlans:
+    """EXPLAIN (ANALYZE, BUFFERS) of each hot RPC, including statements inside the function."""
+
+    @pytest.fixture
+    def plans(self, pg_conn, seeded, path: HotPath) -> list[dict[str, Any]]:
+        # Each rolled-back cleanup leaves dead archive rows; whether autovacuum has trimmed
+        # them yet would decide between index and seq scans for the archive's key checks
+        pg_conn.execute("VACUUM study_groups_archive, participants_archive")
+        return auto_explain(pg_conn, path.sql, [seeded[name] for name in path.params] or None)
+
+    def test_uses_expected_indexes(self, plans, path: HotPath):
+        """Test that the hot path reaches its rows through the expected indexes."""
+        used = {node.get("Index Name") for plan in plans for node in plan_nodes(plan["Plan"])}
+
+        assert set(path.indexes) <= used, f"{path.name} no longer uses {set(path.indexes) - used}"
+
+    def test_no_sequential_scans(self, plans, path: HotPath):
+        """Test that large tables are never scanned sequentially."""
+        scanned = {
+            node["Relation Name"]
+            for plan in plans
+            for node in plan_nodes(plan["Plan"])
+            if node["Node Type"] == "Seq Scan"
+        }
+
+        assert not scanned & set(path.no_seq_scan), f"{path.name} seq-scans {scanned & set(path.no_seq_scan)}"
+
+    def test_row_estimates_are_close(self, plans, path: HotPath):
+        """Test that no scan is misestimated badly enough to flip the plan."""
+        if not path.check_estimates:
+            pytest.skip(f"{path.name} invalidates its own statistics")
+        for plan in plans:
+            for node in _unlimited_nodes(plan["Plan"]):
+                if "Relation Name" not in node or node.get("Actual Loops", 0) == 0:
+                    continue
+                estimated = node["Plan Rows"]
+                actual = node["Actual Rows"]
+                ratio = max(estimated, actual, 1) / max(min(estimated, actual), 1)
+                assert ratio <= ROW_ESTIMATE_FACTOR, (
+                    f"{path.name}: {node['Node Type']} on {node['Relation Name']} "
+                    f"estimated {estimated} rows, got {actual}"
+                )
+
+    def test_buffer_budget(self, plans, path: HotPath):
+        """Test that the call touches no more shared buffers than its budget."""
+        touched = max(_buffers(plan["Plan"]) for plan in plans)
+
+        assert touched <= path.max_buffers, f"{path.name} touched {touched} buffers (budget {path.max_buffers})"
+
+    def test_plan_matches_snapshot(self, request, plans, path: HotPath):
+        """Test that the plan shape matches tests/plan_snapshots (--update-plan-snapshots to accept)."""
+        snapshot = SNAPSHOT_DIR / f"{path.name}.txt"
+        actual = plan_shape(plans)
+
+        if request.config.getoption("--update-plan-snapshots"):
+            SNAPSHOT_DIR.mkdir(exist_ok=True)
+            snapshot.write_text(actual)
+            return
+        if not snapshot.exists():
+            pytest.fail(
+                f"No snapshot {snapshot.name}; record it with --update-plan-snapshots and commit it"
+            )
+
+        expected = snapshot.read_text()
+        diff = "".join(difflib.unified_diff(
+            expected.splitlines(keepends=True),
+            actual.splitlines(keepends=True),
+            fromfile=f"plan_snapshots/{path.name}.txt",
+            tofile="current plan",
+        ))
+        assert not diff, f"Plan for {path.name} changed:\n{diff}"
+
+
+class TestCoveringIndex:
+    """The live listing is answered from idx_study_groups_live_listing without visiting the heap."""
+
+    def test_listing_is_index_only_scan(self, pg_conn, catalogue):
+        """Test that get_study_groups_with_counts() reads study_groups through an index-only scan."""
+        plans = auto_explain(pg_conn, "SELECT * FROM get_study_groups_with_counts()")
+        scans = [
+            node
+            for plan in plans
+            for node in plan_nodes(plan["Plan"])
+            if node.get("Relation Name") == "study_groups"
+        ]
+
+        assert scans
+        for node in scans:
+            assert node["Node Type"] == "Index Only Scan"
+            assert node["Index Name"] == "idx_study_groups_live_listing"
+            # A freshly vacuumed table answers (almost) every row from the visibility map
+            assert node["Heap Fetches"] <= node["Actual Rows"] // 10
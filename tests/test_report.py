@@ -0,0 +1,78 @@
+# ABOUTME: Offline tests for the hot-path report in main.py
+# ABOUTME: Covers ranking by estimated total time and the plain-text layout
+
+from main import format_report, parse_args, rank_hot_paths, sample_rate_range
+
+
+def timing(rpc: str, samples: int, total_ms: float, sample_rate: float = 1.0) -> dict:
+    return {
+        "rpc": rpc,
+        "samples": samples,
+        "total_ms": total_ms,
+        "weighted_calls": samples / sample_rate,
+        "weighted_total_ms": total_ms / sample_rate,
+        "min_sample_rate": sample_rate,
+        "max_sample_rate": sample_rate,
+        "p50_ms": 1.0,
+        "p95_ms": 2.0,
+        "p99_ms": 3.0,
+        "max_ms": 4.0,
+    }
+
+
+class TestRankHotPaths:
+    """Tests for rank_hot_paths."""
+
+    def test_orders_by_total_time_not_call_count(self):
+        """Test that a rare slow RPC outranks a frequent fast one."""
+        ranked = rank_hot_paths([timing("fast", 100, 50.0), timing("slow", 2, 400.0)])
+
+        assert [row["rpc"] for row in ranked] == ["slow", "fast"]
+
+    def test_scales_by_sample_rate(self):
+        """Test that sampled counts are extrapolated to estimated totals."""
+        ranked = rank_hot_paths([timing("rpc", 10, 20.0, sample_rate=0.1)])
+
+        assert ranked[0]["estimated_calls"] == 100
+        assert ranked[0]["estimated_total_ms"] == 200.0
+
+    def test_rate_range_spans_every_rpc(self):
+        """Test that samples taken at different rates are reported as a range."""
+        timings = [timing("a", 1, 1.0, sample_rate=0.1), timing("b", 1, 1.0, sample_rate=0.5)]
+
+        assert sample_rate_range(timings) == [0.1, 0.5]
+        assert sample_rate_range([]) is None
+
+
+class TestFormatReport:
+    """Tests for format_report."""
+
+    def test_explains_missing_data(self):
+        """Test that an empty report says how to enable sampling and that pg_stat_statements is absent."""
+        text = format_report({"since_minutes": 60, "sample_rates": None, "hot_paths": [], "statements": None})
+
+        assert "app.rpc_timing_sample_rate" in text
+        assert "pg_stat_statements is not installed" in text
+
+    def test_lists_statements(self):
+        """Test that statements are printed on one line each."""
+        text = format_report({
+            "since_minutes": 60,
+            "sample_rates": [0.1, 1.0],
+            "hot_paths": rank_hot_paths([timing("get_study_groups_with_counts", 3, 9.0)]),
+            "statements": [{"query": "SELECT\n  1", "calls": 5, "total_ms": 1.5, "mean_ms": 0.3, "rows": 5}],
+        })
+
+        assert "sample rates 0.1-1" in text
+        assert "get_study_groups_with_counts" in text
+        assert "SELECT 1" in text
+
+
+def test_report_defaults_to_the_local_stack(monkeypatch):
+    """Test that report falls back to the `supabase start` database when no URL is configured."""
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.delenv("SUPABASE_DB_URL", raising=False)
+
+    args = parse_args(["report"])
+
+    assert args.database_url.endswith("127.0.0.1:54322/postgres")
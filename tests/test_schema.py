@@ -1,147 +1,118 @@
 # ABOUTME: Schema validation tests for CU Study Groups database
 # ABOUTME: Tests table constraints, RLS policies, and database functions
 
+import asyncio
+import httpx
 import pytest
 from datetime import datetime, timedelta, timezone
 from supabase import Client
 
+from tests.factories import TestDataFactory
+
 
 class TestStudyGroupsTable:
     """Tests for study_groups table constraints."""
 
-    def test_create_valid_study_group(self, supabase_client: Client, clean_test_data):
+    def test_create_valid_study_group(self, factory: TestDataFactory):
         """Test creating a valid study group."""
-        now = datetime.now(timezone.utc)
-        start_time = now + timedelta(hours=1)
-        end_time = now + timedelta(hours=3)
-
-        result = supabase_client.table("study_groups").insert({
-            "subject": "test-Calculus I",
-            "professor_name": "Dr. Smith",
-            "location": "Butler Library Room 301",
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "student_limit": 10,
-            "organizer_name": "John Doe",
-            "organizer_email": "jd1234@columbia.edu",
-        }).execute()
+        group = factory.group(
+            "Calculus I",
+            professor_name="Dr. Smith",
+            location="Butler Library Room 301",
+            student_limit=10,
+            organizer_name="John Doe",
+            organizer_email="jd1234@columbia.edu",
+        )
 
-        assert len(result.data) == 1
-        group = result.data[0]
-        assert group["subject"] == "test-Calculus I"
+        assert group["subject"] == factory.subject("Calculus I")
         assert group["organizer_email"] == "jd1234@columbia.edu"
         assert group["expires_at"] is not None
 
-    def test_expires_at_is_computed(self, supabase_client: Client, clean_test_data):
+    def test_expires_at_is_computed(self, factory: TestDataFactory):
         """Test that expires_at is automatically computed as min(created_at + 24h, end_time)."""
         now = datetime.now(timezone.utc)
-        start_time = now + timedelta(hours=1)
         # End time is only 2 hours from now (less than 24 hours)
         end_time = now + timedelta(hours=2)
 
-        result = supabase_client.table("study_groups").insert({
-            "subject": "test-Short Session",
-            "location": "Mudd Building",
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "organizer_email": "short@columbia.edu",
-        }).execute()
+        group = factory.group(
+            "Short Session",
+            location="Mudd Building",
+            end_time=end_time.isoformat(),
+            organizer_email="short@columbia.edu",
+        )
 
-        group = result.data[0]
         expires_at = datetime.fromisoformat(group["expires_at"].replace("Z", "+00:00"))
         end_time_parsed = datetime.fromisoformat(group["end_time"].replace("Z", "+00:00"))
 
         # expires_at should equal end_time since it's sooner than created_at + 24h
         assert abs((expires_at - end_time_parsed).total_seconds()) < 2
 
-    def test_reject_invalid_columbia_email(self, supabase_client: Client, clean_test_data):
+    def test_reject_invalid_columbia_email(self, supabase_client: Client, factory: TestDataFactory):
         """Test that non-columbia.edu emails are rejected."""
         now = datetime.now(timezone.utc)
         start_time = now + timedelta(hours=1)
         end_time = now + timedelta(hours=3)
 
         with pytest.raises(Exception) as exc_info:
-            supabase_client.table("study_groups").insert({
-                "subject": "test-Invalid Email",
-                "location": "Butler Library",
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-                "organizer_email": "test@gmail.com",
-            }).execute()
+            supabase_client.table("study_groups").insert(factory.group_row(
+                "Invalid Email",
+                start_time=start_time.isoformat(),
+                end_time=end_time.isoformat(),
+                organizer_email="test@gmail.com",
+            )).execute()
 
         assert "valid_organizer_email" in str(exc_info.value).lower() or "check" in str(exc_info.value).lower()
 
-    def test_reject_end_time_before_start_time(self, supabase_client: Client, clean_test_data):
+    def test_reject_end_time_before_start_time(self, supabase_client: Client, factory: TestDataFactory):
         """Test that end_time must be after start_time."""
         now = datetime.now(timezone.utc)
         start_time = now + timedelta(hours=3)
         end_time = now + timedelta(hours=1)  # Before start_time
 
         with pytest.raises(Exception) as exc_info:
-            supabase_client.table("study_groups").insert({
-                "subject": "test-Bad Time Range",
-                "location": "Butler Library",
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-                "organizer_email": "test@columbia.edu",
-            }).execute()
+            supabase_client.table("study_groups").insert(factory.group_row(
+                "Bad Time Range",
+                start_time=start_time.isoformat(),
+                end_time=end_time.isoformat(),
+                organizer_email="test@columbia.edu",
+            )).execute()
 
         assert "valid_time_range" in str(exc_info.value).lower() or "check" in str(exc_info.value).lower()
 
-    def test_student_limit_must_be_positive(self, supabase_client: Client, clean_test_data):
+    def test_student_limit_must_be_positive(self, supabase_client: Client, factory: TestDataFactory):
         """Test that student_limit must be positive if set."""
         now = datetime.now(timezone.utc)
         start_time = now + timedelta(hours=1)
         end_time = now + timedelta(hours=3)
 
         with pytest.raises(Exception):
-            supabase_client.table("study_groups").insert({
-                "subject": "test-Zero Limit",
-                "location": "Butler Library",
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-                "student_limit": 0,
-                "organizer_email": "test@columbia.edu",
-            }).execute()
-
-    def test_null_student_limit_allowed(self, supabase_client: Client, clean_test_data):
+            supabase_client.table("study_groups").insert(factory.group_row(
+                "Zero Limit",
+                start_time=start_time.isoformat(),
+                end_time=end_time.isoformat(),
+                student_limit=0,
+                organizer_email="test@columbia.edu",
+            )).execute()
+
+    def test_null_student_limit_allowed(self, factory: TestDataFactory):
         """Test that null student_limit (unlimited) is allowed."""
-        now = datetime.now(timezone.utc)
-        start_time = now + timedelta(hours=1)
-        end_time = now + timedelta(hours=3)
+        group = factory.group("Unlimited", student_limit=None, organizer_email="unlimited@columbia.edu")
 
-        result = supabase_client.table("study_groups").insert({
-            "subject": "test-Unlimited",
-            "location": "Butler Library",
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "student_limit": None,
-            "organizer_email": "unlimited@columbia.edu",
-        }).execute()
-
-        assert result.data[0]["student_limit"] is None
+        assert group["student_limit"] is None
 
 
 class TestParticipantsTable:
     """Tests for participants table constraints."""
 
     @pytest.fixture
-    def test_study_group(self, supabase_client: Client, clean_test_data):
+    def test_study_group(self, factory: TestDataFactory):
         """Create a test study group for participant tests."""
-        now = datetime.now(timezone.utc)
-        start_time = now + timedelta(hours=1)
-        end_time = now + timedelta(hours=3)
-
-        result = supabase_client.table("study_groups").insert({
-            "subject": "test-Participant Tests",
-            "location": "Mudd Building",
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "student_limit": 2,
-            "organizer_email": "organizer@columbia.edu",
-        }).execute()
-
-        return result.data[0]
+        return factory.group(
+            "Participant Tests",
+            location="Mudd Building",
+            student_limit=2,
+            organizer_email="organizer@columbia.edu",
+        )
 
     def test_join_study_group(self, supabase_client: Client, test_study_group):
         """Test joining a study group."""
@@ -173,6 +144,50 @@ class TestParticipantsTable:
 
         assert "unique" in str(exc_info.value).lower() or "duplicate" in str(exc_info.value).lower()
 
+    def test_emails_are_stored_lowercase(self, supabase_client: Client, test_study_group):
+        """Test that mixed-case participant emails are normalized on write."""
+        result = supabase_client.table("participants").insert({
+            "study_group_id": test_study_group["id"],
+            "name": "Mixed Case",
+            "email": " Mixed.Case@Columbia.EDU ",
+        }).execute()
+
+        assert result.data[0]["email"] == "mixed.case@columbia.edu"
+
+    def test_reject_duplicate_join_differing_only_by_case(
+        self, supabase_client: Client, test_study_group
+    ):
+        """Test that the unique constraint applies case-insensitively."""
+        supabase_client.table("participants").insert({
+            "study_group_id": test_study_group["id"],
+            "name": "Case Test",
+            "email": "casetest@columbia.edu",
+        }).execute()
+
+        with pytest.raises(Exception) as exc_info:
+            supabase_client.table("participants").insert({
+                "study_group_id": test_study_group["id"],
+                "name": "Case Test 2",
+                "email": "CaseTest@Columbia.edu",
+            }).execute()
+
+        assert "unique" in str(exc_info.value).lower() or "duplicate" in str(exc_info.value).lower()
+
+    def test_is_group_member_ignores_case(self, supabase_client: Client, test_study_group):
+        """Test that membership checks match regardless of the caller's casing."""
+        supabase_client.table("participants").insert({
+            "study_group_id": test_study_group["id"],
+            "name": "Member",
+            "email": "member@columbia.edu",
+        }).execute()
+
+        for email in ("MEMBER@columbia.edu", "Organizer@Columbia.edu"):
+            result = supabase_client.rpc("is_group_member", {
+                "p_study_group_id": test_study_group["id"],
+                "p_email": email,
+            }).execute()
+            assert result.data is True
+
     def test_reject_non_columbia_participant_email(self, supabase_client: Client, test_study_group):
         """Test that non-columbia.edu participant emails are rejected."""
         with pytest.raises(Exception) as exc_info:
@@ -209,28 +224,84 @@ class TestParticipantsTable:
 
         assert "full" in str(exc_info.value).lower()
 
-    def test_cascade_delete_participants(self, supabase_client: Client, clean_test_data):
+    def test_concurrent_joins_never_exceed_limit(
+        self, supabase_client: Client, supabase_rest, test_study_group
+    ):
+        """Test that hundreds of simultaneous joins fill a group exactly to its limit."""
+        base_url, headers = supabase_rest
+        group_id = test_study_group["id"]
+        attempts = 200
+
+        async def burst() -> list[httpx.Response]:
+            async with httpx.AsyncClient(timeout=60.0) as client:
+                return await asyncio.gather(*(
+                    client.post(
+                        f"{base_url}/participants",
+                        json={
+                            "study_group_id": group_id,
+                            "name": f"Racer {i}",
+                            "email": f"racer{i}@columbia.edu",
+                        },
+                        headers=headers,
+                    )
+                    for i in range(attempts)
+                ))
+
+        responses = asyncio.run(burst())
+
+        accepted = [r for r in responses if r.status_code == 201]
+        rejected = [r for r in responses if r.status_code != 201]
+        assert len(accepted) == test_study_group["student_limit"]
+        assert all("full" in r.text.lower() for r in rejected)
+
+        participants = supabase_client.table("participants").select("id").eq("study_group_id", group_id).execute()
+        group = supabase_client.table("study_groups").select("participant_count").eq("id", group_id).execute()
+        assert len(participants.data) == test_study_group["student_limit"]
+        assert group.data[0]["participant_count"] == test_study_group["student_limit"]
+
+    def test_concurrent_joins_to_different_groups_all_succeed(
+        self, supabase_client: Client, supabase_rest, factory: TestDataFactory
+    ):
+        """Test that concurrent joins spread across groups are not serialized into failures."""
+        base_url, headers = supabase_rest
+        groups = factory.groups([
+            factory.group_row(
+                f"Parallel Group {i}", student_limit=10, organizer_email=f"parallel{i}@columbia.edu"
+            )
+            for i in range(5)
+        ])
+
+        async def burst() -> list[httpx.Response]:
+            async with httpx.AsyncClient(timeout=60.0) as client:
+                return await asyncio.gather(*(
+                    client.post(
+                        f"{base_url}/participants",
+                        json={
+                            "study_group_id": group["id"],
+                            "name": f"Student {i}",
+                            "email": f"parallel-student{i}@columbia.edu",
+                        },
+                        headers=headers,
+                    )
+                    for group in groups
+                    for i in range(10)
+                ))
+
+        responses = asyncio.run(burst())
+
+        assert all(r.status_code == 201 for r in responses)
+        counts = supabase_client.table("study_groups").select("participant_count").in_(
+            "id", [g["id"] for g in groups]
+        ).execute()
+        assert [row["participant_count"] for row in counts.data] == [10] * 5
+
+    def test_cascade_delete_participants(self, supabase_client: Client, factory: TestDataFactory):
         """Test that deleting a study group cascades to participants."""
-        now = datetime.now(timezone.utc)
-        start_time = now + timedelta(hours=1)
-        end_time = now + timedelta(hours=3)
-
-        # Create group
-        group_result = supabase_client.table("study_groups").insert({
-            "subject": "test-Cascade Delete",
-            "location": "Butler Library",
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "organizer_email": "cascade@columbia.edu",
-        }).execute()
-        group_id = group_result.data[0]["id"]
-
-        # Add participant
-        supabase_client.table("participants").insert({
-            "study_group_id": group_id,
-            "name": "Will Be Deleted",
-            "email": "deleted@columbia.edu",
-        }).execute()
+        group_id = factory.group_with_participants(
+            "Cascade Delete",
+            participants=[("Will Be Deleted", "deleted@columbia.edu")],
+            organizer_email="cascade@columbia.edu",
+        )["id"]
 
         # Delete group
         supabase_client.table("study_groups").delete().eq("id", group_id).execute()
@@ -244,36 +315,15 @@ class TestDatabaseFunctions:
     """Tests for database functions."""
 
     @pytest.fixture
-    def test_study_group_with_participants(self, supabase_client: Client, clean_test_data):
-        """Create a test study group with some participants."""
-        now = datetime.now(timezone.utc)
-        start_time = now + timedelta(hours=1)
-        end_time = now + timedelta(hours=3)
-
-        group_result = supabase_client.table("study_groups").insert({
-            "subject": "test-Function Tests",
-            "location": "Mudd Building",
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "student_limit": 5,
-            "organizer_email": "functions@columbia.edu",
-        }).execute()
-        group = group_result.data[0]
-
-        # Add 2 participants
-        supabase_client.table("participants").insert({
-            "study_group_id": group["id"],
-            "name": "Participant 1",
-            "email": "p1@columbia.edu",
-        }).execute()
-
-        supabase_client.table("participants").insert({
-            "study_group_id": group["id"],
-            "name": "Participant 2",
-            "email": "p2@columbia.edu",
-        }).execute()
-
-        return group
+    def test_study_group_with_participants(self, factory: TestDataFactory):
+        """Create a test study group with some participants (p1@ and p2@columbia.edu)."""
+        return factory.group_with_participants(
+            "Function Tests",
+            participants=2,
+            location="Mudd Building",
+            student_limit=5,
+            organizer_email="functions@columbia.edu",
+        )
 
     def test_get_participant_count(self, supabase_client: Client, test_study_group_with_participants):
         """Test get_participant_count function."""
@@ -302,3 +352,430 @@ class TestDatabaseFunctions:
         assert test_group is not None
         assert test_group["participant_count"] == 2
         assert test_group["is_full"] is False
+
+    def test_participant_count_column_tracks_joins_and_leaves(
+        self, supabase_client: Client, test_study_group_with_participants
+    ):
+        """Test that study_groups.participant_count follows participant inserts and deletes."""
+        group_id = test_study_group_with_participants["id"]
+
+        group = supabase_client.table("study_groups").select("participant_count").eq("id", group_id).execute()
+        assert group.data[0]["participant_count"] == 2
+
+        supabase_client.table("participants").delete().eq("study_group_id", group_id).eq(
+            "email", "p1@columbia.edu"
+        ).execute()
+
+        group = supabase_client.table("study_groups").select("participant_count").eq("id", group_id).execute()
+        assert group.data[0]["participant_count"] == 1
+
+    def test_participant_count_ignores_client_value_on_insert(self, factory: TestDataFactory):
+        """Test that a new group always starts with participant_count = 0."""
+        group = factory.group("Forged Count", organizer_email="forged@columbia.edu", participant_count=50)
+
+        assert group["participant_count"] == 0
+
+    def test_version_increments_when_count_changes(
+        self, supabase_client: Client, test_study_group_with_participants
+    ):
+        """Test that each join bumps study_groups.version by exactly one."""
+        group_id = test_study_group_with_participants["id"]
+
+        before = supabase_client.table("study_groups").select("version").eq("id", group_id).execute()
+
+        supabase_client.table("participants").insert({
+            "study_group_id": group_id,
+            "name": "Version Bump",
+            "email": "p3@columbia.edu",
+        }).execute()
+
+        after = supabase_client.table("study_groups").select("version").eq("id", group_id).execute()
+        assert after.data[0]["version"] == before.data[0]["version"] + 1
+
+    def test_get_notification_context(self, supabase_client: Client, test_study_group_with_participants):
+        """Test that get_notification_context returns group, count, seats and participant in one row."""
+        group_id = test_study_group_with_participants["id"]
+        participant = supabase_client.table("participants").select("id").eq(
+            "study_group_id", group_id
+        ).eq("email", "p1@columbia.edu").execute().data[0]
+
+        result = supabase_client.rpc("get_notification_context", {
+            "p_study_group_id": group_id,
+            "p_participant_id": participant["id"],
+        }).execute()
+
+        context = result.data[0]
+        assert context["organizer_email"] == "functions@columbia.edu"
+        assert context["participant_count"] == 2
+        assert context["remaining_seats"] == 3
+        assert context["participant_email"] == "p1@columbia.edu"
+        assert "description" not in context
+
+    def test_get_notification_context_unknown_group(self, supabase_client: Client):
+        """Test that an unknown group yields no row."""
+        result = supabase_client.rpc("get_notification_context", {
+            "p_study_group_id": "00000000-0000-0000-0000-000000000000",
+        }).execute()
+
+        assert result.data == []
+
+    def test_repair_participant_counts(self, supabase_client: Client, test_study_group_with_participants):
+        """Test that repair_participant_counts leaves consistent counts untouched."""
+        group_id = test_study_group_with_participants["id"]
+
+        supabase_client.rpc("repair_participant_counts").execute()
+
+        count = supabase_client.rpc("get_participant_count", {"p_study_group_id": group_id}).execute()
+        assert count.data == 2
+
+
+class TestFindSimilarStudyGroups:
+    """Tests for the find_similar_study_groups duplicate check."""
+
+    @pytest.fixture(scope="class")
+    def existing_group(self, shared_factory: TestDataFactory):
+        """Create a group that new submissions can collide with (read-only, shared by the class)."""
+        now = datetime.now(timezone.utc)
+
+        return shared_factory.group(
+            "Linear Algebra",
+            professor_name="Dr. Strang",
+            location="Mudd Building",
+            start_time=(now + timedelta(hours=2)).isoformat(),
+            end_time=(now + timedelta(hours=4)).isoformat(),
+            organizer_email="similar@columbia.edu",
+        )
+
+    def _find(self, supabase_client: Client, subject, professor, start, end):
+        return supabase_client.rpc("find_similar_study_groups", {
+            "p_subject": subject,
+            "p_professor_name": professor,
+            "p_start_time": start.isoformat(),
+            "p_end_time": end.isoformat(),
+        }).execute().data
+
+    def test_overlapping_group_is_found_case_insensitively(self, supabase_client: Client, existing_group):
+        """Test that an overlapping group with differently-cased subject and professor matches."""
+        start = datetime.fromisoformat(existing_group["start_time"]) + timedelta(hours=1)
+        subject = existing_group["subject"].swapcase()
+        matches = self._find(supabase_client, subject, "dr. strang", start, start + timedelta(hours=2))
+
+        assert existing_group["id"] in [m["id"] for m in matches]
+
+    def test_adjacent_group_is_not_a_duplicate(self, supabase_client: Client, existing_group):
+        """Test that a session starting exactly when the other ends does not overlap."""
+        start = datetime.fromisoformat(existing_group["end_time"])
+        matches = self._find(supabase_client, existing_group["subject"], None, start, start + timedelta(hours=1))
+
+        assert existing_group["id"] not in [m["id"] for m in matches]
+
+    def test_results_are_ranked_by_overlap(
+        self, supabase_client: Client, factory: TestDataFactory, existing_group
+    ):
+        """Test that the group with the largest overlap is returned first."""
+        start = datetime.fromisoformat(existing_group["start_time"])
+        factory.group(
+            "Linear Algebra",
+            start_time=(start + timedelta(hours=1, minutes=30)).isoformat(),
+            end_time=(start + timedelta(hours=3)).isoformat(),
+            organizer_email="similar2@columbia.edu",
+        )
+
+        matches = self._find(supabase_client, existing_group["subject"], None, start, start + timedelta(hours=2))
+
+        assert matches[0]["id"] == existing_group["id"]
+        assert len(matches) >= 2
+
+
+class TestSearchStudyGroups:
+    """Tests for the search_study_groups full-text search RPC."""
+
+    @pytest.fixture(scope="class")
+    def searchable_groups(self, shared_factory: TestDataFactory):
+        """Create a few upcoming groups with distinct searchable fields (read-only, shared by the class)."""
+        groups = shared_factory.groups([
+            shared_factory.group_row(
+                "Calculus III",
+                professor_name="Dr. Leibniz",
+                location="Mathematics Hall 407",
+                description="Review multivariable integrals",
+                organizer_email="search@columbia.edu",
+            ),
+            shared_factory.group_row(
+                "Organic Chemistry",
+                professor_name="Dr. Curie",
+                location="Havemeyer Hall",
+                description="Reaction mechanisms",
+                organizer_email="search@columbia.edu",
+            ),
+        ])
+
+        return {"Calculus III": groups[0], "Organic Chemistry": groups[1]}
+
+    def test_partial_word_matches(self, supabase_client: Client, searchable_groups):
+        """Test that a partial word like "calc" finds Calculus."""
+        result = supabase_client.rpc("search_study_groups", {"p_query": "calc"}).execute()
+
+        ids = [g["id"] for g in result.data]
+        assert searchable_groups["Calculus III"]["id"] in ids
+        assert searchable_groups["Organic Chemistry"]["id"] not in ids
+
+    def test_matches_description_and_professor(self, supabase_client: Client, searchable_groups):
+        """Test that description and professor fields are searchable."""
+        by_description = supabase_client.rpc("search_study_groups", {"p_query": "mechanisms"}).execute()
+        by_professor = supabase_client.rpc("search_study_groups", {"p_query": "curie"}).execute()
+
+        chemistry_id = searchable_groups["Organic Chemistry"]["id"]
+        assert chemistry_id in [g["id"] for g in by_description.data]
+        assert chemistry_id in [g["id"] for g in by_professor.data]
+
+    def test_cursor_pages_do_not_overlap(self, supabase_client: Client, searchable_groups):
+        """Test that passing the last row as a cursor returns the next page."""
+        first = supabase_client.rpc("search_study_groups", {"p_query": "test", "p_limit": 1}).execute().data
+        assert len(first) == 1
+
+        last = first[0]
+        second = supabase_client.rpc("search_study_groups", {
+            "p_query": "test",
+            "p_limit": 1,
+            "p_after_rank": last["rank"],
+            "p_after_start_time": last["start_time"],
+            "p_after_id": last["id"],
+        }).execute().data
+
+        assert len(second) == 1
+        assert second[0]["id"] != last["id"]
+
+    def test_empty_query_returns_nothing(self, supabase_client: Client):
+        """Test that a blank query returns no rows rather than everything."""
+        result = supabase_client.rpc("search_study_groups", {"p_query": "   "}).execute()
+        assert result.data == []
+
+
+class TestStudyGroupsPage:
+    """Tests for the get_study_groups_page keyset pagination RPC."""
+
+    @pytest.fixture(scope="class")
+    def paged_groups(self, shared_factory: TestDataFactory):
+        """Create several upcoming groups that share a start time (read-only, shared by the class)."""
+        start_time = datetime.now(timezone.utc) + timedelta(days=30)
+
+        return shared_factory.groups([
+            shared_factory.group_row(
+                f"Paged {i}",
+                start_time=start_time.isoformat(),
+                end_time=(start_time + timedelta(hours=2)).isoformat(),
+                organizer_email=f"paged{i}@columbia.edu",
+            )
+            for i in range(5)
+        ])
+
+    def test_pages_cover_all_rows_without_duplicates(self, supabase_client: Client, paged_groups):
+        """Test that walking the cursor visits every group exactly once, even with tied start times."""
+        seen = []
+        after = None
+        for _ in range(1000):
+            params = {"p_limit": 2}
+            if after:
+                params["p_after_start_time"] = after["start_time"]
+                params["p_after_id"] = after["id"]
+            page = supabase_client.rpc("get_study_groups_page", params).execute().data
+            if not page:
+                break
+            seen.extend(g["id"] for g in page)
+            after = page[-1]
+
+        assert len(seen) == len(set(seen))
+        assert {g["id"] for g in paged_groups} <= set(seen)
+
+    def test_page_rows_include_counts(self, supabase_client: Client, paged_groups):
+        """Test that page rows carry participant_count and is_full."""
+        page = supabase_client.rpc("get_study_groups_page", {"p_limit": 100}).execute().data
+
+        row = next(g for g in page if g["id"] == paged_groups[0]["id"])
+        assert row["participant_count"] == 0
+        assert row["is_full"] is False
+
+
+class TestUpcomingGroupsSnapshot:
+    """Tests for the get_upcoming_groups_snapshot RPC."""
+
+    def _snapshot(self, supabase_client: Client, group: dict, etag: str | None = None) -> dict:
+        # The page starting at the group's start time, so other upcoming rows can't push it off
+        return supabase_client.rpc(
+            "get_upcoming_groups_snapshot", {"p_etag": etag, "p_after_start_time": group["start_time"]}
+        ).execute().data
+
+    def test_snapshot_rows_include_counts(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that snapshot rows carry participant_count and is_full."""
+        group = factory.group_with_participants("Snapshot Full", participants=2, student_limit=2)
+
+        snapshot = self._snapshot(supabase_client, group)
+
+        row = next(g for g in snapshot["groups"] if g["id"] == group["id"])
+        assert snapshot["not_modified"] is False
+        assert row["participant_count"] == 2
+        assert row["is_full"] is True
+
+    def test_join_invalidates_etag(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that a join after the ETag was issued returns the new payload."""
+        group = factory.group("Snapshot Join")
+        etag = self._snapshot(supabase_client, group)["etag"]
+
+        factory.participants(group["id"], 1)
+        snapshot = self._snapshot(supabase_client, group, etag)
+
+        row = next(g for g in snapshot["groups"] if g["id"] == group["id"])
+        assert snapshot["not_modified"] is False
+        assert row["participant_count"] == 1
+
+    def test_deleted_group_leaves_snapshot(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that deleting a group after the ETag was issued drops it from the payload."""
+        group = factory.group("Snapshot Delete")
+        etag = self._snapshot(supabase_client, group)["etag"]
+
+        supabase_client.table("study_groups").delete().eq("id", group["id"]).execute()
+        snapshot = self._snapshot(supabase_client, group, etag)
+
+        assert snapshot["not_modified"] is False
+        assert group["id"] not in {g["id"] for g in snapshot["groups"]}
+
+    def test_pages_follow_the_cursor(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that a keyset page starts right after the row passed as its cursor."""
+        group = factory.group("Snapshot Pages")
+        factory.group("Snapshot Pages")
+
+        first = self._snapshot(supabase_client, group)["groups"]
+        cursor = first[0]
+        following = supabase_client.rpc(
+            "get_upcoming_groups_snapshot",
+            {"p_limit": 1, "p_after_start_time": cursor["start_time"], "p_after_id": cursor["id"]},
+        ).execute().data["groups"]
+
+        assert [g["id"] for g in following] == [first[1]["id"]]
+
+
+class TestStudyGroupsSince:
+    """Tests for the get_study_groups_since delta RPC."""
+
+    def _since(self, supabase_client: Client, version: int | None) -> dict:
+        return supabase_client.rpc("get_study_groups_since", {"p_version": version}).execute().data
+
+    def test_delta_after_join_and_delete(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that a join shows up as a changed row and a delete as a tombstone."""
+        joined = factory.group("Since Join")
+        deleted = factory.group("Since Delete")
+        version = self._since(supabase_client, None)["version"]
+
+        factory.participants(joined["id"], 1)
+        supabase_client.table("study_groups").delete().eq("id", deleted["id"]).execute()
+        delta = self._since(supabase_client, version)
+
+        row = next(g for g in delta["changed"] if g["id"] == joined["id"])
+        assert row["participant_count"] == 1
+        assert deleted["id"] in delta["deleted"]
+
+
+class TestGroupPage:
+    """Tests for the get_group_page RPC."""
+
+    def _page(self, supabase_client: Client, group_id: str, email: str | None) -> dict | None:
+        return supabase_client.rpc("get_group_page", {
+            "p_study_group_id": group_id,
+            "p_requester_email": email,
+        }).execute().data
+
+    def test_participant_sees_everyone(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that a participant gets the group, their role and all participants in join order."""
+        group = factory.group_with_participants("Page Member", participants=2, student_limit=4)
+
+        page = self._page(supabase_client, group["id"], "P1@Columbia.edu")
+
+        assert page["role"] == "participant"
+        assert page["group"]["participant_count"] == 2
+        assert page["group"]["is_full"] is False
+        assert [p["email"] for p in page["participants"]] == ["p1@columbia.edu", "p2@columbia.edu"]
+
+    def test_organizer_role(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that the organizer is recognized without having joined."""
+        group = factory.group_with_participants("Page Organizer", participants=1)
+
+        page = self._page(supabase_client, group["id"], "organizer@columbia.edu")
+
+        assert page["role"] == "organizer"
+        assert len(page["participants"]) == 1
+
+    def test_visitor_sees_no_participants(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that visitors get the group and count but no participant list."""
+        group = factory.group_with_participants("Page Visitor", participants=2)
+
+        for email in ("stranger@columbia.edu", None):
+            page = self._page(supabase_client, group["id"], email)
+            assert page["role"] == "visitor"
+            assert page["group"]["participant_count"] == 2
+            assert page["participants"] == []
+
+    def test_unknown_group(self, supabase_client: Client):
+        """Test that an unknown group yields null."""
+        assert self._page(supabase_client, "00000000-0000-0000-0000-000000000000", None) is None
+
+
+class TestIngestStudyGroups:
+    """Tests for the batched ingest_study_groups RPC used by the form webhook."""
+
+    def _ingest(self, supabase_client: Client, factory: TestDataFactory, rows: list[dict]) -> list[dict]:
+        outcomes = supabase_client.rpc("ingest_study_groups", {"p_rows": rows}).execute().data
+        factory.group_ids.extend(o["study_group_id"] for o in outcomes if o["status"] == "created")
+        return outcomes
+
+    def _row(self, factory: TestDataFactory, key: str, name: str, **fields) -> dict:
+        return {**factory.group_row(name, **fields), "idempotency_key": factory.subject(key)}
+
+    def test_replayed_keys_return_the_original_group(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that resending a batch creates nothing new and reports the original ids."""
+        rows = [self._row(factory, "ingest-1", "Ingest One"), self._row(factory, "ingest-2", "Ingest Two")]
+
+        first = self._ingest(supabase_client, factory, rows)
+        replay = self._ingest(supabase_client, factory, rows)
+
+        assert [o["status"] for o in first] == ["created", "created"]
+        assert [o["status"] for o in replay] == ["duplicate", "duplicate"]
+        assert [o["study_group_id"] for o in replay] == [o["study_group_id"] for o in first]
+
+    def test_duplicate_key_within_batch(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that a key repeated inside one batch is created once."""
+        row = self._row(factory, "ingest-same", "Ingest Same")
+
+        outcomes = self._ingest(supabase_client, factory, [row, row])
+
+        assert [o["status"] for o in outcomes] == ["created", "duplicate"]
+        assert outcomes[1]["study_group_id"] == outcomes[0]["study_group_id"]
+
+    def test_invalid_rows_do_not_block_the_batch(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that rejected rows get an error while the rest of the batch is created."""
+        good = self._row(factory, "ingest-good", "Ingest Good")
+        bad_email = self._row(factory, "ingest-bad", "Ingest Bad", organizer_email="someone@gmail.com")
+        no_key = factory.group_row("Ingest No Key")
+
+        outcomes = self._ingest(supabase_client, factory, [bad_email, good, no_key])
+
+        assert [o["status"] for o in outcomes] == ["invalid", "created", "invalid"]
+        assert outcomes[0]["error"]
+        assert outcomes[2]["error"] == "Missing idempotency_key"
+
+        # The rejected key was not consumed, so a corrected row goes through
+        fixed = {**bad_email, "organizer_email": "someone@columbia.edu"}
+        assert self._ingest(supabase_client, factory, [fixed])[0]["status"] == "created"
+
+    def test_similar_groups_include_earlier_batch_rows(self, supabase_client: Client, factory: TestDataFactory):
+        """Test that overlapping rows are reported against existing groups and earlier rows only."""
+        existing = factory.group("Ingest Overlap", professor_name="Dr. Similar")
+        rows = [
+            self._row(factory, "ingest-overlap-1", "Ingest Overlap", professor_name="Dr. Similar"),
+            self._row(factory, "ingest-overlap-2", "Ingest Overlap", professor_name="Dr. Similar"),
+        ]
+
+        first, second = self._ingest(supabase_client, factory, rows)
+
+        assert {g["id"] for g in first["similar"]} == {existing["id"]}
+        assert {g["id"] for g in second["similar"]} == {existing["id"], first["study_group_id"]}